@@ -1,2 +1,10 @@
 # -*- coding: utf-8 -*-
 from . import models
+
+
+def post_init_hook(env):
+    """
+    Post-installation hook to schedule existing projects.
+    Tasks created before install have no CPM dates until their project runs.
+    """
+    env["project.task"]._cpm_backfill()
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     "name": "InsightPulse Clarity PPM Parity",
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.1.0",
     "category": "Project Management",
     "summary": "Broadcom Clarity PPM feature parity for Odoo 18 CE with complete WBS hierarchy",
     "description": """
@@ -71,6 +71,7 @@ License: AGPL-3
     "demo": [
         "data/demo_data.xml",
     ],
+    "post_init_hook": "post_init_hook",
     "installable": True,
     "application": False,
     "auto_install": False,
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""Fill the CPM early/late dates added in 18.0.1.1.0 for existing tasks."""
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env["project.task"]._cpm_backfill()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Critical Path Method (CPM) scheduling over a task dependency network.
+
+Pure Python, no ORM access: project.task loads a project's network in one
+query, hands it to CriticalPathNetwork and writes the results back in bulk.
+
+All dependencies are scheduled as Finish-to-Start with a per-successor lag
+(lag_days - lead_days). Dates are calendar days.
+"""
+from collections import deque
+from datetime import timedelta
+
+
+class CyclicDependencyError(ValueError):
+    """Raised when the dependency network contains a cycle."""
+
+    def __init__(self, node_ids):
+        self.node_ids = sorted(node_ids)
+        super().__init__(f"Cyclic task dependencies: {self.node_ids}")
+
+
+class CriticalPathNetwork:
+    """
+    Forward/backward pass over a dependency DAG.
+
+    Args:
+        nodes: {task_id: dict} with keys ``duration`` (days), ``lag`` (days
+            applied after each predecessor), ``deadline`` (date or None) and
+            the previously stored ``early_start``, ``early_finish``,
+            ``late_start``, ``late_finish`` (dates or None)
+        predecessors: {task_id: iterable of predecessor task ids}
+        project_start: date anchoring tasks without predecessors
+        project_finish: optional project deadline (date or None)
+    """
+
+    def __init__(self, nodes, predecessors, project_start, project_finish=None):
+        self.nodes = nodes
+        self.project_start = project_start
+        self.project_finish = project_finish
+        self.predecessors = {
+            node_id: [p for p in predecessors.get(node_id, ()) if p in nodes]
+            for node_id in nodes
+        }
+        self.successors = {node_id: [] for node_id in nodes}
+        for node_id, preds in self.predecessors.items():
+            for pred_id in preds:
+                self.successors[pred_id].append(node_id)
+        self.order = self._topological_order()
+        self.position = {node_id: i for i, node_id in enumerate(self.order)}
+
+    def _topological_order(self):
+        """Kahn's algorithm; raises CyclicDependencyError on cycles."""
+        in_degree = {
+            node_id: len(preds) for node_id, preds in self.predecessors.items()
+        }
+        queue = deque(sorted(n for n, degree in in_degree.items() if not degree))
+        order = []
+        while queue:
+            node_id = queue.popleft()
+            order.append(node_id)
+            for succ_id in self.successors[node_id]:
+                in_degree[succ_id] -= 1
+                if not in_degree[succ_id]:
+                    queue.append(succ_id)
+        if len(order) != len(self.nodes):
+            raise CyclicDependencyError(n for n, degree in in_degree.items() if degree)
+        return order
+
+    def _closure(self, node_ids, edges):
+        seen = set(node_ids)
+        stack = list(node_ids)
+        while stack:
+            for next_id in edges[stack.pop()]:
+                if next_id not in seen:
+                    seen.add(next_id)
+                    stack.append(next_id)
+        return seen
+
+    def downstream(self, node_ids):
+        """Nodes reachable from ``node_ids`` through successors (inclusive)."""
+        return self._closure([n for n in node_ids if n in self.nodes], self.successors)
+
+    def upstream(self, node_ids):
+        """Nodes reaching ``node_ids`` through predecessors (inclusive)."""
+        return self._closure(
+            [n for n in node_ids if n in self.nodes], self.predecessors
+        )
+
+    def _sorted(self, node_ids, reverse=False):
+        return sorted(node_ids, key=self.position.__getitem__, reverse=reverse)
+
+    def _finish(self):
+        finishes = [node["early_finish"] for node in self.nodes.values()]
+        finish = max(finishes, default=self.project_start)
+        if self.project_finish and self.project_finish > finish:
+            finish = self.project_finish
+        return finish
+
+    def schedule(self, changed_ids=None):
+        """
+        Run the forward and backward passes.
+
+        With ``changed_ids``, the forward pass only covers their downstream
+        cone and the backward pass their upstream cone, reusing the stored
+        dates of every other task. The backward pass falls back to the whole
+        network when the project finish moves.
+
+        Returns:
+            set: ids of nodes whose schedule values were recomputed
+        """
+        full = changed_ids is None or any(
+            node["early_finish"] is None or node["late_finish"] is None
+            for node in self.nodes.values()
+        )
+        previous_finish = None if full else self._finish()
+
+        forward = set(self.nodes) if full else self.downstream(changed_ids)
+        for node_id in self._sorted(forward):
+            node = self.nodes[node_id]
+            early_start = self.project_start
+            for pred_id in self.predecessors[node_id]:
+                candidate = self.nodes[pred_id]["early_finish"] + timedelta(
+                    days=node["lag"]
+                )
+                early_start = max(early_start, candidate)
+            node["early_start"] = early_start
+            node["early_finish"] = early_start + timedelta(days=node["duration"])
+
+        finish = self._finish()
+        if full or finish != previous_finish:
+            backward = set(self.nodes)
+        else:
+            backward = self.upstream(set(changed_ids) | forward)
+        for node_id in self._sorted(backward, reverse=True):
+            node = self.nodes[node_id]
+            late_finish = finish
+            for succ_id in self.successors[node_id]:
+                succ = self.nodes[succ_id]
+                candidate = succ["late_start"] - timedelta(days=succ["lag"])
+                late_finish = min(late_finish, candidate)
+            if node["deadline"] and node["deadline"] < late_finish:
+                late_finish = node["deadline"]
+            node["late_finish"] = late_finish
+            node["late_start"] = late_finish - timedelta(days=node["duration"])
+
+        # Free float also depends on the early start of successors
+        touched = forward | backward
+        touched |= {p for node_id in forward for p in self.predecessors[node_id]}
+        for node_id in touched:
+            node = self.nodes[node_id]
+            node["total_float"] = (node["late_start"] - node["early_start"]).days
+            successor_starts = [
+                self.nodes[s]["early_start"] - timedelta(days=self.nodes[s]["lag"])
+                for s in self.successors[node_id]
+            ]
+            next_start = min(successor_starts, default=finish)
+            node["free_float"] = (next_start - node["early_finish"]).days
+        return touched
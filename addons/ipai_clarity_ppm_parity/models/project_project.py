@@ -184,6 +184,13 @@ class ProjectProject(models.Model):
             else:
                 project.overall_progress = 0.0
 
+    def write(self, vals):
+        res = super().write(vals)
+        if {"date_start", "date"} & set(vals):
+            # Project start/finish anchor the whole CPM network
+            self.env["project.task"]._cpm_schedule_projects(self)
+        return res
+
     def action_view_phases(self):
         """Open phases view"""
         self.ensure_one()
@@ -1,6 +1,32 @@
 # -*- coding: utf-8 -*-
+import math
+
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
 from odoo import _, api, fields, models
 
+from .cpm import CriticalPathNetwork, CyclicDependencyError
+
+# Working hours per day used to turn planned hours into a CPM duration
+CPM_HOURS_PER_DAY = 8.0
+
+# Task fields that change the CPM network of a project
+CPM_TRIGGER_FIELDS = {
+    "planned_hours",
+    "date_deadline",
+    "depend_on_ids",
+    "dependent_ids",
+    "lag_days",
+    "lead_days",
+    "project_id",
+    "active",
+    "is_phase",
+}
+
+# Task fields that move a task within the WBS tree
+WBS_TRIGGER_FIELDS = {"parent_id", "project_id", "active"}
+
 
 class ProjectTask(models.Model):
     _inherit = "project.task"
@@ -24,29 +50,31 @@ class ProjectTask(models.Model):
         help="Overlap between predecessor and successor (negative lag, positive value)",
     )
 
-    # Critical Path Analysis
+    # Critical Path Analysis (maintained by _cpm_schedule_projects)
     critical_path = fields.Boolean(
         string="On Critical Path",
-        compute="_compute_critical_path",
-        store=True,
+        readonly=True,
         index=True,
-        help="Task is on the critical path (zero total float)",
+        help="Task is on the critical path (zero or negative total float)",
     )
 
     total_float = fields.Integer(
         string="Total Float (days)",
-        compute="_compute_float",
-        store=True,
+        readonly=True,
         help="Maximum delay possible without impacting project finish",
     )
 
     free_float = fields.Integer(
         string="Free Float (days)",
-        compute="_compute_float",
-        store=True,
+        readonly=True,
         help="Maximum delay possible without impacting successor start",
     )
 
+    early_start = fields.Date(string="Early Start", readonly=True, copy=False)
+    early_finish = fields.Date(string="Early Finish", readonly=True, copy=False)
+    late_start = fields.Date(string="Late Start", readonly=True, copy=False)
+    late_finish = fields.Date(string="Late Finish", readonly=True, copy=False)
+
     # Resource Management
     resource_allocation = fields.Float(
         string="Resource Allocation (%)",
@@ -69,11 +97,11 @@ class ProjectTask(models.Model):
         string="Remaining Hours", help="Estimate to Complete (ETC)"
     )
 
-    # Work Breakdown Structure (WBS) Code
+    # Work Breakdown Structure (WBS) Code (maintained by _wbs_renumber)
     wbs_code = fields.Char(
         string="WBS Code",
-        compute="_compute_wbs_code",
-        store=True,
+        readonly=True,
+        copy=False,
         help="Hierarchical WBS code (e.g., 1.2.3.1)",
     )
 
@@ -105,52 +133,297 @@ class ProjectTask(models.Model):
         help="EV - AC (positive is under budget)",
     )
 
-    @api.depends("depend_on_ids", "date_deadline")
-    def _compute_critical_path(self):
+    @api.model_create_multi
+    def create(self, vals_list):
+        tasks = super().create(vals_list)
+        self._wbs_renumber(tasks._wbs_groups())
+        if not self.env.context.get("cpm_skip"):
+            tasks._cpm_schedule_projects(tasks.project_id, changed_ids=set(tasks.ids))
+        return tasks
+
+    def write(self, vals):
+        renumber = WBS_TRIGGER_FIELDS & set(vals)
+        reschedule = not self.env.context.get("cpm_skip") and (
+            CPM_TRIGGER_FIELDS & set(vals)
+        )
+        if not renumber and not reschedule:
+            return super().write(vals)
+
+        # Old positions, neighbours and projects are affected as well
+        groups = self._wbs_groups() if renumber else set()
+        changed_ids = set(self.ids)
+        changed_ids.update(self.depend_on_ids.ids, self.dependent_ids.ids)
+        projects = self.project_id
+
+        res = super().write(vals)
+
+        if renumber:
+            self._wbs_renumber(groups | self._wbs_groups())
+        if reschedule:
+            changed_ids.update(self.depend_on_ids.ids, self.dependent_ids.ids)
+            self._cpm_schedule_projects(
+                projects | self.project_id, changed_ids=changed_ids
+            )
+        return res
+
+    def unlink(self):
+        # Remaining siblings close the gap; orphaned subtasks move to the top
+        groups = self._wbs_groups()
+        groups.update((project.id, False) for project in self.child_ids.project_id)
+        projects = self.project_id
+
+        res = super().unlink()
+
+        self.env["project.task"]._wbs_renumber(groups)
+        # Successors lose a predecessor and the project finish may move: the
+        # stored dates of the removed tasks are gone, so an incremental pass
+        # cannot tell, and the remaining network is rescheduled in full
+        if not self.env.context.get("cpm_skip"):
+            self.env["project.task"]._cpm_schedule_projects(projects.exists())
+        return res
+
+    def _wbs_groups(self):
+        """Sibling groups of the tasks, as (project_id, parent_id) keys."""
+        return {
+            (task.project_id.id, task.parent_id.id or False)
+            for task in self
+            if task.project_id
+        }
+
+    @api.model
+    def _wbs_renumber(self, groups):
         """
-        Determine if task is on critical path.
-        Critical path tasks have zero total float.
+        Renumber WBS codes of the given sibling groups and their subtrees.
+
+        The task tree of the affected projects is loaded with one query,
+        siblings are numbered in memory (by id, top-level tasks per project)
+        and only codes that actually changed are written back with a single
+        UPDATE. Tasks outside the affected subtrees are left untouched.
+
+        Args:
+            groups: iterable of (project_id, parent_id or False) keys
         """
-        for task in self:
-            if not task.is_phase:
-                task.critical_path = task.total_float == 0
-            else:
-                task.critical_path = False
+        groups = set(groups)
+        if not groups:
+            return
+
+        self.env["project.task"].flush_model(["parent_id", "project_id", "active"])
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT id, project_id, parent_id, wbs_code
+                  FROM project_task
+                 WHERE project_id IN %s AND active
+                 ORDER BY id
+                """,
+                tuple({project_id for project_id, _parent_id in groups}),
+            )
+        )
+        rows = self.env.cr.fetchall()
+        codes = {task_id: wbs_code or "" for task_id, _p, _pa, wbs_code in rows}
+        children = {}
+        for task_id, project_id, parent_id, _code in rows:
+            if parent_id and parent_id not in codes:
+                # Parent outside the project's active tree: keep current code
+                continue
+            key = (project_id, parent_id or False)
+            children.setdefault(key, []).append(task_id)
+
+        updates = {}
+        stack = [key for key in groups if key in children]
+        while stack:
+            project_id, parent_id = stack.pop()
+            prefix = f"{codes[parent_id]}." if parent_id else ""
+            for number, task_id in enumerate(children[(project_id, parent_id)], 1):
+                code = f"{prefix}{number}"
+                if codes[task_id] != code:
+                    codes[task_id] = updates[task_id] = code
+                if (project_id, task_id) in children:
+                    stack.append((project_id, task_id))
 
-    @api.depends("date_deadline", "depend_on_ids", "dependent_ids")
-    def _compute_float(self):
+        if updates:
+            values = SQL(", ").join(
+                SQL("(%s, %s)", task_id, code) for task_id, code in updates.items()
+            )
+            self.env.cr.execute(
+                SQL(
+                    """
+                    UPDATE project_task AS t
+                       SET wbs_code = v.wbs_code
+                      FROM (VALUES %s) AS v(id, wbs_code)
+                     WHERE t.id = v.id
+                    """,
+                    values,
+                )
+            )
+            self.env["project.task"].invalidate_model(["wbs_code"])
+
+    @api.model
+    def _cpm_load_network(self, project):
         """
-        Calculate Total Float and Free Float.
-        Total Float = Latest Finish - Earliest Finish
-        Free Float = min(Successor Early Start) - Earliest Finish
+        Load the whole dependency network of a project in a single query.
+
+        Returns:
+            tuple: ({task_id: node dict}, {task_id: [predecessor ids]},
+                    {task_id: is_phase})
         """
-        for task in self:
-            if task.is_phase:
-                task.total_float = 0
-                task.free_float = 0
-                continue
+        dependency = self._fields["depend_on_ids"]
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT t.id, t.planned_hours, t.date_deadline::date, t.lag_days,
+                       t.lead_days, t.is_phase, t.early_start, t.early_finish,
+                       t.late_start, t.late_finish,
+                       ARRAY(
+                           SELECT d.%(predecessor)s FROM %(relation)s d
+                           WHERE d.%(successor)s = t.id
+                       )
+                  FROM project_task t
+                 WHERE t.project_id = %(project_id)s AND t.active
+                """,
+                predecessor=SQL.identifier(dependency.column2),
+                relation=SQL.identifier(dependency.relation),
+                successor=SQL.identifier(dependency.column1),
+                project_id=project.id,
+            )
+        )
+        nodes, predecessors, phases = {}, {}, {}
+        for (
+            task_id,
+            planned_hours,
+            deadline,
+            lag_days,
+            lead_days,
+            is_phase,
+            early_start,
+            early_finish,
+            late_start,
+            late_finish,
+            predecessor_ids,
+        ) in self.env.cr.fetchall():
+            nodes[task_id] = {
+                "duration": math.ceil((planned_hours or 0.0) / CPM_HOURS_PER_DAY),
+                "lag": (lag_days or 0) - (lead_days or 0),
+                "deadline": deadline,
+                "early_start": early_start,
+                "early_finish": early_finish,
+                "late_start": late_start,
+                "late_finish": late_finish,
+            }
+            predecessors[task_id] = predecessor_ids
+            phases[task_id] = is_phase
+        return nodes, predecessors, phases
+
+    @api.model
+    def _cpm_schedule_projects(self, projects, changed_ids=None):
+        """
+        Run the critical path forward/backward pass for whole projects.
 
-            # Simplified calculation (full CPM would require project-wide network analysis)
-            if task.date_deadline and task.project_id.date:
-                project_deadline = task.project_id.date
-                task_deadline = task.date_deadline
+        The network of each project is loaded in one query and the early/late
+        dates, floats and critical flags are written back with one UPDATE.
+        With ``changed_ids`` only the cones of the changed tasks are
+        recomputed (see CriticalPathNetwork.schedule).
+        """
+        fnames = [
+            "early_start",
+            "early_finish",
+            "late_start",
+            "late_finish",
+            "total_float",
+            "free_float",
+            "critical_path",
+        ]
+        self.env["project.task"].flush_model()
+        self.env["project.project"].flush_model(["date_start", "date"])
 
-                # Total float: days between task deadline and project deadline
-                total_float_days = (project_deadline - task_deadline).days
-                task.total_float = max(0, total_float_days)
+        for project in projects:
+            nodes, predecessors, phases = self._cpm_load_network(project)
+            if not nodes:
+                continue
+            try:
+                network = CriticalPathNetwork(
+                    nodes,
+                    predecessors,
+                    project_start=project.date_start or fields.Date.today(),
+                    project_finish=project.date,
+                )
+            except CyclicDependencyError as e:
+                names = self.browse(e.node_ids).mapped("name")
+                raise UserError(
+                    _("Cyclic task dependencies in project %(project)s: %(tasks)s")
+                    % {"project": project.name, "tasks": ", ".join(names)}
+                ) from e
 
-                # Free float: days to earliest successor
-                if task.dependent_ids:
-                    earliest_successor = min(
-                        task.dependent_ids.mapped("date_deadline") or [task_deadline]
-                    )
-                    free_float_days = (earliest_successor - task_deadline).days
-                    task.free_float = max(0, free_float_days)
+            touched = network.schedule(changed_ids)
+            rows = []
+            for task_id in touched:
+                node = nodes[task_id]
+                if phases[task_id]:
+                    total_float = free_float = 0
+                    critical = False
                 else:
-                    task.free_float = task.total_float
-            else:
-                task.total_float = 0
-                task.free_float = 0
+                    total_float = node["total_float"]
+                    free_float = node["free_float"]
+                    critical = total_float <= 0
+                rows.append(
+                    (
+                        task_id,
+                        node["early_start"],
+                        node["early_finish"],
+                        node["late_start"],
+                        node["late_finish"],
+                        total_float,
+                        free_float,
+                        critical,
+                    )
+                )
+            if not rows:
+                continue
+            values = SQL(", ").join(
+                SQL("(%s, %s::date, %s::date, %s::date, %s::date, %s, %s, %s)", *row)
+                for row in rows
+            )
+            self.env.cr.execute(
+                SQL(
+                    """
+                    UPDATE project_task AS t
+                       SET early_start = v.early_start,
+                           early_finish = v.early_finish,
+                           late_start = v.late_start,
+                           late_finish = v.late_finish,
+                           total_float = v.total_float,
+                           free_float = v.free_float,
+                           critical_path = v.critical_path
+                      FROM (VALUES %s) AS v(id, early_start, early_finish,
+                                            late_start, late_finish, total_float,
+                                            free_float, critical_path)
+                     WHERE t.id = v.id
+                    """,
+                    values,
+                )
+            )
+
+        self.env["project.task"].invalidate_model(fnames)
+
+    @api.model
+    def _cpm_backfill(self):
+        """
+        Schedule every project having tasks without CPM dates.
+
+        Used on install and upgrade: tasks existing before the early/late
+        columns were added keep NULL dates until their project is scheduled.
+        """
+        self.env["project.task"].flush_model()
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT project_id
+              FROM project_task
+             WHERE project_id IS NOT NULL AND active
+               AND (early_finish IS NULL OR late_finish IS NULL)
+            """
+        )
+        project_ids = [project_id for (project_id,) in self.env.cr.fetchall()]
+        self._cpm_schedule_projects(self.env["project.project"].browse(project_ids))
 
     @api.depends("timesheet_ids.unit_amount")
     def _compute_actual_hours(self):
@@ -161,35 +434,6 @@ class ProjectTask(models.Model):
             else:
                 task.actual_hours = 0.0
 
-    @api.depends("parent_id", "parent_id.wbs_code", "project_id")
-    def _compute_wbs_code(self):
-        """
-        Generate hierarchical WBS code.
-        Format: 1.2.3.1 (Project.Phase.Task.Subtask)
-        """
-        for task in self:
-            if task.parent_id and task.parent_id.wbs_code:
-                # Get sibling count for numbering
-                siblings = self.search(
-                    [("parent_id", "=", task.parent_id.id), ("id", "<=", task.id)],
-                    order="id",
-                )
-                sibling_num = len(siblings)
-                task.wbs_code = f"{task.parent_id.wbs_code}.{sibling_num}"
-            elif task.project_id:
-                # Top-level task
-                siblings = self.search(
-                    [
-                        ("project_id", "=", task.project_id.id),
-                        ("parent_id", "=", False),
-                        ("id", "<=", task.id),
-                    ],
-                    order="id",
-                )
-                task.wbs_code = str(len(siblings))
-            else:
-                task.wbs_code = ""
-
     @api.depends("planned_value", "progress")
     def _compute_earned_value(self):
         """Calculate Earned Value (EV) = PV × Progress"""
@@ -227,7 +471,7 @@ class ProjectTask(models.Model):
 
     def action_calculate_float(self):
         """Recalculate float values"""
-        self._compute_float()
+        self._cpm_schedule_projects(self.project_id)
         return {
             "type": "ir.actions.client",
             "tag": "display_notification",
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+from datetime import date
+
+from odoo.tests.common import BaseCase
+
+from ..models.cpm import CriticalPathNetwork, CyclicDependencyError
+
+START = date(2025, 1, 6)
+
+
+def node(duration, lag=0, deadline=None):
+    return {
+        "duration": duration,
+        "lag": lag,
+        "deadline": deadline,
+        "early_start": None,
+        "early_finish": None,
+        "late_start": None,
+        "late_finish": None,
+    }
+
+
+def day(offset):
+    return date.fromordinal(START.toordinal() + offset)
+
+
+class TestCriticalPathNetwork(BaseCase):
+    """
+    Test Coverage:
+    - Forward/backward pass dates
+    - Total and free float, lag and deadlines
+    - Cycle detection
+    - Incremental scheduling
+    """
+
+    def _network(self, nodes, predecessors, project_finish=None):
+        return CriticalPathNetwork(
+            nodes, predecessors, project_start=START, project_finish=project_finish
+        )
+
+    def _diamond(self):
+        # 1 (2d) -> 2 (3d) -> 4 (1d)
+        #        -> 3 (1d) ->
+        nodes = {1: node(2), 2: node(3), 3: node(1), 4: node(1)}
+        predecessors = {2: [1], 3: [1], 4: [2, 3]}
+        return nodes, predecessors
+
+    def test_forward_backward_pass(self):
+        nodes, predecessors = self._diamond()
+        touched = self._network(nodes, predecessors).schedule()
+
+        self.assertEqual(touched, {1, 2, 3, 4})
+        expected = {
+            # early_start, early_finish, late_start, late_finish
+            1: (day(0), day(2), day(0), day(2)),
+            2: (day(2), day(5), day(2), day(5)),
+            3: (day(2), day(3), day(4), day(5)),
+            4: (day(5), day(6), day(5), day(6)),
+        }
+        for task_id, dates in expected.items():
+            values = nodes[task_id]
+            self.assertEqual(
+                (
+                    values["early_start"],
+                    values["early_finish"],
+                    values["late_start"],
+                    values["late_finish"],
+                ),
+                dates,
+                f"task {task_id}",
+            )
+
+    def test_float(self):
+        nodes, predecessors = self._diamond()
+        nodes[5] = node(1)  # unconnected task
+        self._network(nodes, predecessors).schedule()
+
+        floats = {
+            task_id: (values["total_float"], values["free_float"])
+            for task_id, values in nodes.items()
+        }
+        self.assertEqual(
+            floats, {1: (0, 0), 2: (0, 0), 3: (2, 2), 4: (0, 0), 5: (5, 5)}
+        )
+
+    def test_lag_and_project_finish(self):
+        nodes = {1: node(2), 2: node(1, lag=3)}
+        self._network(nodes, {2: [1]}, project_finish=day(10)).schedule()
+
+        self.assertEqual(nodes[2]["early_start"], day(5))
+        self.assertEqual(nodes[2]["late_finish"], day(10))
+        self.assertEqual(nodes[1]["late_finish"], day(6))
+        self.assertEqual(nodes[1]["total_float"], 4)
+        self.assertEqual(nodes[1]["free_float"], 0)
+
+    def test_deadline_gives_negative_float(self):
+        nodes = {1: node(5, deadline=day(3))}
+        self._network(nodes, {}).schedule()
+
+        self.assertEqual(nodes[1]["late_finish"], day(3))
+        self.assertEqual(nodes[1]["total_float"], -2)
+
+    def test_cycle(self):
+        nodes = {1: node(1), 2: node(1), 3: node(1), 4: node(1)}
+        with self.assertRaises(CyclicDependencyError) as caught:
+            self._network(nodes, {1: [3], 2: [1], 3: [2], 4: [1]})
+        self.assertEqual(caught.exception.node_ids, [1, 2, 3, 4])
+
+    def test_unknown_predecessors_ignored(self):
+        # Archived or other-project predecessors are not part of the network
+        nodes = {1: node(2)}
+        self._network(nodes, {1: [99]}).schedule()
+        self.assertEqual(nodes[1]["early_start"], START)
+
+    def test_incremental_matches_full(self):
+        nodes, predecessors = self._diamond()
+        self._network(nodes, predecessors).schedule()
+
+        nodes[3]["duration"] = 5
+        touched = self._network(nodes, predecessors).schedule({3})
+        incremental = {task_id: dict(values) for task_id, values in nodes.items()}
+
+        full_nodes, _predecessors = self._diamond()
+        full_nodes[3]["duration"] = 5
+        self._network(full_nodes, predecessors).schedule()
+
+        self.assertIn(3, touched)
+        self.assertEqual(incremental, full_nodes)
+
+    def test_incremental_empty_touch_set(self):
+        nodes, predecessors = self._diamond()
+        self._network(nodes, predecessors).schedule()
+
+        # Changed tasks no longer in the network (archived, moved away)
+        self.assertEqual(self._network(nodes, predecessors).schedule({99}), set())
+        self.assertEqual(self._network(nodes, predecessors).schedule(set()), set())
+
+    def test_incremental_falls_back_to_full_on_missing_dates(self):
+        nodes, predecessors = self._diamond()
+        self._network(nodes, predecessors).schedule()
+        nodes[5] = node(1)
+
+        self.assertEqual(
+            self._network(nodes, predecessors).schedule({5}), {1, 2, 3, 4, 5}
+        )
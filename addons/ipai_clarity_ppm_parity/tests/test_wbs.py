@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import TransactionCase
+
+
+class TestWbsCodes(TransactionCase):
+    """
+    Unit tests for the maintained WBS codes.
+
+    Test Coverage:
+    - Numbering of inserted tasks and subtasks
+    - Moves across parents
+    - Archiving and deleting tasks close the gap
+    """
+
+    def setUp(self):
+        super().setUp()
+        # WBS codes only: the CPM schedule has its own tests
+        self.Task = self.env["project.task"].with_context(cpm_skip=True)
+        self.project = self.env["project.project"].create({"name": "WBS Project"})
+        self.task1, self.task2, self.task3, self.task4 = self.Task.create(
+            [
+                {"name": f"Task {number}", "project_id": self.project.id}
+                for number in range(1, 5)
+            ]
+        )
+
+    def _create_subtask(self, parent):
+        return self.Task.create(
+            {
+                "name": f"{parent.name} subtask",
+                "project_id": self.project.id,
+                "parent_id": parent.id,
+            }
+        )
+
+    def _codes(self, *tasks):
+        return [task.wbs_code for task in tasks]
+
+    def test_insert(self):
+        subtask = self._create_subtask(self.task2)
+        second = self._create_subtask(self.task2)
+
+        self.assertEqual(
+            self._codes(self.task1, self.task2, self.task3, self.task4),
+            ["1", "2", "3", "4"],
+        )
+        self.assertEqual(self._codes(subtask, second), ["2.1", "2.2"])
+
+    def test_move_across_parents(self):
+        subtask = self._create_subtask(self.task2)
+        second = self._create_subtask(self.task2)
+        leaf = self._create_subtask(subtask)
+
+        subtask.parent_id = self.task3
+
+        self.assertEqual(self._codes(second, subtask, leaf), ["2.1", "3.1", "3.1.1"])
+
+    def test_archive(self):
+        subtask = self._create_subtask(self.task3)
+
+        self.task1.active = False
+
+        self.assertEqual(
+            self._codes(self.task2, self.task3, subtask, self.task4),
+            ["1", "2", "2.1", "3"],
+        )
+
+        self.task1.active = True
+        self.assertEqual(
+            self._codes(self.task1, self.task2, self.task3, subtask, self.task4),
+            ["1", "2", "3", "3.1", "4"],
+        )
+
+    def test_delete(self):
+        subtask = self._create_subtask(self.task3)
+        second = self._create_subtask(self.task3)
+
+        self.task2.unlink()
+        self.assertEqual(
+            self._codes(self.task1, self.task3, subtask, second, self.task4),
+            ["1", "2", "2.1", "2.2", "3"],
+        )
+
+        subtask.unlink()
+        self.assertEqual(self._codes(self.task3, second), ["2", "2.1"])
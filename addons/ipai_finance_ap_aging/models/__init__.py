@@ -1,3 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from . import account_move_line
+from . import (
+    account_move,
+    account_move_line,
+    account_partial_reconcile,
+    ap_aging_partner,
+)
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class AccountMove(models.Model):
+    """Keep the materialized AP aging current when entries change state."""
+
+    _inherit = "account.move"
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        posted.line_ids._ap_aging_refresh()
+        return posted
+
+    def button_draft(self):
+        res = super().button_draft()
+        self.line_ids._ap_aging_refresh()
+        return res
+
+    def button_cancel(self):
+        res = super().button_cancel()
+        self.line_ids._ap_aging_refresh()
+        return res
@@ -24,10 +24,50 @@ class AccountMoveLine(models.Model):
 
     _inherit = "account.move.line"
 
+    # Line fields written directly that change the AP aging of their partner.
+    # amount_residual, reconciled and parent_state are stored computes, never
+    # in write() vals: the reconcile and post/draft/cancel hooks cover them.
+    _AP_AGING_FIELDS = {"account_id", "partner_id", "date_maturity"}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._ap_aging_refresh()
+        return lines
+
+    def write(self, vals):
+        if not self._AP_AGING_FIELDS & set(vals):
+            return super().write(vals)
+        partner_ids = self._ap_aging_partner_ids()
+        res = super().write(vals)
+        self._ap_aging_refresh(partner_ids)
+        return res
+
+    def unlink(self):
+        partner_ids = self._ap_aging_partner_ids()
+        res = super().unlink()
+        self.env["ipai.ap.aging.partner"].sudo()._refresh_partners(partner_ids)
+        return res
+
+    def _ap_aging_partner_ids(self):
+        """Partners of the payable lines in ``self``."""
+        return set(
+            self.filtered(
+                lambda line: line.account_id.account_type == "liability_payable"
+            ).partner_id.ids
+        )
+
+    def _ap_aging_refresh(self, extra_partner_ids=()):
+        """Re-aggregate the materialized AP aging of the lines' partners."""
+        partner_ids = self._ap_aging_partner_ids() | set(extra_partner_ids)
+        if partner_ids:
+            self.env["ipai.ap.aging.partner"].sudo()._refresh_partners(partner_ids)
+
     @api.model
     def cron_generate_ap_aging_snapshot(self, employee_code="RIM"):
         """
-        Calculate AP Aging buckets for specified employee context.
+        Read AP Aging buckets for specified employee context from the
+        materialized ipai.ap.aging.partner table.
         Trigger n8n webhook with heatmap data.
 
         Args:
@@ -40,60 +80,13 @@ class AccountMoveLine(models.Model):
             f"Starting AP Aging snapshot generation for employee: {employee_code}"
         )
 
-        # SQL Query for Aging Buckets with optimized indexing
-        query = """
-            SELECT
-                p.id AS partner_id,
-                p.name AS vendor_name,
-                p.vat AS vendor_vat,
-                SUM(CASE
-                    WHEN aml.date_maturity IS NULL THEN aml.amount_residual
-                    WHEN CURRENT_DATE - aml.date_maturity <= 30
-                    THEN aml.amount_residual
-                    ELSE 0
-                END) AS bucket_0_30,
-                SUM(CASE
-                    WHEN aml.date_maturity IS NOT NULL
-                    AND CURRENT_DATE - aml.date_maturity BETWEEN 31 AND 60
-                    THEN aml.amount_residual
-                    ELSE 0
-                END) AS bucket_31_60,
-                SUM(CASE
-                    WHEN aml.date_maturity IS NOT NULL
-                    AND CURRENT_DATE - aml.date_maturity BETWEEN 61 AND 90
-                    THEN aml.amount_residual
-                    ELSE 0
-                END) AS bucket_61_90,
-                SUM(CASE
-                    WHEN aml.date_maturity IS NOT NULL
-                    AND CURRENT_DATE - aml.date_maturity > 90
-                    THEN aml.amount_residual
-                    ELSE 0
-                END) AS bucket_90_plus,
-                SUM(aml.amount_residual) AS total_outstanding,
-                MAX(aml.date_maturity) AS latest_due_date,
-                COUNT(DISTINCT aml.move_id) AS invoice_count
-            FROM account_move_line aml
-            JOIN res_partner p ON aml.partner_id = p.id
-            JOIN account_account aa ON aml.account_id = aa.id
-            LEFT JOIN res_users u ON aml.create_uid = u.id
-            LEFT JOIN hr_employee e ON u.id = e.user_id
-            WHERE aa.account_type = 'liability_payable'
-                AND aml.amount_residual > 0
-                AND aml.reconciled = FALSE
-                AND aml.parent_state = 'posted'
-                AND (e.code = %s OR %s = 'ALL' OR e.code IS NULL)
-            GROUP BY p.id, p.name, p.vat
-            HAVING SUM(aml.amount_residual) > 0
-            ORDER BY SUM(aml.amount_residual) DESC
-            LIMIT 20
-        """
-
         try:
-            self.env.cr.execute(query, (employee_code, employee_code))
-            results = self.env.cr.dictfetchall()
+            # Read the materialized per-partner aging (kept current by hooks)
+            results = (
+                self.env["ipai.ap.aging.partner"].sudo().get_top_vendors(employee_code)
+            )
 
-            _logger.info(f"AP Aging query returned {len(results)} vendors")
+            _logger.info(f"AP Aging snapshot returned {len(results)} vendors")
 
             # Format for n8n webhook and heatmap
             heatmap_data = {
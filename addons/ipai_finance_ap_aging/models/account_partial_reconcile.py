@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, models
+
+
+class AccountPartialReconcile(models.Model):
+    """Keep the materialized AP aging current on (un)reconciliation."""
+
+    _inherit = "account.partial.reconcile"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        (partials.debit_move_id | partials.credit_move_id)._ap_aging_refresh()
+        return partials
+
+    def unlink(self):
+        lines = self.debit_move_id | self.credit_move_id
+        res = super().unlink()
+        lines.exists()._ap_aging_refresh()
+        return res
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+# First age (days past maturity) of the 31-60, 61-90 and 90+ buckets
+AGING_BOUNDARIES = (31, 61, 91)
+
+# Last date the nightly re-bucketing ran (ir.config_parameter)
+LAST_REBUCKET_PARAM = "ipai_finance_ap_aging.last_rebucket_date"
+
+# Aggregates open payable lines into per-partner/per-employee aging rows.
+# A concurrent refresh of the same partner conflicts on the unique index
+# (a serialization failure under REPEATABLE READ, retried by Odoo) instead of
+# inserting a second row.
+AGING_INSERT_QUERY = """
+    INSERT INTO ipai_ap_aging_partner (
+        partner_id, employee_code, bucket_0_30, bucket_31_60, bucket_61_90,
+        bucket_90_plus, total_outstanding, latest_due_date, invoice_count,
+        as_of_date, create_date, write_date
+    )
+    SELECT
+        aml.partner_id,
+        e.code,
+        SUM(CASE
+            WHEN aml.date_maturity IS NULL THEN aml.amount_residual
+            WHEN %(today)s - aml.date_maturity <= 30 THEN aml.amount_residual
+            ELSE 0
+        END),
+        SUM(CASE
+            WHEN aml.date_maturity IS NOT NULL
+            AND %(today)s - aml.date_maturity BETWEEN 31 AND 60
+            THEN aml.amount_residual
+            ELSE 0
+        END),
+        SUM(CASE
+            WHEN aml.date_maturity IS NOT NULL
+            AND %(today)s - aml.date_maturity BETWEEN 61 AND 90
+            THEN aml.amount_residual
+            ELSE 0
+        END),
+        SUM(CASE
+            WHEN aml.date_maturity IS NOT NULL
+            AND %(today)s - aml.date_maturity > 90
+            THEN aml.amount_residual
+            ELSE 0
+        END),
+        SUM(aml.amount_residual),
+        MAX(aml.date_maturity),
+        COUNT(DISTINCT aml.move_id),
+        %(today)s,
+        NOW() AT TIME ZONE 'UTC',
+        NOW() AT TIME ZONE 'UTC'
+    FROM account_move_line aml
+    JOIN account_account aa ON aml.account_id = aa.id
+    LEFT JOIN res_users u ON aml.create_uid = u.id
+    LEFT JOIN hr_employee e ON u.id = e.user_id
+    WHERE aa.account_type = 'liability_payable'
+        AND aml.partner_id IS NOT NULL
+        AND aml.amount_residual > 0
+        AND aml.reconciled = FALSE
+        AND aml.parent_state = 'posted'
+        {partner_filter}
+    GROUP BY aml.partner_id, e.code
+    ON CONFLICT (partner_id, (COALESCE(employee_code, ''))) DO UPDATE SET
+        bucket_0_30 = EXCLUDED.bucket_0_30,
+        bucket_31_60 = EXCLUDED.bucket_31_60,
+        bucket_61_90 = EXCLUDED.bucket_61_90,
+        bucket_90_plus = EXCLUDED.bucket_90_plus,
+        total_outstanding = EXCLUDED.total_outstanding,
+        latest_due_date = EXCLUDED.latest_due_date,
+        invoice_count = EXCLUDED.invoice_count,
+        as_of_date = EXCLUDED.as_of_date,
+        write_date = EXCLUDED.write_date
+"""
+
+
+class APAgingPartner(models.Model):
+    """
+    Materialized AP aging per vendor and employee context.
+
+    Rows are kept current by posting, reset-to-draft and reconciliation
+    hooks, which re-aggregate only the partners they touch. A nightly step
+    re-buckets only the partners having lines whose age crossed a 30/60/90
+    day boundary since the last run. Dashboards, the heatmap and n8n read
+    this table instead of scanning every open payable line.
+    """
+
+    _name = "ipai.ap.aging.partner"
+    _description = "AP Aging by Partner"
+    _order = "total_outstanding desc"
+
+    partner_id = fields.Many2one(
+        "res.partner", string="Vendor", required=True, index=True, ondelete="cascade"
+    )
+    employee_code = fields.Char(string="Employee Code", index=True)
+    bucket_0_30 = fields.Float(string="0-30 Days")
+    bucket_31_60 = fields.Float(string="31-60 Days")
+    bucket_61_90 = fields.Float(string="61-90 Days")
+    bucket_90_plus = fields.Float(string="90+ Days")
+    total_outstanding = fields.Float(string="Total Outstanding")
+    latest_due_date = fields.Date(string="Latest Due Date")
+    invoice_count = fields.Integer(string="Invoices")
+    as_of_date = fields.Date(string="Bucketed As Of")
+
+    def init(self):
+        # One row per partner and employee context (NULL included); rows
+        # duplicated by concurrent refreshes before the index are dropped
+        self.env.cr.execute(
+            f"""
+            DELETE FROM {self._table} a
+            USING {self._table} b
+            WHERE a.partner_id = b.partner_id
+                AND COALESCE(a.employee_code, '') = COALESCE(b.employee_code, '')
+                AND a.id < b.id
+            """
+        )
+        tools.create_unique_index(
+            self.env.cr,
+            "ipai_ap_aging_partner_partner_employee_uniq",
+            self._table,
+            ["partner_id", "COALESCE(employee_code, '')"],
+        )
+
+    @api.model
+    def _refresh_partners(self, partner_ids):
+        """
+        Re-aggregate the aging rows of the given partners.
+
+        Args:
+            partner_ids: iterable of res.partner ids
+        """
+        partner_ids = list({pid for pid in partner_ids if pid})
+        if not partner_ids:
+            return
+
+        self.env["account.move.line"].flush_model()
+        self.env["account.move"].flush_model()
+        self.env.cr.execute(
+            "DELETE FROM ipai_ap_aging_partner WHERE partner_id = ANY(%s)",
+            (partner_ids,),
+        )
+        self.env.cr.execute(
+            AGING_INSERT_QUERY.format(
+                partner_filter="AND aml.partner_id = ANY(%(partner_ids)s)"
+            ),
+            {"today": fields.Date.context_today(self), "partner_ids": partner_ids},
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self):
+        """Rebuild the whole table from open payable lines (initial load)."""
+        self.env["account.move.line"].flush_model()
+        self.env["account.move"].flush_model()
+        self.env.cr.execute("DELETE FROM ipai_ap_aging_partner")
+        self.env.cr.execute(
+            AGING_INSERT_QUERY.format(partner_filter=""),
+            {"today": fields.Date.context_today(self)},
+        )
+        self.invalidate_model()
+        self.env["ir.config_parameter"].sudo().set_param(
+            LAST_REBUCKET_PARAM, fields.Date.to_string(fields.Date.context_today(self))
+        )
+        _logger.info("Rebuilt AP aging table")
+
+    @api.model
+    def cron_rebucket_aging(self):
+        """
+        Nightly step: re-bucket partners whose lines changed bucket.
+
+        A line moves to the next bucket on its 31st, 61st and 91st day past
+        maturity, so only lines whose maturity date falls in the window
+        crossed since the last run need to be re-aggregated.
+        """
+        params = self.env["ir.config_parameter"].sudo()
+        today = fields.Date.context_today(self)
+        last_run = fields.Date.to_date(params.get_param(LAST_REBUCKET_PARAM))
+
+        if not last_run:
+            self._rebuild()
+            return
+        if last_run >= today:
+            return
+
+        self.env["account.move.line"].flush_model()
+        windows = []
+        args = []
+        for boundary in AGING_BOUNDARIES:
+            windows.append("(aml.date_maturity > %s AND aml.date_maturity <= %s)")
+            args += [
+                last_run - timedelta(days=boundary),
+                today - timedelta(days=boundary),
+            ]
+        self.env.cr.execute(
+            f"""
+            SELECT DISTINCT aml.partner_id
+            FROM account_move_line aml
+            JOIN account_account aa ON aml.account_id = aa.id
+            WHERE aa.account_type = 'liability_payable'
+                AND aml.partner_id IS NOT NULL
+                AND aml.reconciled = FALSE
+                AND aml.parent_state = 'posted'
+                AND ({" OR ".join(windows)})
+            """,
+            args,
+        )
+        partner_ids = [row[0] for row in self.env.cr.fetchall()]
+        self._refresh_partners(partner_ids)
+        params.set_param(LAST_REBUCKET_PARAM, fields.Date.to_string(today))
+        _logger.info(f"Re-bucketed AP aging for {len(partner_ids)} partners")
+
+    @api.model
+    def get_top_vendors(self, employee_code="RIM", limit=20):
+        """
+        Read the aging of the top vendors for an employee context.
+
+        Rows without employee context are included for every employee, as
+        in the original per-line query. 'ALL' returns every context.
+
+        Returns:
+            list: dicts with partner, bucket and total columns
+        """
+        self.env.cr.execute(
+            """
+            SELECT
+                p.id AS partner_id,
+                p.name AS vendor_name,
+                p.vat AS vendor_vat,
+                SUM(a.bucket_0_30) AS bucket_0_30,
+                SUM(a.bucket_31_60) AS bucket_31_60,
+                SUM(a.bucket_61_90) AS bucket_61_90,
+                SUM(a.bucket_90_plus) AS bucket_90_plus,
+                SUM(a.total_outstanding) AS total_outstanding,
+                MAX(a.latest_due_date) AS latest_due_date,
+                SUM(a.invoice_count) AS invoice_count
+            FROM ipai_ap_aging_partner a
+            JOIN res_partner p ON a.partner_id = p.id
+            WHERE (a.employee_code = %s OR %s = 'ALL' OR a.employee_code IS NULL)
+            GROUP BY p.id, p.name, p.vat
+            HAVING SUM(a.total_outstanding) > 0
+            ORDER BY SUM(a.total_outstanding) DESC
+            LIMIT %s
+            """,
+            (employee_code, employee_code, limit),
+        )
+        return self.env.cr.dictfetchall()
@@ -5,6 +5,8 @@ from unittest.mock import patch
 
 from odoo.tests import TransactionCase
 
+from ..models.ap_aging_partner import AGING_INSERT_QUERY
+
 
 class TestAPAging(TransactionCase):
     """
@@ -287,3 +289,54 @@ class TestAPAging(TransactionCase):
             float(result["vendors"][0]["total_outstanding"]),
             float(result["vendors"][1]["total_outstanding"]),
         )
+
+    def test_nightly_rebucket_moves_crossed_lines(self):
+        """Test that the nightly step re-buckets lines crossing a boundary"""
+        aging = self.env["ipai.ap.aging.partner"]
+        date_maturity = (datetime.now() - timedelta(days=32)).date()
+        self._create_test_move_line(10000.00, date_maturity)
+
+        # Simulate rows bucketed three days ago, when the line was 29 days old
+        self.env.cr.execute(
+            """
+            UPDATE ipai_ap_aging_partner
+            SET bucket_0_30 = bucket_31_60, bucket_31_60 = 0
+            WHERE partner_id = %s
+            """,
+            (self.vendor.id,),
+        )
+        aging.invalidate_model()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "ipai_finance_ap_aging.last_rebucket_date",
+            (datetime.now() - timedelta(days=3)).date().isoformat(),
+        )
+
+        aging.cron_rebucket_aging()
+
+        row = aging.search([("partner_id", "=", self.vendor.id)])
+        self.assertEqual(row.bucket_0_30, 0)
+        self.assertEqual(row.bucket_31_60, 10000.00, "Line should move to 31-60")
+
+    def test_refresh_keeps_one_row_per_partner(self):
+        """Test that a refresh conflicting with an existing row updates it"""
+        aging = self.env["ipai.ap.aging.partner"]
+        self._create_test_move_line(10000.00, datetime.now().date())
+        rows = aging.search([("partner_id", "=", self.vendor.id)])
+
+        # Rows of a concurrent refresh (invisible to the DELETE) are updated
+        aging.flush_model()
+        self.env.cr.execute(
+            AGING_INSERT_QUERY.format(
+                partner_filter="AND aml.partner_id = ANY(%(partner_ids)s)"
+            ),
+            {"today": datetime.now().date(), "partner_ids": [self.vendor.id]},
+        )
+        aging.invalidate_model()
+
+        self.assertEqual(aging.search([("partner_id", "=", self.vendor.id)]), rows)
+        vendors = [
+            row
+            for row in aging.get_top_vendors("ALL", limit=1000)
+            if row["partner_id"] == self.vendor.id
+        ]
+        self.assertEqual(float(vendors[0]["total_outstanding"]), 10000.00)
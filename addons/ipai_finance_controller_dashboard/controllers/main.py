@@ -14,7 +14,7 @@ class FinanceControllerDashboardController(http.Controller):
     """
     Finance Controller Dashboard HTTP Routes
 
-    Provides 7 routes for Finance Controller Dashboard:
+    Provides 8 routes for Finance Controller Dashboard:
     1. Main dashboard page (/ipai/finance/controller/dashboard)
     2. KPI Gauges API (/ipai/finance/controller/api/kpi_gauges)
     3. Calendar Heatmap API (/ipai/finance/controller/api/calendar_heatmap)
@@ -22,8 +22,22 @@ class FinanceControllerDashboardController(http.Controller):
     5. Gantt Chart API (/ipai/finance/controller/api/gantt)
     6. RACI Sunburst API (/ipai/finance/controller/api/raci_sunburst)
     7. Dependency Graph API (/ipai/finance/controller/api/dependency_graph)
+    8. Dashboard Payload API (/ipai/finance/controller/api/payload)
+
+    The widget APIs serve the latest KPI snapshot (see
+    finance.controller.kpi.get_dashboard_payload) instead of recomputing it.
+    The dashboard page loads every widget with one Dashboard Payload request,
+    revalidated by the browser with its ETag.
     """
 
+    def _get_widget(self, employee_code, widget):
+        payload = (
+            request.env["finance.controller.kpi"]
+            .sudo()
+            .get_dashboard_payload(employee_code, widgets=[widget])
+        )
+        return payload["widgets"][widget]
+
     @http.route(
         "/ipai/finance/controller/dashboard", type="http", auth="user", website=True
     )
@@ -63,11 +77,7 @@ class FinanceControllerDashboardController(http.Controller):
                 'daily_completion_pct': list of dict (7 days)
             }
         """
-        return (
-            request.env["finance.controller.kpi"]
-            .sudo()
-            .get_kpi_gauge_data(employee_code)
-        )
+        return self._get_widget(employee_code, "gauges")
 
     @http.route(
         "/ipai/finance/controller/api/calendar_heatmap", type="json", auth="user"
@@ -82,27 +92,30 @@ class FinanceControllerDashboardController(http.Controller):
                 'milestones': list of dict with {date, type, label}
             }
         """
-        return (
-            request.env["finance.controller.kpi"]
-            .sudo()
-            .get_calendar_heatmap_data(employee_code)
-        )
+        return self._get_widget(employee_code, "calendar")
 
     @http.route("/ipai/finance/controller/api/wbs_tree", type="json", auth="user")
-    def api_wbs_tree(self, employee_code="RIM"):
+    def api_wbs_tree(self, employee_code="RIM", max_depth=None, node_id=None):
         """
         WBS Tree API - Task hierarchy
 
+        Args:
+            employee_code (str): Employee code for filtering
+            max_depth (int): Levels to render; deeper nodes are 'collapsed'
+            node_id (int): Collapsed node to expand
+
         Returns:
             dict: {
                 'name': 'root',
                 'children': list of nested dict with task hierarchy
             }
         """
+        if max_depth is None and node_id is None:
+            return self._get_widget(employee_code, "wbs")
         return (
             request.env["finance.controller.kpi"]
             .sudo()
-            .get_wbs_tree_data(employee_code)
+            .get_wbs_tree_data(employee_code, max_depth=max_depth, node_id=node_id)
         )
 
     @http.route("/ipai/finance/controller/api/gantt", type="json", auth="user")
@@ -121,9 +134,7 @@ class FinanceControllerDashboardController(http.Controller):
                 }
             ]
         """
-        return (
-            request.env["finance.controller.kpi"].sudo().get_gantt_data(employee_code)
-        )
+        return self._get_widget(employee_code, "gantt")
 
     @http.route("/ipai/finance/controller/api/raci_sunburst", type="json", auth="user")
     def api_raci_sunburst(self, employee_code="RIM"):
@@ -136,27 +147,70 @@ class FinanceControllerDashboardController(http.Controller):
                 'children': list of nested dict with RACI hierarchy
             }
         """
-        return (
-            request.env["finance.controller.kpi"]
-            .sudo()
-            .get_raci_sunburst_data(employee_code)
-        )
+        return self._get_widget(employee_code, "raci")
 
     @http.route(
         "/ipai/finance/controller/api/dependency_graph", type="json", auth="user"
     )
-    def api_dependency_graph(self, employee_code="RIM"):
+    def api_dependency_graph(self, employee_code="RIM", max_depth=None, node_id=None):
         """
         Dependency Graph API - Task prerequisite network
 
+        Args:
+            employee_code (str): Employee code for filtering
+            max_depth (int): Levels to render; deeper nodes are 'collapsed'
+            node_id (int): Collapsed node to expand
+
         Returns:
             dict: {
                 'nodes': list of dict {id, name, category},
                 'links': list of dict {source, target}
             }
         """
+        if max_depth is None and node_id is None:
+            return self._get_widget(employee_code, "dependencies")
         return (
             request.env["finance.controller.kpi"]
             .sudo()
-            .get_dependency_graph_data(employee_code)
+            .get_dependency_graph_data(
+                employee_code, max_depth=max_depth, node_id=node_id
+            )
+        )
+
+    @http.route(
+        "/ipai/finance/controller/api/payload",
+        type="http",
+        auth="user",
+        methods=["GET"],
+    )
+    def api_payload(self, employee_code="RIM", widgets=None, **kwargs):
+        """
+        Dashboard Payload API - versioned snapshot with conditional GET
+
+        Args:
+            employee_code (str): Employee code for filtering
+            widgets (str): Comma-separated widgets to return (default: all)
+
+        Returns:
+            304 if If-None-Match matches the payload ETag, otherwise the
+            JSON payload of finance.controller.kpi.get_dashboard_payload
+        """
+        if_none_match = request.httprequest.if_none_match
+        etag = next(iter(if_none_match.as_set()), None) if if_none_match else None
+        payload = (
+            request.env["finance.controller.kpi"]
+            .sudo()
+            .get_dashboard_payload(
+                employee_code,
+                widgets=widgets.split(",") if widgets else None,
+                etag=etag,
+            )
         )
+
+        if payload["not_modified"]:
+            response = request.make_response("", status=304)
+        else:
+            response = request.make_json_response(payload)
+        response.set_etag(payload["etag"])
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
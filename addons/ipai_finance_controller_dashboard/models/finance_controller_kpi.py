@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import json
 import logging
-from datetime import datetime, timedelta
+import zlib
+from collections import Counter, defaultdict
+from datetime import timedelta
 
-from odoo.tools import DEFAULT_SERVER_DATE_FORMAT
+from odoo import api, fields, models, tools
 
-from odoo import api, fields, models
+from .kpi_graph import AdjacencyIndex, build_nested_counts
 
 _logger = logging.getLogger(__name__)
 
@@ -22,6 +25,15 @@ class FinanceControllerKPI(models.Model):
     4. get_gantt_data() - Task execution timeline
     5. get_raci_sunburst_data() - Responsibility distribution
     6. get_dependency_graph_data() - Task prerequisite network
+
+    All widgets are computed in memory from one load of the month-end close
+    tasks (see _load_kpi_frame), so build_kpi_snapshots serves any number of
+    employees with the same handful of queries.
+
+    The dashboard RPCs serve the latest stored snapshot (see
+    get_dashboard_payload) and only recompute it when it is stale: a trigger
+    on the task table counts the changes per owner (see init), so a snapshot
+    goes stale when its owner's, unowned or BIR tasks change.
     """
 
     _name = "finance.controller.kpi"
@@ -33,6 +45,83 @@ class FinanceControllerKPI(models.Model):
         string="Snapshot Date", default=fields.Date.context_today, required=True
     )
     kpi_data = fields.Text(string="KPI JSON Data")
+    task_version = fields.Char(
+        string="Task Version",
+        readonly=True,
+        help="Task change counters of the owner the snapshot was built from",
+    )
+
+    # Widgets of a snapshot, in dashboard order
+    DASHBOARD_WIDGETS = ("gauges", "calendar", "wbs", "gantt", "raci", "dependencies")
+
+    # Task version scopes shared by every owner's snapshot (see init)
+    UNOWNED_SCOPE = ""
+    BIR_SCOPE = "#bir"
+
+    def init(self):
+        """
+        Task change counters, bumped by a trigger on the month-end close tasks.
+
+        The task table belongs to another module and has no write date, so
+        each insert, update or delete bumps the counter of the task owner
+        (UNOWNED_SCOPE without owner) and, for BIR tasks, BIR_SCOPE: reading
+        an owner's version is a primary key lookup of three rows.
+        """
+        self.env.cr.execute(
+            """
+            CREATE TABLE IF NOT EXISTS finance_controller_task_version (
+                scope varchar PRIMARY KEY,
+                version bigint NOT NULL
+            );
+
+            CREATE OR REPLACE FUNCTION finance_controller_bump_task_version()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            DECLARE
+                scopes text[] := '{}';
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    scopes := scopes || coalesce(OLD.owner_code::text, %(unowned)s);
+                    IF OLD.bir_form_code IS NOT NULL THEN
+                        scopes := scopes || %(bir)s::text;
+                    END IF;
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    scopes := scopes || coalesce(NEW.owner_code::text, %(unowned)s);
+                    IF NEW.bir_form_code IS NOT NULL THEN
+                        scopes := scopes || %(bir)s::text;
+                    END IF;
+                END IF;
+                -- Sorted so concurrent writers lock the counters in one order
+                INSERT INTO finance_controller_task_version AS v (scope, version)
+                SELECT DISTINCT scope, 1 FROM unnest(scopes) AS scope ORDER BY scope
+                ON CONFLICT (scope) DO UPDATE SET version = v.version + 1;
+                RETURN NULL;
+            END;
+            $$;
+            """,
+            {"unowned": self.UNOWNED_SCOPE, "bir": self.BIR_SCOPE},
+        )
+        self._install_task_version_trigger()
+
+    def _install_task_version_trigger(self):
+        self.env.cr.execute("SELECT to_regclass('ipai_finance_monthly_close')")
+        if not self.env.cr.fetchone()[0]:
+            _logger.warning(
+                "ipai_finance_monthly_close not found: KPI snapshots are only "
+                "refreshed daily"
+            )
+            return
+        self.env.cr.execute(
+            """
+            DROP TRIGGER IF EXISTS finance_controller_task_version
+                ON ipai_finance_monthly_close;
+            CREATE TRIGGER finance_controller_task_version
+                AFTER INSERT OR UPDATE OR DELETE ON ipai_finance_monthly_close
+                FOR EACH ROW EXECUTE FUNCTION finance_controller_bump_task_version();
+            """
+        )
 
     @api.model
     def get_kpi_gauge_data(self, employee_code="RIM"):
@@ -49,51 +138,190 @@ class FinanceControllerKPI(models.Model):
                 'daily_completion_pct': list of dict (7 days)
             }
         """
-        # Query Month-End Close tasks
-        query_timeliness = """
-            SELECT
-                COUNT(*) FILTER (WHERE mec.actual_completion_date <= mec.target_completion_date) AS on_time_count,
-                COUNT(*) AS total_count
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.owner_code = %s
-                AND mec.status = 'completed'
-                AND mec.actual_completion_date >= CURRENT_DATE - INTERVAL '30 days'
+        frame = self._load_kpi_frame([employee_code], gauges=True)
+        return self._compute_kpi_gauges(frame, employee_code)
+
+    @api.model
+    def get_calendar_heatmap_data(self, employee_code="RIM"):
         """
-        self.env.cr.execute(query_timeliness, (employee_code,))
-        timeliness_result = self.env.cr.dictfetchone()
-        timeliness_pct = (
-            (
-                timeliness_result["on_time_count"]
-                / timeliness_result["total_count"]
-                * 100
-            )
-            if timeliness_result["total_count"] > 0
-            else 0
+        Calendar Heatmap Data - Workload density + BIR milestones
+
+        Returns:
+            dict: {
+                'heatmap_data': list of [date, task_count],
+                'milestones': list of dict with {date, type, label}
+            }
+        """
+        frame = self._load_kpi_frame([employee_code])
+        return self._compute_calendar_heatmap(frame, employee_code)
+
+    @api.model
+    def get_wbs_tree_data(self, employee_code="RIM", max_depth=None, node_id=None):
+        """
+        WBS Tree Data - Task hierarchy
+
+        Args:
+            employee_code (str): Employee code for filtering
+            max_depth (int): Levels to render (default: all); nodes with
+                hidden children are marked 'collapsed'
+            node_id (int): Task to expand lazily (default: the roots)
+
+        Returns:
+            dict: {
+                'name': 'root',
+                'children': list of nested dict with task hierarchy
+            }
+        """
+        frame = self._load_kpi_frame([employee_code])
+        # Node ids are rendered as strings in the payloads
+        return self._compute_wbs_tree(
+            frame,
+            employee_code,
+            max_depth=int(max_depth) if max_depth is not None else None,
+            node_id=int(node_id) if node_id else None,
+        )
+
+    @api.model
+    def get_gantt_data(self, employee_code="RIM"):
+        """
+        Gantt Chart Data - Task execution timeline
+
+        Returns:
+            list: [
+                {
+                    'name': 'Task Name',
+                    'start': 'YYYY-MM-DD',
+                    'end': 'YYYY-MM-DD',
+                    'owner': 'RIM',
+                    'phase': 'Phase 1'
+                }
+            ]
+        """
+        frame = self._load_kpi_frame([employee_code])
+        return self._compute_gantt(frame, employee_code)
+
+    @api.model
+    def get_raci_sunburst_data(self, employee_code="RIM"):
+        """
+        RACI Sunburst Data - Responsibility distribution
+
+        The distribution covers every owner, whatever the employee context.
+
+        Returns:
+            dict: {
+                'name': 'root',
+                'children': list of nested dict with RACI hierarchy
+            }
+        """
+        frame = self._load_kpi_frame(None)
+        return self._compute_raci_sunburst(frame)
+
+    @api.model
+    def get_dependency_graph_data(
+        self, employee_code="RIM", max_depth=None, node_id=None
+    ):
+        """
+        Dependency Graph Data - Task prerequisite network
+
+        Args:
+            employee_code (str): Employee code for filtering
+            max_depth (int): Levels to render (default: all); see
+                get_wbs_tree_data
+            node_id (int): Task to expand lazily (default: the roots)
+
+        Returns:
+            dict: {
+                'nodes': list of dict {id, name, category},
+                'links': list of dict {source, target}
+            }
+        """
+        frame = self._load_kpi_frame([employee_code])
+        # Node ids are rendered as strings in the payloads
+        return self._compute_dependency_graph(
+            frame,
+            employee_code,
+            max_depth=int(max_depth) if max_depth is not None else None,
+            node_id=int(node_id) if node_id else None,
         )
 
-        # Query reconciliation rate (example: bank reconciliation completion)
-        query_reconciliation = """
+    # ------------------------------------------------------------------
+    # Snapshot frame: every widget is computed from the same in-memory rows
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _load_kpi_frame(self, employee_codes, gauges=False):
+        """
+        Load the rows every dashboard widget is computed from.
+
+        Args:
+            employee_codes (list): Employee codes to load, None for all owners
+            gauges (bool): Also load the gauge-only aggregates (BIR filing
+                rate, closing adjustments)
+
+        Returns:
+            dict: {
+                'today': date,
+                'tasks': list of task dicts (WBS order),
+                'by_owner': {owner_code: list of task dicts},
+                'employee_codes': list of str,
+                'filing_rate': float (if gauges),
+                'adjustments': {employee_code: int} (if gauges)
+            }
+        """
+        query_tasks = """
             SELECT
-                COUNT(*) FILTER (WHERE mec.status = 'completed') AS reconciled_count,
-                COUNT(*) AS total_count
+                mec.id,
+                mec.name AS task_name,
+                mec.parent_id,
+                mec.owner_code,
+                mec.cluster_classification,
+                mec.raci_role,
+                mec.status,
+                mec.bir_form_code,
+                DATE(mec.target_completion_date) AS target_date,
+                DATE(mec.actual_completion_date) AS actual_date,
+                DATE(mec.created_at) AS created_date
             FROM ipai_finance_monthly_close mec
-            WHERE mec.owner_code = %s
-                AND mec.name ILIKE '%%reconciliation%%'
-                AND mec.created_at >= CURRENT_DATE - INTERVAL '30 days'
+            {where}
+            ORDER BY mec.parent_id NULLS FIRST, mec.sequence ASC
         """
-        self.env.cr.execute(query_reconciliation, (employee_code,))
-        reconciliation_result = self.env.cr.dictfetchone()
-        reconciliation_pct = (
-            (
-                reconciliation_result["reconciled_count"]
-                / reconciliation_result["total_count"]
-                * 100
+        if employee_codes is None:
+            self.env.cr.execute(query_tasks.format(where=""))
+        else:
+            # Unowned tasks belong to every WBS, BIR tasks to every calendar
+            self.env.cr.execute(
+                query_tasks.format(
+                    where="""
+                        WHERE mec.owner_code = ANY(%s)
+                            OR mec.owner_code IS NULL
+                            OR mec.bir_form_code IS NOT NULL
+                    """
+                ),
+                (list(employee_codes),),
             )
-            if reconciliation_result["total_count"] > 0
-            else 0
-        )
+        tasks = self.env.cr.dictfetchall()
+
+        by_owner = defaultdict(list)
+        for task in tasks:
+            by_owner[task["owner_code"]].append(task)
+
+        if employee_codes is None:
+            employee_codes = sorted(code for code in by_owner if code)
+
+        frame = {
+            "today": fields.Date.today(),
+            "tasks": tasks,
+            "by_owner": by_owner,
+            "employee_codes": list(employee_codes),
+        }
+        if gauges:
+            frame["filing_rate"] = self._read_filing_rate()
+            frame["adjustments"] = self._read_closing_adjustments(employee_codes)
+        return frame
 
-        # Query BIR filing rate (LogFrame indicator)
+    @api.model
+    def _read_filing_rate(self):
+        """BIR filing rate (LogFrame indicator), shared by every employee."""
         query_filing = """
             SELECT
                 COUNT(*) FILTER (WHERE logframe.actual_value >= logframe.target_value) AS compliant_count,
@@ -105,125 +333,122 @@ class FinanceControllerKPI(models.Model):
         """
         self.env.cr.execute(query_filing)
         filing_result = self.env.cr.dictfetchone()
-        filing_pct = (
+        return (
             (filing_result["compliant_count"] / filing_result["total_count"] * 100)
             if filing_result["total_count"] > 0
             else 0
         )
 
-        # Query daily completion trend (7 days)
-        query_daily = """
-            SELECT
-                DATE(mec.actual_completion_date) AS completion_date,
-                COUNT(*) AS tasks_completed
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.owner_code = %s
-                AND mec.status = 'completed'
-                AND mec.actual_completion_date >= CURRENT_DATE - INTERVAL '7 days'
-            GROUP BY DATE(mec.actual_completion_date)
-            ORDER BY completion_date ASC
+    @api.model
+    def _read_closing_adjustments(self, employee_codes):
+        """Closing adjustment (JE) count of the last 30 days per employee."""
+        query_adjustments = """
+            SELECT e.code AS employee_code, COUNT(am.id) AS adjustment_count
+            FROM account_move am
+            JOIN res_users u ON am.create_uid = u.id
+            JOIN hr_employee e ON u.employee_id = e.id
+            WHERE am.move_type = 'entry'
+                AND e.code = ANY(%s)
+                AND am.create_date >= CURRENT_DATE - INTERVAL '30 days'
+            GROUP BY e.code
         """
-        self.env.cr.execute(query_daily, (employee_code,))
-        daily_results = self.env.cr.dictfetchall()
+        self.env.cr.execute(query_adjustments, (list(employee_codes),))
+        return {
+            r["employee_code"]: r["adjustment_count"]
+            for r in self.env.cr.dictfetchall()
+        }
+
+    def _scoped_index(self, frame, employee_code):
+        """Adjacency index of the tasks of ``employee_code`` plus unowned tasks."""
+        indexes = frame.setdefault("indexes", {})
+        if employee_code not in indexes:
+            indexes[employee_code] = AdjacencyIndex(
+                task
+                for task in frame["tasks"]
+                if task["owner_code"] in (employee_code, None)
+            )
+        return indexes[employee_code]
+
+    @api.model
+    def _compute_kpi_gauges(self, frame, employee_code):
+        today = frame["today"]
+        month_ago = today - timedelta(days=30)
+        week_ago = today - timedelta(days=7)
+
+        on_time_count = total_count = 0
+        reconciled_count = reconciliation_count = 0
+        daily_counts = Counter()
+        for task in frame["by_owner"].get(employee_code, ()):
+            actual_date = task["actual_date"]
+            if task["status"] == "completed" and actual_date:
+                if actual_date >= month_ago:
+                    total_count += 1
+                    if task["target_date"] and actual_date <= task["target_date"]:
+                        on_time_count += 1
+                if actual_date >= week_ago:
+                    daily_counts[actual_date] += 1
+            if (
+                task["created_date"]
+                and task["created_date"] >= month_ago
+                and "reconciliation" in (task["task_name"] or "").lower()
+            ):
+                reconciliation_count += 1
+                if task["status"] == "completed":
+                    reconciled_count += 1
+
+        timeliness_pct = on_time_count / total_count * 100 if total_count else 0
+        reconciliation_pct = (
+            reconciled_count / reconciliation_count * 100 if reconciliation_count else 0
+        )
 
         # Fill gaps for last 7 days
         daily_completion_pct = []
         for i in range(7):
-            date = (datetime.now() - timedelta(days=6 - i)).date()
-            matching = [r for r in daily_results if r["completion_date"] == date]
+            date = today - timedelta(days=6 - i)
+            tasks_completed = daily_counts.get(date, 0)
             daily_completion_pct.append(
                 {
                     "date": date.isoformat(),
-                    "tasks": matching[0]["tasks_completed"] if matching else 0,
-                    "completion_pct": (
-                        min(100, (matching[0]["tasks_completed"] / 10) * 100)
-                        if matching
-                        else 0
-                    ),
+                    "tasks": tasks_completed,
+                    "completion_pct": min(100, (tasks_completed / 10) * 100),
                 }
             )
 
-        # Query closing adjustments (JE count)
-        query_adjustments = """
-            SELECT COUNT(*) AS adjustment_count
-            FROM account_move am
-            WHERE am.move_type = 'entry'
-                AND am.create_uid IN (
-                    SELECT u.id FROM res_users u
-                    JOIN hr_employee e ON u.employee_id = e.id
-                    WHERE e.code = %s
-                )
-                AND am.create_date >= CURRENT_DATE - INTERVAL '30 days'
-        """
-        self.env.cr.execute(query_adjustments, (employee_code,))
-        adjustments_result = self.env.cr.dictfetchone()
-
         return {
             "timeliness": round(timeliness_pct, 2),
             "reconciliation": round(reconciliation_pct, 2),
-            "filing_rate": round(filing_pct, 2),
-            "tasks_completed": timeliness_result["total_count"],
-            "closing_adjustments": adjustments_result["adjustment_count"],
+            "filing_rate": round(frame["filing_rate"], 2),
+            "tasks_completed": total_count,
+            "closing_adjustments": frame["adjustments"].get(employee_code, 0),
             "daily_completion_pct": daily_completion_pct,
         }
 
     @api.model
-    def get_calendar_heatmap_data(self, employee_code="RIM"):
-        """
-        Calendar Heatmap Data - Workload density + BIR milestones
-
-        Returns:
-            dict: {
-                'heatmap_data': list of [date, task_count],
-                'milestones': list of dict with {date, type, label}
+    def _compute_bir_milestones(self, frame):
+        """BIR deadlines and BOOK LOCK dates, shared by every employee."""
+        if "milestones" in frame:
+            return frame["milestones"]
+
+        today = frame["today"]
+        window_start = today - timedelta(days=30)
+        window_end = today + timedelta(days=60)
+        deadlines = {
+            (task["bir_form_code"], task["target_date"])
+            for task in frame["tasks"]
+            if task["bir_form_code"]
+            and task["target_date"]
+            and window_start <= task["target_date"] <= window_end
+        }
+        milestones = [
+            {
+                "date": deadline_date.isoformat(),
+                "type": "BIR",
+                "label": f"BIR {form_code} Deadline",
             }
-        """
-        # Query task workload for last 90 days
-        query_workload = """
-            SELECT
-                DATE(mec.target_completion_date) AS task_date,
-                COUNT(*) AS task_count
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.owner_code = %s
-                AND mec.target_completion_date >= CURRENT_DATE - INTERVAL '90 days'
-                AND mec.target_completion_date <= CURRENT_DATE + INTERVAL '30 days'
-            GROUP BY DATE(mec.target_completion_date)
-            ORDER BY task_date ASC
-        """
-        self.env.cr.execute(query_workload, (employee_code,))
-        workload_results = self.env.cr.dictfetchall()
-
-        heatmap_data = [
-            [r["task_date"].isoformat(), r["task_count"]] for r in workload_results
+            for form_code, deadline_date in sorted(deadlines, key=lambda d: d[1])
         ]
 
-        # Query BIR milestones
-        query_milestones = """
-            SELECT
-                mec.bir_form_code AS form_code,
-                DATE(mec.target_completion_date) AS deadline_date
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.bir_form_code IS NOT NULL
-                AND mec.target_completion_date >= CURRENT_DATE - INTERVAL '30 days'
-                AND mec.target_completion_date <= CURRENT_DATE + INTERVAL '60 days'
-            GROUP BY mec.bir_form_code, DATE(mec.target_completion_date)
-            ORDER BY deadline_date ASC
-        """
-        self.env.cr.execute(query_milestones)
-        milestone_results = self.env.cr.dictfetchall()
-
-        milestones = []
-        for m in milestone_results:
-            milestones.append(
-                {
-                    "date": m["deadline_date"].isoformat(),
-                    "type": "BIR",
-                    "label": f"BIR {m['form_code']} Deadline",
-                }
-            )
-
         # Add BOOK LOCK milestones (last day of month)
-        today = datetime.now().date()
         for month_offset in range(-1, 3):
             target_date = (
                 today.replace(day=1) + timedelta(days=32 * month_offset)
@@ -236,200 +461,131 @@ class FinanceControllerKPI(models.Model):
                 }
             )
 
+        frame["milestones"] = sorted(milestones, key=lambda x: x["date"])
+        return frame["milestones"]
+
+    @api.model
+    def _compute_calendar_heatmap(self, frame, employee_code):
+        today = frame["today"]
+        window_start = today - timedelta(days=90)
+        window_end = today + timedelta(days=30)
+        workload = Counter(
+            task["target_date"]
+            for task in frame["by_owner"].get(employee_code, ())
+            if task["target_date"] and window_start <= task["target_date"] <= window_end
+        )
         return {
-            "heatmap_data": heatmap_data,
-            "milestones": sorted(milestones, key=lambda x: x["date"]),
+            "heatmap_data": [
+                [task_date.isoformat(), task_count]
+                for task_date, task_count in sorted(workload.items())
+            ],
+            "milestones": self._compute_bir_milestones(frame),
         }
 
     @api.model
-    def get_wbs_tree_data(self, employee_code="RIM"):
-        """
-        WBS Tree Data - Task hierarchy
-
-        Returns:
-            dict: {
-                'name': 'root',
-                'children': list of nested dict with task hierarchy
+    def _compute_wbs_tree(self, frame, employee_code, max_depth=None, node_id=None):
+        def make_node(task):
+            return {
+                "id": str(task["id"]),
+                "name": task["task_name"],
+                "value": 1,
+                "itemStyle": {"color": self._get_status_color(task["status"])},
             }
-        """
-        # Query all tasks with parent relationships
-        query_tasks = """
-            SELECT
-                mec.id,
-                mec.name AS task_name,
-                mec.parent_id,
-                mec.cluster_classification,
-                mec.owner_code,
-                mec.status
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.owner_code = %s OR mec.owner_code IS NULL
-            ORDER BY mec.parent_id NULLS FIRST, mec.sequence ASC
-        """
-        self.env.cr.execute(query_tasks, (employee_code,))
-        task_results = self.env.cr.dictfetchall()
-
-        # Build hierarchical tree
-        def build_tree(parent_id=None):
-            children = [t for t in task_results if t["parent_id"] == parent_id]
-            tree_nodes = []
-            for child in children:
-                node = {
-                    "name": child["task_name"],
-                    "value": 1,
-                    "itemStyle": {"color": self._get_status_color(child["status"])},
-                }
-                subtree = build_tree(child["id"])
-                if subtree:
-                    node["children"] = subtree
-                tree_nodes.append(node)
-            return tree_nodes
 
-        root_tree = build_tree(parent_id=None)
-
-        return {"name": "Month-End Close WBS", "children": root_tree}
+        children = self._scoped_index(frame, employee_code).build_tree(
+            make_node, root_id=node_id, max_depth=max_depth
+        )
+        if node_id:
+            return {"id": str(node_id), "children": children}
+        return {"name": "Month-End Close WBS", "children": children}
 
     @api.model
-    def get_gantt_data(self, employee_code="RIM"):
-        """
-        Gantt Chart Data - Task execution timeline
+    def _compute_gantt(self, frame, employee_code):
+        tasks = sorted(
+            (
+                task
+                for task in frame["by_owner"].get(employee_code, ())
+                if task["target_date"]
+            ),
+            key=lambda task: task["target_date"],
+        )
+        return [
+            {
+                "name": task["task_name"],
+                "start": (task["target_date"] - timedelta(days=5)).isoformat(),
+                "end": task["target_date"].isoformat(),
+                "owner": task["owner_code"],
+                "phase": task["cluster_classification"] or "Uncategorized",
+                "status": task["status"],
+            }
+            for task in tasks
+        ]
 
-        Returns:
-            list: [
-                {
-                    'name': 'Task Name',
-                    'start': 'YYYY-MM-DD',
-                    'end': 'YYYY-MM-DD',
-                    'owner': 'RIM',
-                    'phase': 'Phase 1'
-                }
-            ]
-        """
-        query_gantt = """
-            SELECT
-                mec.name AS task_name,
-                mec.target_completion_date AS end_date,
-                (mec.target_completion_date - INTERVAL '5 days')::date AS start_date,
-                mec.owner_code,
-                mec.cluster_classification AS phase,
-                mec.status
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.owner_code = %s
-                AND mec.target_completion_date IS NOT NULL
-            ORDER BY mec.target_completion_date ASC
-        """
-        self.env.cr.execute(query_gantt, (employee_code,))
-        gantt_results = self.env.cr.dictfetchall()
+    @api.model
+    def _compute_raci_sunburst(self, frame):
+        """RACI distribution over every owner, shared by every employee."""
+        if "raci" in frame:
+            return frame["raci"]
+
+        role_counts = Counter(
+            (task["cluster_classification"], task["owner_code"], task["raci_role"])
+            for task in frame["tasks"]
+            if task["cluster_classification"] and task["owner_code"]
+        )
 
-        gantt_data = []
-        for g in gantt_results:
-            gantt_data.append(
-                {
-                    "name": g["task_name"],
-                    "start": g["start_date"].isoformat(),
-                    "end": g["end_date"].isoformat(),
-                    "owner": g["owner_code"],
-                    "phase": g["phase"] or "Uncategorized",
-                    "status": g["status"],
-                }
+        # Build sunburst hierarchy: Root → Cluster → Owner → RACI Role
+        sunburst_children = build_nested_counts(
+            ((cluster, owner, role or "Unassigned"), task_count)
+            for (cluster, owner, role), task_count in sorted(
+                role_counts.items(), key=lambda item: (item[0][0], item[0][1])
             )
+        )
 
-        return gantt_data
+        frame["raci"] = {"name": "RACI Distribution", "children": sunburst_children}
+        return frame["raci"]
 
     @api.model
-    def get_raci_sunburst_data(self, employee_code="RIM"):
-        """
-        RACI Sunburst Data - Responsibility distribution
-
-        Returns:
-            dict: {
-                'name': 'root',
-                'children': list of nested dict with RACI hierarchy
+    def _compute_dependency_graph(
+        self, frame, employee_code, max_depth=None, node_id=None
+    ):
+        def make_node(task):
+            return {
+                "id": str(task["id"]),
+                "name": task["task_name"][:30],  # Truncate for readability
+                "category": task["cluster_classification"] or "Uncategorized",
             }
-        """
-        # Query RACI assignments by cluster and owner
-        query_raci = """
-            SELECT
-                mec.cluster_classification AS cluster,
-                mec.owner_code,
-                mec.raci_role,
-                COUNT(*) AS task_count
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.cluster_classification IS NOT NULL
-                AND mec.owner_code IS NOT NULL
-            GROUP BY mec.cluster_classification, mec.owner_code, mec.raci_role
-            ORDER BY mec.cluster_classification, mec.owner_code
-        """
-        self.env.cr.execute(query_raci)
-        raci_results = self.env.cr.dictfetchall()
-
-        # Build sunburst hierarchy: Root → Cluster → Owner → RACI Role
-        clusters = {}
-        for r in raci_results:
-            cluster_name = r["cluster"] or "Uncategorized"
-            if cluster_name not in clusters:
-                clusters[cluster_name] = {}
-
-            owner = r["owner_code"]
-            if owner not in clusters[cluster_name]:
-                clusters[cluster_name][owner] = []
-
-            clusters[cluster_name][owner].append(
-                {"name": r["raci_role"] or "Unassigned", "value": r["task_count"]}
-            )
-
-        sunburst_children = []
-        for cluster_name, owners in clusters.items():
-            cluster_node = {"name": cluster_name, "children": []}
-            for owner, roles in owners.items():
-                owner_node = {"name": owner, "children": roles}
-                cluster_node["children"].append(owner_node)
-            sunburst_children.append(cluster_node)
 
-        return {"name": "RACI Distribution", "children": sunburst_children}
+        return self._scoped_index(frame, employee_code).build_graph(
+            make_node, root_id=node_id, max_depth=max_depth
+        )
 
     @api.model
-    def get_dependency_graph_data(self, employee_code="RIM"):
+    def build_kpi_snapshots(self, employee_codes=None):
         """
-        Dependency Graph Data - Task prerequisite network
+        Compute every dashboard widget for several employees in one pass.
 
-        Returns:
-            dict: {
-                'nodes': list of dict {id, name, category},
-                'links': list of dict {source, target}
-            }
-        """
-        # Query tasks with dependencies (parent-child relationships)
-        query_dependencies = """
-            SELECT
-                mec.id,
-                mec.name AS task_name,
-                mec.parent_id,
-                mec.cluster_classification
-            FROM ipai_finance_monthly_close mec
-            WHERE mec.owner_code = %s OR mec.owner_code IS NULL
-        """
-        self.env.cr.execute(query_dependencies, (employee_code,))
-        dependency_results = self.env.cr.dictfetchall()
+        The task rows, BIR filing rate and closing adjustments are loaded
+        once for all employees (3 queries whatever their number); widgets
+        shared by every employee (BIR milestones, RACI) are computed once.
 
-        nodes = []
-        links = []
-        node_ids = set()
-
-        for d in dependency_results:
-            if d["id"] not in node_ids:
-                nodes.append(
-                    {
-                        "id": str(d["id"]),
-                        "name": d["task_name"][:30],  # Truncate for readability
-                        "category": d["cluster_classification"] or "Uncategorized",
-                    }
-                )
-                node_ids.add(d["id"])
-
-            if d["parent_id"]:
-                links.append({"source": str(d["parent_id"]), "target": str(d["id"])})
+        Args:
+            employee_codes (list): Employee codes, None for every task owner
 
-        return {"nodes": nodes, "links": links}
+        Returns:
+            dict: {employee_code: kpi_data}
+        """
+        frame = self._load_kpi_frame(employee_codes, gauges=True)
+        return {
+            employee_code: {
+                "gauges": self._compute_kpi_gauges(frame, employee_code),
+                "calendar": self._compute_calendar_heatmap(frame, employee_code),
+                "wbs": self._compute_wbs_tree(frame, employee_code),
+                "gantt": self._compute_gantt(frame, employee_code),
+                "raci": self._compute_raci_sunburst(frame),
+                "dependencies": self._compute_dependency_graph(frame, employee_code),
+            }
+            for employee_code in frame["employee_codes"]
+        }
 
     def _get_status_color(self, status):
         """Helper method to map task status to ECharts color"""
@@ -452,27 +608,181 @@ class FinanceControllerKPI(models.Model):
         Returns:
             dict: KPI snapshot data
         """
-        _logger.info(f"Generating Finance Controller KPI snapshot for {employee_code}")
-
-        kpi_data = {
-            "gauges": self.get_kpi_gauge_data(employee_code),
-            "calendar": self.get_calendar_heatmap_data(employee_code),
-            "wbs": self.get_wbs_tree_data(employee_code),
-            "gantt": self.get_gantt_data(employee_code),
-            "raci": self.get_raci_sunburst_data(employee_code),
-            "dependencies": self.get_dependency_graph_data(employee_code),
-        }
+        return self.cron_generate_kpi_snapshots([employee_code])[employee_code]
 
-        # Store snapshot
-        snapshot = self.create(
-            {
-                "name": f"Finance KPI Snapshot {fields.Date.today()} - {employee_code}",
-                "employee_code": employee_code,
-                "snapshot_date": fields.Date.today(),
-                "kpi_data": json.dumps(kpi_data),
-            }
+    @api.model
+    def cron_generate_kpi_snapshots(self, employee_codes=None):
+        """
+        Daily cron job to generate the KPI snapshots of several employees
+
+        Args:
+            employee_codes (list): Employee codes, None for every task owner
+
+        Returns:
+            dict: {employee_code: KPI snapshot data}
+        """
+        _logger.info(
+            f"Generating Finance Controller KPI snapshots for "
+            f"{', '.join(employee_codes) if employee_codes else 'all owners'}"
+        )
+
+        task_versions = self._get_task_versions(employee_codes)
+        snapshots = self.build_kpi_snapshots(employee_codes)
+
+        # Store snapshots
+        today = fields.Date.today()
+        records = self.create(
+            [
+                {
+                    "name": f"Finance KPI Snapshot {today} - {employee_code}",
+                    "employee_code": employee_code,
+                    "snapshot_date": today,
+                    "kpi_data": json.dumps(kpi_data),
+                    "task_version": self._task_version(task_versions, employee_code),
+                }
+                for employee_code, kpi_data in snapshots.items()
+            ]
+        )
+
+        # Keep one snapshot per employee and day: on-demand recomputes
+        # replace the earlier snapshot of the day instead of piling up
+        self.sudo().search(
+            [
+                ("employee_code", "in", list(snapshots)),
+                ("snapshot_date", "=", today),
+                ("id", "not in", records.ids),
+            ]
+        ).unlink()
+
+        _logger.info(f"KPI snapshots created: {records.ids}")
+
+        return snapshots
+
+    # ------------------------------------------------------------------
+    # Cached dashboard payload
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _get_task_versions(self, employee_codes=None):
+        """
+        Task change counters read before snapshots are built.
+
+        Args:
+            employee_codes (list): Employee codes, None for every task owner
+
+        Returns:
+            dict: {scope: counter} of the employees and the shared scopes
+        """
+        if employee_codes is None:
+            self.env.cr.execute(
+                "SELECT scope, version FROM finance_controller_task_version"
+            )
+        else:
+            self.env.cr.execute(
+                """
+                SELECT scope, version FROM finance_controller_task_version
+                WHERE scope = ANY(%s)
+                """,
+                (list(employee_codes) + [self.UNOWNED_SCOPE, self.BIR_SCOPE],),
+            )
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _task_version(self, task_versions, employee_code):
+        """Version of the tasks of an employee's snapshot: own, unowned and BIR."""
+        return ".".join(
+            str(task_versions.get(scope, 0))
+            for scope in (employee_code, self.UNOWNED_SCOPE, self.BIR_SCOPE)
+        )
+
+    @api.model
+    def _get_latest_snapshot(self, employee_code):
+        return self.search(
+            [("employee_code", "=", employee_code)], order="id desc", limit=1
         )
 
-        _logger.info(f"KPI snapshot created: {snapshot.id}")
+    @api.model
+    def _is_snapshot_stale(self, snapshot, task_version):
+        """A snapshot is stale once its tasks changed or the day rolled over."""
+        if not snapshot or snapshot.snapshot_date != fields.Date.today():
+            return True
+        return snapshot.task_version != task_version
+
+    @api.model
+    def _try_lock_recompute(self, employee_code):
+        """Only one request recomputes a stale snapshot, the others serve it."""
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_xact_lock(%s)",
+            (zlib.crc32(f"finance.controller.kpi:{employee_code}".encode()),),
+        )
+        return self.env.cr.fetchone()[0]
 
-        return kpi_data
+    @api.model
+    @tools.ormcache("snapshot_id")
+    def _load_snapshot_data(self, snapshot_id):
+        """
+        Parsed KPI data of a snapshot.
+
+        Snapshots are never modified once stored, so the parsed data is
+        cached per snapshot id and must be treated as read-only.
+        """
+        return json.loads(self.browse(snapshot_id).kpi_data or "{}")
+
+    @api.model
+    def get_dashboard_payload(self, employee_code="RIM", widgets=None, etag=None):
+        """
+        Dashboard data served from the latest KPI snapshot.
+
+        The snapshot is recomputed on demand when it is stale; when several
+        requests find it stale at once, only one recomputes it while the
+        others serve the previous snapshot.
+
+        Args:
+            employee_code (str): Employee code for filtering
+            widgets (list): Widgets to return (default: all), for partial
+                refresh
+            etag (str): ETag of the payload the caller already has
+
+        Returns:
+            dict: {
+                'version': str (snapshot id and task version),
+                'etag': str,
+                'snapshot_date': 'YYYY-MM-DD',
+                'not_modified': bool,
+                'widgets': dict of widget data (omitted if not_modified)
+            }
+        """
+        widgets = [
+            widget
+            for widget in (widgets or self.DASHBOARD_WIDGETS)
+            if widget in self.DASHBOARD_WIDGETS
+        ]
+        task_version = self._task_version(
+            self._get_task_versions([employee_code]), employee_code
+        )
+        snapshot = self._get_latest_snapshot(employee_code)
+        stale = self._is_snapshot_stale(snapshot, task_version)
+        if stale and self._try_lock_recompute(employee_code):
+            self.cron_generate_kpi_snapshots([employee_code])
+            snapshot = self._get_latest_snapshot(employee_code)
+        if not snapshot:
+            # Another request is computing the first snapshot
+            data = self.build_kpi_snapshots([employee_code])[employee_code]
+        else:
+            data = self._load_snapshot_data(snapshot.id)
+
+        version = "%s-%s" % (snapshot.id or 0, snapshot.task_version or task_version)
+        payload_etag = hashlib.sha1(
+            f"{employee_code}:{version}:{','.join(widgets)}".encode()
+        ).hexdigest()
+        payload = {
+            "version": version,
+            "etag": payload_etag,
+            "snapshot_date": fields.Date.to_string(
+                snapshot.snapshot_date or fields.Date.today()
+            ),
+            "not_modified": bool(snapshot) and etag == payload_etag,
+        }
+        if not payload["not_modified"]:
+            payload["widgets"] = {widget: data.get(widget) for widget in widgets}
+        return payload
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Linear-time builders for the dashboard tree and graph payloads.
+
+Pure Python, no ORM access: finance.controller.kpi indexes the task rows
+once with AdjacencyIndex and renders the ECharts tree (WBS), graph
+(dependencies) and sunburst (RACI) payloads from that index, so every
+payload costs O(n) whatever the depth or width of the program.
+"""
+from collections import defaultdict
+
+
+class AdjacencyIndex:
+    """
+    Parent → children index over task rows.
+
+    Args:
+        rows: iterable of dicts, in sibling order
+        id_key: key of the row id
+        parent_key: key of the parent id (falsy for roots)
+    """
+
+    def __init__(self, rows, id_key="id", parent_key="parent_id"):
+        self.rows = {}
+        self.parents = {}
+        self.children = defaultdict(list)
+        for row in rows:
+            row_id = row[id_key]
+            parent_id = row[parent_key] or None
+            self.rows[row_id] = row
+            self.parents[row_id] = parent_id
+            self.children[parent_id].append(row_id)
+
+    def _walk(self, root_id, max_depth):
+        """
+        Breadth-first walk below ``root_id``.
+
+        Yields:
+            tuple: (parent_id, row_id, expanded) where ``expanded`` tells
+            whether the children of ``row_id`` are walked too
+        """
+        seen = {root_id}
+        level = [root_id]
+        depth = 0
+        while level and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_level = []
+            for parent_id in level:
+                for row_id in self.children.get(parent_id, ()):
+                    # Guard against parent cycles in the source data
+                    if row_id in seen:
+                        continue
+                    seen.add(row_id)
+                    expanded = max_depth is None or depth < max_depth
+                    if expanded:
+                        next_level.append(row_id)
+                    yield parent_id, row_id, expanded
+            level = next_level
+
+    def has_children(self, row_id):
+        return bool(self.children.get(row_id))
+
+    def build_tree(self, make_node, root_id=None, max_depth=None):
+        """
+        Nested tree payload below ``root_id``.
+
+        Args:
+            make_node: callable(row) returning the node dict of a row
+            root_id: id of the node to expand (None for the roots)
+            max_depth: levels to render; nodes at the last level having
+                children are marked ``collapsed`` for lazy expansion
+
+        Returns:
+            list: node dicts, with ``children`` for expanded nodes
+        """
+        roots = []
+        nodes = {}
+        for parent_id, row_id, expanded in self._walk(root_id, max_depth):
+            node = make_node(self.rows[row_id])
+            nodes[row_id] = node
+            if parent_id == root_id:
+                roots.append(node)
+            else:
+                nodes[parent_id].setdefault("children", []).append(node)
+            if not expanded and self.has_children(row_id):
+                node["collapsed"] = True
+        return roots
+
+    def build_graph(self, make_node, root_id=None, max_depth=None):
+        """
+        Node/link graph payload of the parent → child edges.
+
+        Args:
+            make_node: callable(row) returning the node dict of a row
+            root_id: id of the node to expand (None for the whole network)
+            max_depth: levels to render; see build_tree
+
+        Returns:
+            dict: {'nodes': list of node dicts, 'links': list of dict
+            {source, target}}
+        """
+        nodes = []
+        links = []
+        if root_id is None and max_depth is None:
+            # Whole network: rows in source order, parents outside the
+            # scope still linked
+            for row_id, row in self.rows.items():
+                nodes.append(make_node(row))
+                parent_id = self.parents[row_id]
+                if parent_id:
+                    links.append({"source": str(parent_id), "target": str(row_id)})
+            return {"nodes": nodes, "links": links}
+
+        for parent_id, row_id, expanded in self._walk(root_id, max_depth):
+            node = make_node(self.rows[row_id])
+            if not expanded and self.has_children(row_id):
+                node["collapsed"] = True
+            nodes.append(node)
+            if parent_id:
+                links.append({"source": str(parent_id), "target": str(row_id)})
+        return {"nodes": nodes, "links": links}
+
+
+def build_nested_counts(counts):
+    """
+    Sunburst payload from counts keyed by a path of names.
+
+    Args:
+        counts: iterable of (path tuple, value), in display order
+
+    Returns:
+        list: nested {'name', 'children'} dicts with {'name', 'value'}
+        leaves, siblings in first-seen order
+    """
+    roots = []
+    index = {}
+    for path, value in counts:
+        siblings = roots
+        for depth, name in enumerate(path[:-1]):
+            key = path[: depth + 1]
+            node = index.get(key)
+            if node is None:
+                node = index[key] = {"name": name, "children": []}
+                siblings.append(node)
+            siblings = node["children"]
+        siblings.append({"name": path[-1], "value": value})
+    return roots
@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
 
-from . import test_controller_kpi
+from . import test_controller_kpi, test_kpi_graph, test_kpi_snapshots
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import BaseCase
+
+from ..models.kpi_graph import AdjacencyIndex, build_nested_counts
+
+
+def make_node(row):
+    return {"id": str(row["id"]), "name": row["name"]}
+
+
+class TestAdjacencyIndex(BaseCase):
+    """
+    Test Coverage:
+    - Nested tree payload, depth limits and lazy expansion
+    - Node/link graph payload
+    - Parent cycles and parents outside the scope
+    - Sunburst nesting
+    """
+
+    def setUp(self):
+        super().setUp()
+        # 1 ─┬─ 2 ── 4
+        #    └─ 3
+        # 5
+        self.rows = [
+            {"id": 1, "parent_id": None, "name": "Close"},
+            {"id": 2, "parent_id": 1, "name": "Bank"},
+            {"id": 3, "parent_id": 1, "name": "GL"},
+            {"id": 4, "parent_id": 2, "name": "BPI"},
+            {"id": 5, "parent_id": False, "name": "Tax"},
+        ]
+        self.index = AdjacencyIndex(self.rows)
+
+    def test_build_tree(self):
+        tree = self.index.build_tree(make_node)
+
+        self.assertEqual(
+            tree,
+            [
+                {
+                    "id": "1",
+                    "name": "Close",
+                    "children": [
+                        {
+                            "id": "2",
+                            "name": "Bank",
+                            "children": [{"id": "4", "name": "BPI"}],
+                        },
+                        {"id": "3", "name": "GL"},
+                    ],
+                },
+                {"id": "5", "name": "Tax"},
+            ],
+        )
+
+    def test_build_tree_max_depth(self):
+        tree = self.index.build_tree(make_node, max_depth=1)
+
+        self.assertEqual(
+            tree,
+            [
+                {"id": "1", "name": "Close", "collapsed": True},
+                {"id": "5", "name": "Tax"},
+            ],
+        )
+
+    def test_build_tree_lazy_expansion(self):
+        subtree = self.index.build_tree(make_node, root_id=1, max_depth=1)
+
+        self.assertEqual(
+            subtree,
+            [
+                {"id": "2", "name": "Bank", "collapsed": True},
+                {"id": "3", "name": "GL"},
+            ],
+        )
+        self.assertEqual(
+            self.index.build_tree(make_node, root_id=2), [{"id": "4", "name": "BPI"}]
+        )
+        self.assertEqual(self.index.build_tree(make_node, root_id=4), [])
+
+    def test_build_graph(self):
+        graph = self.index.build_graph(make_node)
+
+        self.assertEqual(
+            [node["id"] for node in graph["nodes"]], ["1", "2", "3", "4", "5"]
+        )
+        self.assertEqual(
+            graph["links"],
+            [
+                {"source": "1", "target": "2"},
+                {"source": "1", "target": "3"},
+                {"source": "2", "target": "4"},
+            ],
+        )
+
+    def test_build_graph_lazy_expansion(self):
+        graph = self.index.build_graph(make_node, root_id=1, max_depth=1)
+
+        self.assertEqual(
+            graph["nodes"],
+            [
+                {"id": "2", "name": "Bank", "collapsed": True},
+                {"id": "3", "name": "GL"},
+            ],
+        )
+        self.assertEqual(
+            graph["links"],
+            [{"source": "1", "target": "2"}, {"source": "1", "target": "3"}],
+        )
+
+    def test_parent_outside_scope(self):
+        # Whole-network graphs keep links to parents of other owners
+        index = AdjacencyIndex([{"id": 7, "parent_id": 99, "name": "AP"}])
+
+        self.assertEqual(index.build_tree(make_node), [])
+        self.assertEqual(
+            index.build_graph(make_node),
+            {
+                "nodes": [{"id": "7", "name": "AP"}],
+                "links": [{"source": "99", "target": "7"}],
+            },
+        )
+
+    def test_parent_cycle(self):
+        index = AdjacencyIndex(
+            [
+                {"id": 1, "parent_id": 2, "name": "A"},
+                {"id": 2, "parent_id": 1, "name": "B"},
+            ]
+        )
+
+        # No roots, and expanding a node never walks back to it
+        self.assertEqual(index.build_tree(make_node), [])
+        self.assertEqual(
+            index.build_tree(make_node, root_id=1),
+            [{"id": "2", "name": "B"}],
+        )
+
+    def test_build_nested_counts(self):
+        sunburst = build_nested_counts(
+            [
+                (("Phase 1", "RIM", "Responsible"), 2),
+                (("Phase 1", "RIM", "Accountable"), 1),
+                (("Phase 1", "CKVC", "Unassigned"), 1),
+                (("Phase 2", "RIM", "Responsible"), 3),
+            ]
+        )
+
+        self.assertEqual(
+            sunburst,
+            [
+                {
+                    "name": "Phase 1",
+                    "children": [
+                        {
+                            "name": "RIM",
+                            "children": [
+                                {"name": "Responsible", "value": 2},
+                                {"name": "Accountable", "value": 1},
+                            ],
+                        },
+                        {
+                            "name": "CKVC",
+                            "children": [{"name": "Unassigned", "value": 1}],
+                        },
+                    ],
+                },
+                {
+                    "name": "Phase 2",
+                    "children": [
+                        {
+                            "name": "RIM",
+                            "children": [{"name": "Responsible", "value": 3}],
+                        }
+                    ],
+                },
+            ],
+        )
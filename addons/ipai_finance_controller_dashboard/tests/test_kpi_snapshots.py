@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo.tests import TransactionCase
+
+from odoo import fields
+
+
+class TestKpiSnapshots(TransactionCase):
+    """
+    Unit tests for the KPI snapshots, on a fixture task table.
+
+    The month-end close tasks are read with SQL from
+    ipai_finance_monthly_close, which no module of this tree defines: the
+    tests create it as a temporary table (dropped with the test transaction)
+    holding the columns the dashboard reads, with the task version trigger.
+    The gauge aggregates read from other modules' tables and are stubbed.
+
+    Test Coverage:
+    - One-pass snapshots of every owner
+    - Versioned dashboard payload (ETag, staleness, snapshot pruning)
+    - Task versions scoped to the owner's, unowned and BIR tasks
+    - Depth-limited WBS tree and lazy expansion
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.env.cr.execute(
+            """
+            CREATE TEMP TABLE ipai_finance_monthly_close (
+                id serial PRIMARY KEY,
+                name varchar NOT NULL,
+                parent_id integer,
+                sequence integer DEFAULT 10,
+                owner_code varchar,
+                cluster_classification varchar,
+                raci_role varchar,
+                status varchar,
+                bir_form_code varchar,
+                target_completion_date date,
+                actual_completion_date date,
+                created_at timestamp DEFAULT now()
+            ) ON COMMIT DROP
+            """
+        )
+        self.kpi_model = self.env["finance.controller.kpi"]
+        self.kpi_model._install_task_version_trigger()
+        self.patch(type(self.kpi_model), "_read_filing_rate", lambda self: 95.0)
+        self.patch(
+            type(self.kpi_model),
+            "_read_closing_adjustments",
+            lambda self, employee_codes: {},
+        )
+
+        today = fields.Date.today()
+        self.task_phase1 = self._create_task(
+            name="Bank Reconciliation",
+            owner_code="RIM",
+            cluster_classification="Phase 1",
+            target_completion_date=today,
+            actual_completion_date=today,
+            status="completed",
+            raci_role="Responsible",
+        )
+        self.task_phase2 = self._create_task(
+            name="GL Reconciliation",
+            owner_code="RIM",
+            cluster_classification="Phase 2",
+            parent_id=self.task_phase1,
+            target_completion_date=today + timedelta(days=3),
+            status="in_progress",
+            raci_role="Accountable",
+        )
+        self.task_ckvc = self._create_task(
+            name="CKVC Task",
+            owner_code="CKVC",
+            cluster_classification="Phase 1",
+            target_completion_date=today,
+            status="pending",
+        )
+
+    def _create_task(self, **vals):
+        self.env.cr.execute(
+            "INSERT INTO ipai_finance_monthly_close (%s) VALUES (%s) RETURNING id"
+            % (", ".join(vals), ", ".join(["%s"] * len(vals))),
+            list(vals.values()),
+        )
+        return self.env.cr.fetchone()[0]
+
+    def test_build_kpi_snapshots_all_owners(self):
+        """Test that one pass builds the snapshot of every owner"""
+        snapshots = self.kpi_model.build_kpi_snapshots()
+
+        self.assertEqual(set(snapshots), {"RIM", "CKVC"})
+        # Same data as the single-widget methods
+        for employee_code in ("RIM", "CKVC"):
+            snapshot = snapshots[employee_code]
+            self.assertEqual(set(snapshot), set(self.kpi_model.DASHBOARD_WIDGETS))
+            self.assertEqual(
+                snapshot["gauges"], self.kpi_model.get_kpi_gauge_data(employee_code)
+            )
+            self.assertEqual(
+                snapshot["gantt"], self.kpi_model.get_gantt_data(employee_code)
+            )
+            self.assertEqual(
+                snapshot["wbs"], self.kpi_model.get_wbs_tree_data(employee_code)
+            )
+            self.assertEqual(
+                snapshot["dependencies"],
+                self.kpi_model.get_dependency_graph_data(employee_code),
+            )
+        self.assertEqual(
+            [task["name"] for task in snapshots["CKVC"]["gantt"]], ["CKVC Task"]
+        )
+        self.assertEqual(
+            snapshots["RIM"]["raci"], self.kpi_model.get_raci_sunburst_data("RIM")
+        )
+
+    def test_cron_generate_kpi_snapshots(self):
+        """Test that the cron stores one snapshot per owner"""
+        result = self.kpi_model.cron_generate_kpi_snapshots()
+
+        snapshots = self.kpi_model.search([("snapshot_date", "=", fields.Date.today())])
+        self.assertEqual(sorted(snapshots.mapped("employee_code")), ["CKVC", "RIM"])
+        self.assertEqual(set(result), {"RIM", "CKVC"})
+
+    def _snapshots(self, employee_code):
+        return self.kpi_model.search([("employee_code", "=", employee_code)])
+
+    def test_dashboard_payload_versioning(self):
+        """Test that the payload is served from the snapshot with an ETag"""
+        payload = self.kpi_model.get_dashboard_payload("RIM")
+        self.assertFalse(payload["not_modified"])
+        self.assertEqual(set(payload["widgets"]), set(self.kpi_model.DASHBOARD_WIDGETS))
+        snapshot = self._snapshots("RIM")
+        self.assertEqual(len(snapshot), 1)
+        self.assertTrue(snapshot.task_version)
+
+        # Same version: no recompute, conditional request not modified
+        cached = self.kpi_model.get_dashboard_payload("RIM", etag=payload["etag"])
+        self.assertTrue(cached["not_modified"])
+        self.assertNotIn("widgets", cached)
+        self.assertEqual(self._snapshots("RIM"), snapshot)
+
+        # Partial refresh has its own ETag
+        partial = self.kpi_model.get_dashboard_payload("RIM", widgets=["gantt"])
+        self.assertEqual(list(partial["widgets"]), ["gantt"])
+        self.assertNotEqual(partial["etag"], payload["etag"])
+
+    def test_dashboard_payload_recomputed_on_task_change(self):
+        """Test that a task change serves a new version and replaces the snapshot"""
+        payload = self.kpi_model.get_dashboard_payload("RIM")
+
+        self.env.cr.execute(
+            "UPDATE ipai_finance_monthly_close SET status = 'completed' WHERE id = %s",
+            [self.task_phase2],
+        )
+        changed = self.kpi_model.get_dashboard_payload("RIM", etag=payload["etag"])
+
+        self.assertFalse(changed["not_modified"])
+        self.assertNotEqual(changed["version"], payload["version"])
+        statuses = [task["status"] for task in changed["widgets"]["gantt"]]
+        self.assertEqual(statuses, ["completed", "completed"])
+        # Earlier snapshots of the day are pruned
+        self.assertEqual(len(self._snapshots("RIM")), 1)
+
+    def _not_modified(self, employee_code, payload):
+        return self.kpi_model.get_dashboard_payload(
+            employee_code, etag=payload["etag"]
+        )["not_modified"]
+
+    def test_task_version_scoped_to_owner(self):
+        """Test that only changes to tasks of a snapshot make it stale"""
+        rim = self.kpi_model.get_dashboard_payload("RIM")
+        ckvc = self.kpi_model.get_dashboard_payload("CKVC")
+
+        self.env.cr.execute(
+            "UPDATE ipai_finance_monthly_close SET status = 'completed' WHERE id = %s",
+            [self.task_ckvc],
+        )
+        self.assertTrue(self._not_modified("RIM", rim))
+        self.assertFalse(self._not_modified("CKVC", ckvc))
+
+        # Unowned and BIR tasks are part of every snapshot
+        self._create_task(name="Unowned Task", status="pending")
+        self.assertFalse(self._not_modified("RIM", rim))
+
+        ckvc = self.kpi_model.get_dashboard_payload("CKVC")
+        self._create_task(name="1601-C", owner_code="RIM", bir_form_code="1601-C")
+        self.assertFalse(self._not_modified("CKVC", ckvc))
+
+    def test_dashboard_payload_without_tasks(self):
+        """Test that an empty task table does not recompute on every request"""
+        self.env.cr.execute("DELETE FROM ipai_finance_monthly_close")
+
+        payload = self.kpi_model.get_dashboard_payload("RIM")
+        snapshot = self._snapshots("RIM")
+        cached = self.kpi_model.get_dashboard_payload("RIM", etag=payload["etag"])
+
+        self.assertTrue(cached["not_modified"])
+        self.assertEqual(self._snapshots("RIM"), snapshot)
+
+    def test_previous_day_snapshots_kept(self):
+        """Test that pruning keeps the snapshots of earlier days"""
+        self.kpi_model.cron_generate_kpi_snapshots(["RIM"])
+        yesterday = self._snapshots("RIM")
+        yesterday.snapshot_date = fields.Date.today() - timedelta(days=1)
+
+        self.kpi_model.cron_generate_kpi_snapshots(["RIM"])
+        self.kpi_model.cron_generate_kpi_snapshots(["RIM"])
+
+        snapshots = self._snapshots("RIM")
+        self.assertEqual(len(snapshots), 2)
+        self.assertIn(yesterday, snapshots)
+
+    def test_wbs_tree_lazy_expansion(self):
+        """Test depth-limited WBS tree and lazy subtree expansion"""
+        self._create_task(
+            name="Subledger Tie-out",
+            owner_code="RIM",
+            parent_id=self.task_phase2,
+            status="pending",
+        )
+
+        full = self.kpi_model.get_wbs_tree_data("RIM")
+        top = self.kpi_model.get_wbs_tree_data("RIM", max_depth=1)
+
+        phase1 = next(n for n in top["children"] if n["name"] == "Bank Reconciliation")
+        self.assertTrue(phase1["collapsed"])
+        self.assertNotIn("children", phase1)
+
+        # Expanding level by level rebuilds the full tree
+        subtree = self.kpi_model.get_wbs_tree_data(
+            "RIM", max_depth=1, node_id=phase1["id"]
+        )
+        self.assertEqual(subtree["id"], phase1["id"])
+        self.assertEqual(subtree["children"][0]["name"], "GL Reconciliation")
+        self.assertTrue(subtree["children"][0]["collapsed"])
+        full_phase1 = next(
+            n for n in full["children"] if n["name"] == "Bank Reconciliation"
+        )
+        self.assertEqual(
+            full_phase1["children"][0]["children"][0]["name"], "Subledger Tie-out"
+        )
+
+        graph = self.kpi_model.get_dependency_graph_data("RIM", node_id=phase1["id"])
+        self.assertEqual(len(graph["nodes"]), 2)
+        self.assertEqual(graph["links"][0]["source"], phase1["id"])
+
+    def test_wbs_tree_scoped_to_owner(self):
+        """Test that other owners' tasks stay out of the WBS tree"""
+        names = [
+            node["name"]
+            for node in self.kpi_model.get_wbs_tree_data("CKVC")["children"]
+        ]
+        self.assertEqual(names, ["CKVC Task"])
@@ -84,24 +84,36 @@ class FinanceBIRDeadline(models.Model):
     def _compute_targets(self):
         """Compute target dates based on the filing deadline.
 
-        - Preparation: 4 days before deadline
-        - Report Approval: 2 days before deadline
-        - Payment Approval: 1 day before deadline
+        - Preparation: 4 business days before deadline
+        - Report Approval: 2 business days before deadline
+        - Payment Approval: 1 business day before deadline
+
+        Business days come from ppm.business.calendar (weekends and public
+        holidays) when ipai_ppm_monthly_close is installed, otherwise the
+        offsets are calendar days.
         """
         for record in self:
             if record.deadline_date:
-                record.target_prep_date = record.deadline_date - timedelta(days=4)
-                record.target_report_approval_date = record.deadline_date - timedelta(
-                    days=2
+                deadline = record.deadline_date
+                record.target_prep_date = self._subtract_business_days(deadline, 4)
+                record.target_report_approval_date = self._subtract_business_days(
+                    deadline, 2
                 )
-                record.target_payment_approval_date = record.deadline_date - timedelta(
-                    days=1
+                record.target_payment_approval_date = self._subtract_business_days(
+                    deadline, 1
                 )
             else:
                 record.target_prep_date = False
                 record.target_report_approval_date = False
                 record.target_payment_approval_date = False
 
+    def _subtract_business_days(self, day, num_days):
+        if "ppm.business.calendar" in self.env:
+            return self.env["ppm.business.calendar"].subtract_business_days(
+                day, num_days
+            )
+        return day - timedelta(days=num_days)
+
     def action_mark_in_progress(self):
         """Mark the deadline as in progress."""
         self.write({"state": "in_progress"})
@@ -12,6 +12,7 @@
     ],
     "data": [
         "security/ir.model.access.csv",
+        "data/ocr_expense_cron.xml",
         "views/ipai_ocr_settings_views.xml",
         "views/ipai_ocr_expense_views.xml",
         "views/ocr_expense_log_views.xml",
@@ -11,9 +11,17 @@ InsightPulse OCR service. Automatically extracts:
 
 Provides observability through ocr.expense.log for tracking scan
 success rates and debugging failed extractions.
+
+Scans are queued: the scan action only marks expenses pending, and a cron
+runner sends the receipts to the OCR service concurrently (bounded number
+of requests in flight), writing back each result as soon as it arrives.
+Receipts whose attachment checksum was already scanned reuse the earlier
+result instead of calling the OCR service again.
 """
 import logging
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from odoo.exceptions import UserError
@@ -22,6 +30,14 @@ from odoo import _, api, fields, models
 
 _logger = logging.getLogger(__name__)
 
+# Receipts sent per cron run; the runner re-triggers itself for the rest
+OCR_BATCH_SIZE = 200
+
+# Default number of OCR requests in flight (ipai_ocr_expense.max_in_flight)
+OCR_MAX_IN_FLIGHT = 8
+
+OCR_TIMEOUT = 30
+
 
 class HrExpense(models.Model):
     """
@@ -34,7 +50,8 @@ class HrExpense(models.Model):
         ocr_status: Tracks OCR processing state (none/pending/done/error)
 
     Methods:
-        action_ipai_ocr_scan: Trigger OCR scan on attached receipt image
+        action_ipai_ocr_scan: Queue OCR scans of the attached receipt images
+        _cron_process_ocr_queue: Send queued receipts to the OCR service
     """
 
     _inherit = "hr.expense"
@@ -49,134 +66,365 @@ class HrExpense(models.Model):
         string="OCR Status",
         default="none",
         readonly=True,
+        index=True,
     )
 
-    def action_ipai_ocr_scan(self):
-        """Send the first attached receipt to InsightPulse OCR and fill fields."""
+    @api.model
+    def _get_ocr_config(self):
         params = self.env["ir.config_parameter"].sudo()
         enabled = (
             params.get_param("ipai_ocr_expense.ipai_ocr_enabled", "False") == "True"
         )
         api_url = params.get_param("ipai_ocr_expense.ipai_ocr_api_url")
-        api_key = params.get_param("ipai_ocr_expense.ipai_ocr_api_key")
 
         if not enabled:
             raise UserError(_("InsightPulse OCR is not enabled in settings."))
         if not api_url:
             raise UserError(_("InsightPulse OCR API URL is not configured."))
 
-        for expense in self:
-            attachments = self.env["ir.attachment"].search(
+        return {
+            "api_url": api_url,
+            "api_key": params.get_param("ipai_ocr_expense.ipai_ocr_api_key"),
+            "max_in_flight": int(
+                params.get_param("ipai_ocr_expense.max_in_flight", OCR_MAX_IN_FLIGHT)
+            ),
+        }
+
+    def _get_receipt_attachments(self):
+        """
+        First attached receipt image of each expense, in one search.
+
+        Returns:
+            dict: {expense id: ir.attachment}
+        """
+        attachments = self.env["ir.attachment"].search(
+            [
+                ("res_model", "=", "hr.expense"),
+                ("res_id", "in", self.ids),
+                ("mimetype", "like", "image%"),
+            ],
+            order="id",
+        )
+        receipts = {}
+        for attachment in attachments:
+            receipts.setdefault(attachment.res_id, attachment)
+        return receipts
+
+    @api.model
+    def _ocr_cached_results(self, checksums):
+        """
+        Latest successful scan of each receipt checksum.
+
+        Args:
+            checksums: iterable of ir.attachment checksums
+
+        Returns:
+            dict: {checksum: ocr.expense.log}
+        """
+        checksums = [checksum for checksum in set(checksums) if checksum]
+        if not checksums:
+            return {}
+        logs = (
+            self.env["ocr.expense.log"]
+            .sudo()
+            .search(
                 [
-                    ("res_model", "=", "hr.expense"),
-                    ("res_id", "=", expense.id),
-                    ("mimetype", "like", "image%"),
+                    ("receipt_checksum", "in", checksums),
+                    ("status", "in", ("success", "partial")),
                 ],
-                limit=1,
+                order="id desc",
             )
-            if not attachments:
-                raise UserError(_("Please attach a receipt image before running OCR."))
-
-            # Get employee_id for logging
-            employee = expense.employee_id or self.env.user.employee_id
-
-            # Create log entry (will be updated later)
-            log_vals = {
-                "expense_id": expense.id,
-                "user_id": self.env.uid,
-                "employee_id": employee.id if employee else False,
-                "source": "web",
-                "status": "failed",  # default to failed, update on success
-            }
-            log = self.env["ocr.expense.log"].sudo().create(log_vals)
-
-            expense.write({"ocr_status": "pending"})
-
-            # Track duration
-            start_time = time.time()
-
-            try:
-                file_content = attachments._file_read(attachments.store_fname)
-                files = {
-                    "file": (
-                        attachments.name or "receipt.jpg",
-                        file_content,
-                        attachments.mimetype,
-                    ),
-                }
-                headers = {}
-                if api_key:
-                    headers["X-API-Key"] = api_key
-
-                resp = requests.post(api_url, files=files, headers=headers, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
-
-                # Calculate duration
-                duration_ms = int((time.time() - start_time) * 1000)
-
-                # Map OCR JSON → fields (adjust as your OCR JSON evolves)
-                vals = {}
-                if data.get("total_amount"):
-                    vals["total_amount"] = data["total_amount"]
-                    vals["unit_amount"] = data[
-                        "total_amount"
-                    ]  # simple case 1 line = total
-
-                if data.get("merchant_name"):
-                    vals["name"] = data["merchant_name"]
-
-                if data.get("invoice_date"):
-                    vals["date"] = data["invoice_date"]
-
-                expense.write(vals)
-                expense.write({"ocr_status": "done"})
-
-                # Determine status based on field extraction
-                has_all_fields = all(
-                    [
-                        data.get("merchant_name"),
-                        data.get("invoice_date"),
-                        data.get("total_amount"),
-                    ]
-                )
-                status = "success" if has_all_fields else "partial"
+        )
+        cached = {}
+        for log in logs:
+            cached.setdefault(log.receipt_checksum, log)
+        return cached
+
+    @staticmethod
+    def _ocr_log_data(log):
+        """OCR JSON of an earlier scan, as returned by the OCR service."""
+        return {
+            "merchant_name": log.vendor_name_extracted,
+            "total_amount": log.total_extracted,
+            "currency": log.currency_extracted,
+            "invoice_date": fields.Date.to_string(log.date_extracted),
+            "confidence": log.confidence,
+        }
 
-                # Update log with success data
-                log.write(
+    def action_ipai_ocr_scan(self):
+        """Queue the first attached receipt of each expense for OCR."""
+        self._get_ocr_config()
+
+        receipts = self._get_receipt_attachments()
+        if not receipts:
+            raise UserError(_("Please attach a receipt image before running OCR."))
+        expenses = self.filtered(
+            lambda e: e.id in receipts and e.ocr_status != "pending"
+        )
+
+        # Create log entries (updated as each scan finishes)
+        logs = (
+            self.env["ocr.expense.log"]
+            .sudo()
+            .create(
+                [
                     {
-                        "status": status,
-                        "duration_ms": duration_ms,
-                        "vendor_name_extracted": data.get("merchant_name"),
-                        "total_extracted": data.get("total_amount"),
-                        "currency_extracted": data.get("currency"),
-                        "date_extracted": data.get("invoice_date"),
-                        "confidence": data.get("confidence", 0.0),
+                        "expense_id": expense.id,
+                        "user_id": self.env.uid,
+                        "employee_id": (
+                            expense.employee_id or self.env.user.employee_id
+                        ).id,
+                        "source": "web",
+                        "status": "queued",
+                        "receipt_checksum": receipts[expense.id].checksum,
                     }
-                )
+                    for expense in expenses
+                ]
+            )
+        )
+        expenses.write({"ocr_status": "pending"})
+
+        # Rescans of an already scanned receipt are answered right away
+        cached = self._ocr_cached_results(logs.mapped("receipt_checksum"))
+        reused = logs.filtered(lambda log: log.receipt_checksum in cached)
+        for log in reused:
+            log.expense_id._ocr_apply_or_fail(
+                log, self._ocr_log_data(cached[log.receipt_checksum]), 0, True
+            )
 
-                _logger.info(
-                    "OCR success for expense %s: %s (%.2f %s) in %dms",
-                    expense.id,
-                    data.get("merchant_name"),
-                    data.get("total_amount", 0.0),
-                    data.get("currency", "PHP"),
-                    duration_ms,
+        queued = logs - reused
+        if queued:
+            cron = self.env.ref(
+                "ipai_ocr_expense.ir_cron_ocr_expense_queue", raise_if_not_found=False
+            )
+            if cron:
+                cron._trigger()
+
+        message = _("%s receipt(s) queued for OCR.") % len(queued)
+        if reused:
+            message += " " + _("%s filled from earlier scans.") % len(reused)
+        skipped = self - expenses
+        if skipped:
+            message += " " + _(
+                "%s expense(s) skipped (no receipt image or already queued)."
+            ) % len(skipped)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("InsightPulse OCR"),
+                "message": message,
+                "type": "info",
+                "next": {"type": "ir.actions.act_window_close"},
+            },
+        }
+
+    @api.model
+    def _cron_process_ocr_queue(self):
+        """
+        Send queued receipts to the OCR service.
+
+        Requests run in a thread pool bounded by ipai_ocr_expense.max_in_flight
+        and only do HTTP; every result is written back (and committed) by the
+        cron thread as soon as its request finishes.
+        """
+        try:
+            config = self._get_ocr_config()
+        except UserError as e:
+            _logger.warning("OCR queue not processed: %s", e)
+            return
+
+        logs = (
+            self.env["ocr.expense.log"]
+            .sudo()
+            .search([("status", "=", "queued")], order="id", limit=OCR_BATCH_SIZE)
+        )
+        if not logs:
+            return
+        receipts = logs.expense_id._get_receipt_attachments()
+        cached = self._ocr_cached_results(logs.mapped("receipt_checksum"))
+
+        # Read receipt bytes up-front: worker threads must not use the ORM.
+        # Identical receipts (same checksum) are sent once for all their logs.
+        jobs = {}
+        waiting = defaultdict(list)
+        for log in logs:
+            attachment = receipts.get(log.expense_id.id)
+            if not attachment:
+                log.expense_id._ocr_mark_failed(log, _("Receipt image not found"), 0)
+                continue
+            key = log.receipt_checksum or attachment.checksum or log.id
+            if key in cached:
+                log.expense_id._ocr_apply_or_fail(
+                    log, self._ocr_log_data(cached[key]), 0, True
                 )
-
-            except Exception as e:
-                # Calculate duration even on failure
-                duration_ms = int((time.time() - start_time) * 1000)
-
-                # Update log with error
-                log.write(
-                    {
-                        "status": "failed",
-                        "duration_ms": duration_ms,
-                        "error_message": str(e),
-                    }
+                continue
+            waiting[key].append(log)
+            if key not in jobs:
+                jobs[key] = (
+                    attachment.name or "receipt.jpg",
+                    attachment.raw,
+                    attachment.mimetype,
                 )
+        self.env.cr.commit()
+        total = sum(len(key_logs) for key_logs in waiting.values())
+
+        headers = {}
+        if config["api_key"]:
+            headers["X-API-Key"] = config["api_key"]
+
+        done = 0
+        max_in_flight = max(1, config["max_in_flight"])
+        with requests.Session() as session, ThreadPoolExecutor(
+            max_workers=max_in_flight
+        ) as executor:
+            # One pooled connection per worker thread (urllib3 keeps 10 by default)
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_in_flight)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            futures = {
+                executor.submit(
+                    self._ocr_request, session, config["api_url"], headers, file_tuple
+                ): key
+                for key, file_tuple in jobs.items()
+            }
+            for future in as_completed(futures):
+                data, error, duration_ms = future.result()
+                for index, log in enumerate(waiting[futures[future]]):
+                    if error:
+                        log.expense_id._ocr_mark_failed(log, error, duration_ms)
+                    else:
+                        log.expense_id._ocr_apply_or_fail(
+                            log, data, duration_ms, bool(index)
+                        )
+                    done += 1
+                self.env.cr.commit()
+                self.env["ir.cron"]._notify_progress(done=done, remaining=total - done)
+
+        self._ocr_notify_users(logs)
+        if len(logs) == OCR_BATCH_SIZE:
+            self.env.ref("ipai_ocr_expense.ir_cron_ocr_expense_queue")._trigger()
+
+    @staticmethod
+    def _ocr_request(session, api_url, headers, file_tuple):
+        """
+        POST one receipt to the OCR service (runs in a worker thread).
+
+        Returns:
+            tuple: (OCR JSON or None, error message or None, duration in ms)
+        """
+        start_time = time.time()
+        try:
+            resp = session.post(
+                api_url,
+                files={"file": file_tuple},
+                headers=headers,
+                timeout=OCR_TIMEOUT,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+        except Exception as e:
+            _logger.exception("Error calling InsightPulse OCR: %s", e)
+            return None, str(e), int((time.time() - start_time) * 1000)
+        return data, None, int((time.time() - start_time) * 1000)
+
+    def _ocr_apply_or_fail(self, log, data, duration_ms, cache_hit=False):
+        """
+        Apply an OCR result in a savepoint.
+
+        A result the expense rejects (unparsable date, non-numeric amount)
+        fails that scan only, instead of aborting the whole queue run and
+        leaving the receipt queued to be sent again.
+        """
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                self._ocr_apply_result(log, data, duration_ms, cache_hit)
+        except Exception as e:
+            _logger.exception("Error applying OCR result to expense %s", self.id)
+            self._ocr_mark_failed(log, str(e), duration_ms)
+
+    def _ocr_apply_result(self, log, data, duration_ms, cache_hit=False):
+        """
+        Map OCR JSON → expense fields and complete the log.
+
+        Args:
+            log: queued ocr.expense.log of the scan
+            data: OCR JSON
+            duration_ms: OCR call duration
+            cache_hit: the result comes from an earlier scan of the receipt
+        """
+        self.ensure_one()
+
+        # Map OCR JSON → fields (adjust as your OCR JSON evolves)
+        vals = {"ocr_status": "done"}
+        if data.get("total_amount"):
+            vals["total_amount"] = data["total_amount"]
+            vals["unit_amount"] = data["total_amount"]  # simple case 1 line = total
+
+        if data.get("merchant_name"):
+            vals["name"] = data["merchant_name"]
+
+        if data.get("invoice_date"):
+            vals["date"] = data["invoice_date"]
+
+        self.write(vals)
+
+        # Determine status based on field extraction
+        has_all_fields = all(
+            [
+                data.get("merchant_name"),
+                data.get("invoice_date"),
+                data.get("total_amount"),
+            ]
+        )
+        status = "success" if has_all_fields else "partial"
+
+        # Update log with success data
+        log.write(
+            {
+                "status": status,
+                "duration_ms": duration_ms,
+                "cache_hit": cache_hit,
+                "vendor_name_extracted": data.get("merchant_name"),
+                "total_extracted": data.get("total_amount"),
+                "currency_extracted": data.get("currency"),
+                "date_extracted": data.get("invoice_date"),
+                "confidence": data.get("confidence", 0.0),
+            }
+        )
+
+        _logger.info(
+            "OCR success for expense %s: %s (%.2f %s) in %dms",
+            self.id,
+            data.get("merchant_name"),
+            data.get("total_amount") or 0.0,
+            data.get("currency", "PHP"),
+            duration_ms,
+        )
 
-                _logger.exception("Error calling InsightPulse OCR: %s", e)
-                expense.write({"ocr_status": "error"})
-                raise UserError(_("OCR failed: %s") % str(e))
+    def _ocr_mark_failed(self, log, error, duration_ms):
+        log.write(
+            {
+                "status": "failed",
+                "duration_ms": duration_ms,
+                "error_message": error,
+            }
+        )
+        self.write({"ocr_status": "error"})
+
+    @api.model
+    def _ocr_notify_users(self, logs):
+        """Tell each requester how their scans ended."""
+        for user in logs.user_id:
+            user_logs = logs.filtered(lambda log: log.user_id == user)
+            failed = len(user_logs.filtered(lambda log: log.status == "failed"))
+            user._bus_send(
+                "simple_notification",
+                {
+                    "title": _("InsightPulse OCR"),
+                    "message": _("%(done)s receipt(s) scanned, %(failed)s failed.")
+                    % {"done": len(user_logs) - failed, "failed": failed},
+                    "type": "warning" if failed else "success",
+                },
+            )
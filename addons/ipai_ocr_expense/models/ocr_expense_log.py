@@ -70,6 +70,7 @@ class OcrExpenseLog(models.Model):
     # OCR results
     status = fields.Selection(
         [
+            ("queued", "Queued"),
             ("success", "Success"),
             ("partial", "Partial Success"),
             ("failed", "Failed"),
@@ -77,6 +78,7 @@ class OcrExpenseLog(models.Model):
         string="Status",
         required=True,
         default="success",
+        index=True,
     )
     vendor_name_extracted = fields.Char(
         string="Vendor Name", help="Extracted merchant/vendor name"
@@ -100,6 +102,15 @@ class OcrExpenseLog(models.Model):
     request_id = fields.Char(
         string="Request ID", help="Unique request identifier for tracing"
     )
+    receipt_checksum = fields.Char(
+        string="Receipt Checksum",
+        index=True,
+        help="Checksum of the scanned receipt attachment (ir.attachment.checksum)",
+    )
+    cache_hit = fields.Boolean(
+        string="Cache Hit",
+        help="Result reused from an earlier scan of the same receipt",
+    )
 
     # Computed fields for analytics
     is_successful = fields.Boolean(
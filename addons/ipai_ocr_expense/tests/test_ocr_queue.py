@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase
+
+OCR_RESULT = {
+    "merchant_name": "Jollibee",
+    "total_amount": 245.5,
+    "currency": "PHP",
+    "invoice_date": "2025-01-15",
+    "confidence": 0.92,
+}
+
+
+class TestOcrQueue(TransactionCase):
+    """
+    Unit tests for the queued OCR scans.
+
+    Test Coverage:
+    - Scan action queues receipts and triggers the runner
+    - Runner writes back successful, failed and rejected results
+    - Identical receipts are sent once per run
+    - Rescans reuse earlier results by attachment checksum
+    """
+
+    def setUp(self):
+        super().setUp()
+        # The runner commits after each result
+        self.patch(self.env.cr, "commit", lambda: None)
+
+        params = self.env["ir.config_parameter"].sudo()
+        params.set_param("ipai_ocr_expense.ipai_ocr_enabled", "True")
+        params.set_param("ipai_ocr_expense.ipai_ocr_api_url", "http://ocr.test/ocr")
+
+        self.employee = self.env["hr.employee"].create({"name": "OCR Tester"})
+        self.Expense = self.env["hr.expense"]
+        self.Log = self.env["ocr.expense.log"]
+
+    def _expense_with_receipt(self, content=b"receipt-1"):
+        expense = self.Expense.create(
+            {"name": "Receipt", "employee_id": self.employee.id}
+        )
+        self.env["ir.attachment"].create(
+            {
+                "name": "receipt.png",
+                "raw": content,
+                "mimetype": "image/png",
+                "res_model": "hr.expense",
+                "res_id": expense.id,
+            }
+        )
+        return expense
+
+    def _logs(self, expenses):
+        return self.Log.search([("expense_id", "in", expenses.ids)], order="id")
+
+    def _run_queue(self, results):
+        """
+        Run the queue runner with a mocked OCR service.
+
+        Args:
+            results: {receipt content: _ocr_request result}, requests run in
+                worker threads so results are keyed by the receipt sent
+        """
+
+        def ocr_request(session, api_url, headers, file_tuple):
+            return results[file_tuple[1]]
+
+        with patch.object(
+            type(self.Expense), "_ocr_request", side_effect=ocr_request
+        ) as request:
+            self.Expense._cron_process_ocr_queue()
+        return request
+
+    def test_scan_queues_receipts(self):
+        expense = self._expense_with_receipt()
+        with patch.object(type(self.env["ir.cron"]), "_trigger") as trigger:
+            expense.action_ipai_ocr_scan()
+
+        self.assertEqual(expense.ocr_status, "pending")
+        self.assertEqual(self._logs(expense).mapped("status"), ["queued"])
+        trigger.assert_called_once()
+
+    def test_queue_to_done(self):
+        expense = self._expense_with_receipt()
+        expense.action_ipai_ocr_scan()
+
+        request = self._run_queue({b"receipt-1": (dict(OCR_RESULT), None, 120)})
+
+        request.assert_called_once()
+        log = self._logs(expense)
+        self.assertEqual(expense.ocr_status, "done")
+        self.assertEqual(expense.name, "Jollibee")
+        self.assertEqual(log.status, "success")
+        self.assertEqual(log.duration_ms, 120)
+        self.assertEqual(log.total_extracted, 245.5)
+        self.assertFalse(log.cache_hit)
+
+    def test_queue_to_failed(self):
+        expense = self._expense_with_receipt()
+        expense.action_ipai_ocr_scan()
+
+        self._run_queue({b"receipt-1": (None, "503 Service Unavailable", 30)})
+
+        log = self._logs(expense)
+        self.assertEqual(expense.ocr_status, "error")
+        self.assertEqual(log.status, "failed")
+        self.assertEqual(log.error_message, "503 Service Unavailable")
+
+    def test_rejected_result_fails_only_its_receipt(self):
+        bad = self._expense_with_receipt(b"receipt-bad")
+        good = self._expense_with_receipt(b"receipt-good")
+        (bad | good).action_ipai_ocr_scan()
+
+        self._run_queue(
+            {
+                b"receipt-bad": (dict(OCR_RESULT, invoice_date="not a date"), None, 10),
+                b"receipt-good": (dict(OCR_RESULT), None, 20),
+            }
+        )
+
+        self.assertEqual(bad.ocr_status, "error")
+        self.assertEqual(self._logs(bad).status, "failed")
+        self.assertEqual(bad.name, "Receipt")
+        self.assertEqual(good.ocr_status, "done")
+        self.assertEqual(self._logs(good).status, "success")
+        self.assertFalse(self.Log.search([("status", "=", "queued")]))
+
+    def test_identical_receipts_sent_once(self):
+        first = self._expense_with_receipt(b"same-receipt")
+        second = self._expense_with_receipt(b"same-receipt")
+        (first | second).action_ipai_ocr_scan()
+
+        request = self._run_queue({b"same-receipt": (dict(OCR_RESULT), None, 50)})
+
+        request.assert_called_once()
+        logs = self._logs(first | second)
+        self.assertEqual(logs.mapped("status"), ["success", "success"])
+        self.assertEqual(logs.mapped("cache_hit"), [False, True])
+
+    def test_rescan_reuses_checksum_result(self):
+        first = self._expense_with_receipt(b"scanned-receipt")
+        first.action_ipai_ocr_scan()
+        self._run_queue({b"scanned-receipt": (dict(OCR_RESULT), None, 50)})
+
+        rescan = self._expense_with_receipt(b"scanned-receipt")
+        with patch.object(type(self.env["ir.cron"]), "_trigger") as trigger:
+            rescan.action_ipai_ocr_scan()
+
+        log = self._logs(rescan)
+        self.assertEqual(rescan.ocr_status, "done")
+        self.assertEqual(rescan.name, "Jollibee")
+        self.assertEqual(log.status, "success")
+        self.assertTrue(log.cache_hit)
+        self.assertEqual(log.duration_ms, 0)
+        trigger.assert_not_called()
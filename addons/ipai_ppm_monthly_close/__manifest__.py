@@ -43,6 +43,7 @@ Integration:
     ],
     "data": [
         "security/ir.model.access.csv",
+        "data/ph_holidays_2026.xml",
         "data/ppm_close_template_data_REAL.xml",
         "data/ppm_close_cron.xml",
         "views/ppm_monthly_close_views.xml",
@@ -1,2 +1,7 @@
 # -*- coding: utf-8 -*-
-from . import ppm_close_task, ppm_close_template, ppm_monthly_close
+from . import (
+    ppm_business_calendar,
+    ppm_close_task,
+    ppm_close_template,
+    ppm_monthly_close,
+)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+from bisect import bisect_right
+from datetime import date, time, timedelta
+
+import pytz
+
+from odoo import api, models, tools
+
+# Used when the company has no working-time calendar (Monday to Friday)
+DEFAULT_WORKING_WEEKDAYS = frozenset(range(5))
+
+# A leave makes a day a holiday when it covers the day's midday
+MIDDAY = time(12)
+
+
+class PpmBusinessCalendar(models.AbstractModel):
+    """
+    Shared business-day calendar for close and compliance scheduling.
+
+    Working weekdays come from the company working-time calendar and
+    holidays from global public holidays (resource.calendar.leaves without
+    resource), read in the calendar's timezone. For every year a sorted tuple of business days is built once
+    and cached, so add/subtract/diff are index lookups instead of day-by-day
+    loops.
+    """
+
+    _name = "ppm.business.calendar"
+    _description = "Business Day Calendar"
+
+    @api.model
+    def _get_calendar_id(self):
+        return self.env.company.resource_calendar_id.id or False
+
+    @api.model
+    @tools.ormcache("year", "calendar_id")
+    def _get_year_index(self, year, calendar_id):
+        """
+        Business days of a year.
+
+        Returns:
+            tuple: sorted ordinals (date.toordinal()) of the business days
+        """
+        calendar = self.env["resource.calendar"].sudo().browse(calendar_id)
+        weekdays = DEFAULT_WORKING_WEEKDAYS
+        if calendar and calendar.attendance_ids:
+            weekdays = frozenset(
+                int(day) for day in calendar.attendance_ids.mapped("dayofweek")
+            )
+
+        year_start = date(year, 1, 1)
+        year_end = date(year, 12, 31)
+        holidays = set()
+        # Leave datetimes are UTC: a local day can start the day before
+        leaves = (
+            self.env["resource.calendar.leaves"]
+            .sudo()
+            .search(
+                [
+                    ("resource_id", "=", False),
+                    ("calendar_id", "in", [False, calendar_id]),
+                    ("date_from", "<", f"{year_end + timedelta(days=2)} 00:00:00"),
+                    ("date_to", ">=", f"{year_start - timedelta(days=1)} 00:00:00"),
+                ]
+            )
+        )
+        tz = pytz.timezone(calendar.tz or "UTC")
+        for leave in leaves:
+            start = pytz.utc.localize(leave.date_from).astimezone(tz)
+            end = pytz.utc.localize(leave.date_to).astimezone(tz)
+            # Only days covered at midday: a full-day holiday entered in
+            # Manila (16:00 UTC the day before) does not close that day too
+            day, last = start.date(), end.date()
+            if start.time() > MIDDAY:
+                day += timedelta(days=1)
+            if end.time() < MIDDAY:
+                last -= timedelta(days=1)
+            day = max(day, year_start)
+            last = min(last, year_end)
+            while day <= last:
+                holidays.add(day.toordinal())
+                day += timedelta(days=1)
+
+        return tuple(
+            ordinal
+            for ordinal in range(year_start.toordinal(), year_end.toordinal() + 1)
+            if date.fromordinal(ordinal).weekday() in weekdays
+            and ordinal not in holidays
+        )
+
+    @api.model
+    def _business_days(self, year):
+        return self._get_year_index(year, self._get_calendar_id())
+
+    @api.model
+    def _rank(self, day):
+        """Number of business days of ``day``'s year up to and including it."""
+        return bisect_right(self._business_days(day.year), day.toordinal())
+
+    @api.model
+    def is_business_day(self, day):
+        """Check if ``day`` is a business day."""
+        days = self._business_days(day.year)
+        rank = bisect_right(days, day.toordinal())
+        return bool(rank) and days[rank - 1] == day.toordinal()
+
+    @api.model
+    def add_business_days(self, day, num_days):
+        """
+        Move ``num_days`` business days from ``day`` (negative to go back).
+
+        The start day itself is never counted, so the result is always a
+        business day different from ``day`` unless ``num_days`` is 0.
+        """
+        if not num_days:
+            return day
+
+        year = day.year
+        days = self._business_days(year)
+        if num_days > 0:
+            target = self._rank(day) + num_days
+            while target > len(days):
+                target -= len(days)
+                year += 1
+                days = self._business_days(year)
+            return date.fromordinal(days[target - 1])
+
+        before = self._rank(day) - self.is_business_day(day)
+        target = before + num_days + 1
+        while target < 1:
+            year -= 1
+            days = self._business_days(year)
+            target += len(days)
+        return date.fromordinal(days[target - 1])
+
+    @api.model
+    def subtract_business_days(self, day, num_days):
+        """Move ``num_days`` business days back from ``day``."""
+        return self.add_business_days(day, -num_days)
+
+    @api.model
+    def diff_business_days(self, start, end):
+        """Number of business days in (start, end] (negative if end < start)."""
+        if end < start:
+            return -self.diff_business_days(end, start)
+        count = self._rank(end) - self._rank(start)
+        for year in range(start.year, end.year):
+            count += len(self._business_days(year))
+        return count
+
+    @api.model
+    def previous_business_day(self, day):
+        """``day`` if it is a business day, otherwise the one before it."""
+        if self.is_business_day(day):
+            return day
+        return self.add_business_days(day, -1)
+
+    @api.model
+    def next_business_day(self, day):
+        """``day`` if it is a business day, otherwise the one after it."""
+        if self.is_business_day(day):
+            return day
+        return self.add_business_days(day, 1)
+
+
+class ResourceCalendar(models.Model):
+    _inherit = "resource.calendar"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "tz" in vals:
+            self.env.registry.clear_cache()
+        return res
+
+
+class ResourceCalendarLeaves(models.Model):
+    """Public holidays (leaves without resource) change the business days."""
+
+    _inherit = "resource.calendar.leaves"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if records.filtered(lambda leave: not leave.resource_id):
+            self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        was_global = bool(self.filtered(lambda leave: not leave.resource_id))
+        res = super().write(vals)
+        if was_global or self.filtered(lambda leave: not leave.resource_id):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        was_global = bool(self.filtered(lambda leave: not leave.resource_id))
+        res = super().unlink()
+        if was_global:
+            self.env.registry.clear_cache()
+        return res
+
+
+class ResourceCalendarAttendance(models.Model):
+    _inherit = "resource.calendar.attendance"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
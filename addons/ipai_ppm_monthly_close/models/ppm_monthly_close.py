@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import UserError, ValidationError
@@ -119,7 +119,10 @@ class PpmMonthlyClose(models.Model):
         - S = C - 3 working days
         - Review = S + 1 working day
         - Approval = S + 1 working day (EOD)
+
+        Weekends and public holidays come from ppm.business.calendar.
         """
+        calendar = self.env["ppm.business.calendar"]
         for record in self:
             if not record.close_month:
                 record.month_end_date = False
@@ -133,15 +136,15 @@ class PpmMonthlyClose(models.Model):
             last_day = next_month - timedelta(days=1)
 
             # Find last business day (C)
-            month_end = self._get_previous_business_day(last_day)
+            month_end = calendar.previous_business_day(last_day)
             record.month_end_date = month_end
 
             # Calculate S = C - 3 working days
-            prep_start = self._subtract_business_days(month_end, 3)
+            prep_start = calendar.subtract_business_days(month_end, 3)
             record.prep_start_date = prep_start
 
             # Review and Approval = S + 1 working day
-            review_approval = self._add_business_days(prep_start, 1)
+            review_approval = calendar.add_business_days(prep_start, 1)
             record.review_due_date = review_approval
             record.approval_due_date = review_approval
 
@@ -158,55 +161,27 @@ class PpmMonthlyClose(models.Model):
                 else 0.0
             )
 
-    def _get_business_days(self):
-        """
-        Get list of business days (Monday-Friday).
-        Excludes weekends. Could be extended to exclude holidays.
-        """
-        # TODO: Integrate with resource.calendar for holiday exclusions
-        return [0, 1, 2, 3, 4]  # Monday to Friday
-
     def _is_business_day(self, date):
         """Check if date is a business day."""
-        return date.weekday() in self._get_business_days()
+        return self.env["ppm.business.calendar"].is_business_day(date)
 
     def _get_previous_business_day(self, date):
         """Get previous business day from given date."""
-        current = date
-        while not self._is_business_day(current):
-            current -= timedelta(days=1)
-        return current
+        return self.env["ppm.business.calendar"].previous_business_day(date)
 
     def _get_next_business_day(self, date):
         """Get next business day from given date."""
-        current = date
-        while not self._is_business_day(current):
-            current += timedelta(days=1)
-        return current
+        return self.env["ppm.business.calendar"].next_business_day(date)
 
     def _subtract_business_days(self, start_date, num_days):
         """Subtract N business days from start date."""
-        current = start_date
-        days_subtracted = 0
-
-        while days_subtracted < num_days:
-            current -= timedelta(days=1)
-            if self._is_business_day(current):
-                days_subtracted += 1
-
-        return current
+        return self.env["ppm.business.calendar"].subtract_business_days(
+            start_date, num_days
+        )
 
     def _add_business_days(self, start_date, num_days):
         """Add N business days to start date."""
-        current = start_date
-        days_added = 0
-
-        while days_added < num_days:
-            current += timedelta(days=1)
-            if self._is_business_day(current):
-                days_added += 1
-
-        return current
+        return self.env["ppm.business.calendar"].add_business_days(start_date, num_days)
 
     def action_generate_tasks(self):
         """
@@ -222,6 +197,49 @@ class PpmMonthlyClose(models.Model):
                 )
             )
 
+        created_tasks = self._generate_tasks_batch()
+
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Tasks Generated"),
+                "message": _("%d tasks created successfully") % len(created_tasks),
+                "type": "success",
+                "sticky": False,
+            },
+        }
+
+    def _prepare_task_vals(self, template):
+        """Return the ppm.close.task values for a template in this close."""
+        self.ensure_one()
+        return {
+            "monthly_close_id": self.id,
+            "template_id": template.id,
+            "name": template.task_category,
+            "detailed_task": template.detailed_task,
+            "agency_code": template.agency_code,
+            "owner_code": template.owner_code,
+            "reviewer_code": template.reviewer_code,
+            "approver_code": template.approver_code,
+            "prep_days": template.prep_days,
+            "review_days": template.review_days,
+            "approval_days": template.approval_days,
+            "sequence": template.sequence,
+        }
+
+    def _generate_tasks_batch(self):
+        """
+        Generate template tasks for every close in ``self`` at once.
+
+        All task values are built up front and created with a single
+        multi-record create. Tracking, creation log messages and follower
+        subscriptions are disabled for the generated tasks; each close gets
+        one summary note instead.
+
+        Returns:
+            recordset: created ppm.close.task records
+        """
         # Get active templates
         templates = self.env["ppm.close.template"].search([("active", "=", True)])
 
@@ -230,46 +248,61 @@ class PpmMonthlyClose(models.Model):
                 _("No active task templates found. Please create templates first.")
             )
 
-        # Create tasks from templates
-        created_tasks = self.env["ppm.close.task"]
-        for template in templates:
-            task_vals = {
-                "monthly_close_id": self.id,
-                "template_id": template.id,
-                "name": template.task_category,
-                "detailed_task": template.detailed_task,
-                "agency_code": template.agency_code,
-                "owner_code": template.owner_code,
-                "reviewer_code": template.reviewer_code,
-                "approver_code": template.approver_code,
-                "prep_days": template.prep_days,
-                "review_days": template.review_days,
-                "approval_days": template.approval_days,
-                "sequence": template.sequence,
-            }
-            task = self.env["ppm.close.task"].create(task_vals)
-            created_tasks |= task
+        vals_list = [
+            close._prepare_task_vals(template)
+            for close in self
+            for template in templates
+        ]
+        created_tasks = (
+            self.env["ppm.close.task"]
+            .with_context(
+                tracking_disable=True,
+                mail_create_nolog=True,
+                mail_create_nosubscribe=True,
+                mail_notrack=True,
+            )
+            .create(vals_list)
+        )
 
         # Update state
-        if self.state == "draft":
-            self.state = "scheduled"
+        self.filtered(lambda close: close.state == "draft").write(
+            {"state": "scheduled"}
+        )
 
         # Log activity
-        self.message_post(
-            body=_("Generated %d tasks from templates") % len(created_tasks),
-            subtype_xmlid="mail.mt_note",
-        )
+        for close in self:
+            close.message_post(
+                body=_("Generated %d tasks from templates") % len(templates),
+                subtype_xmlid="mail.mt_note",
+            )
 
-        return {
-            "type": "ir.actions.client",
-            "tag": "display_notification",
-            "params": {
-                "title": _("Tasks Generated"),
-                "message": _("%d tasks created successfully") % len(created_tasks),
-                "type": "success",
-                "sticky": False,
-            },
-        }
+        return created_tasks
+
+    @api.model
+    def action_generate_year(self, year):
+        """
+        Open all 12 close periods of a year and generate their tasks.
+
+        Periods that already exist are skipped. Closes and tasks are created
+        with one multi-record create each.
+
+        Args:
+            year: calendar year (int)
+
+        Returns:
+            recordset: created ppm.monthly.close records
+        """
+        months = [date(year, month, 1) for month in range(1, 13)]
+        existing = set(
+            self.search([("close_month", "in", months)]).mapped("close_month")
+        )
+        closes = self.create(
+            [{"close_month": month} for month in months if month not in existing]
+        )
+        if closes:
+            closes._generate_tasks_batch()
+        _logger.info("Generated %d close periods for %s", len(closes), year)
+        return closes
 
     def action_start_close(self):
         """Start the close process - send notifications."""
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from datetime import date
+from unittest.mock import patch
 
 from odoo.exceptions import UserError
 from odoo.tests import TransactionCase
@@ -369,3 +370,94 @@ class TestMonthlyClose(TransactionCase):
             "ppm.monthly.close",
             "Cron should return a ppm.monthly.close record",
         )
+
+    def test_11_holiday_aware_business_days(self):
+        """Test that public holidays are excluded from business day arithmetic."""
+        calendar = self.env["ppm.business.calendar"]
+
+        # Bonifacio Day 2026 (Monday 30 Nov) is shipped as a public holiday
+        bonifacio_day = date(2026, 11, 30)
+        self.assertFalse(
+            calendar.is_business_day(bonifacio_day),
+            "Bonifacio Day should not be a business day",
+        )
+        self.assertEqual(
+            calendar.add_business_days(date(2026, 11, 27), 1),
+            date(2026, 12, 1),
+            "Adding 1 business day from Fri 27 Nov should skip the holiday",
+        )
+
+        # Month end skips the holiday: C = Fri 27 Nov, S = C - 3 = Tue 24 Nov
+        close = self.MonthlyClose.create({"close_month": date(2026, 11, 1)})
+        self.assertEqual(close.month_end_date, date(2026, 11, 27))
+        self.assertEqual(close.prep_start_date, date(2026, 11, 24))
+
+        # A newly created global leave invalidates the cached calendar
+        self.env["resource.calendar.leaves"].create(
+            {
+                "name": "Special Non-Working Day",
+                "date_from": "2026-11-24 00:00:00",
+                "date_to": "2026-11-24 23:59:59",
+            }
+        )
+        self.assertFalse(calendar.is_business_day(date(2026, 11, 24)))
+        self.assertEqual(
+            calendar.diff_business_days(date(2026, 11, 20), date(2026, 11, 27)),
+            4,
+            "Only Mon 23, Wed 25, Thu 26 and Fri 27 Nov are business days",
+        )
+
+    def test_12_generate_year(self):
+        """Test that a whole year of close periods is generated in one call."""
+        template_count = self.CloseTemplate.search_count([("active", "=", True)])
+
+        closes = self.MonthlyClose.action_generate_year(2027)
+
+        self.assertEqual(len(closes), 12, "Should create 12 close periods")
+        self.assertEqual(
+            closes.mapped("close_month"),
+            [date(2027, month, 1) for month in range(1, 13)],
+        )
+        for close in closes:
+            self.assertEqual(len(close.task_ids), template_count)
+            self.assertEqual(close.state, "scheduled")
+
+        # Existing periods are skipped
+        self.assertFalse(self.MonthlyClose.action_generate_year(2027))
+
+    def test_13_holidays_in_calendar_timezone(self):
+        """Test that holidays are read in the working-time calendar's timezone."""
+        calendar = self.env["ppm.business.calendar"]
+        self.env.company.resource_calendar_id.tz = "Asia/Manila"
+
+        # Full-day holiday on Wed 25 Nov entered in Manila (UTC+8)
+        self.env["resource.calendar.leaves"].create(
+            {
+                "name": "Special Non-Working Day",
+                "date_from": "2026-11-24 16:00:00",
+                "date_to": "2026-11-25 15:59:59",
+            }
+        )
+        self.assertTrue(calendar.is_business_day(date(2026, 11, 24)))
+        self.assertFalse(calendar.is_business_day(date(2026, 11, 25)))
+        # Shipped holidays (UTC midnight to midnight) still close one day
+        self.assertTrue(calendar.is_business_day(date(2026, 12, 1)))
+        self.assertFalse(calendar.is_business_day(date(2026, 11, 30)))
+
+    def test_14_employee_leaves_keep_cached_calendar(self):
+        """Test that time off of one resource does not invalidate the calendar."""
+        calendar = self.env["ppm.business.calendar"]
+        calendar.is_business_day(date(2026, 11, 24))
+        resource = self.env["resource.resource"].create({"name": "Test Resource"})
+
+        with patch.object(type(self.env.registry), "clear_cache") as clear_cache:
+            self.env["resource.calendar.leaves"].create(
+                {
+                    "name": "Vacation",
+                    "resource_id": resource.id,
+                    "date_from": "2026-11-24 00:00:00",
+                    "date_to": "2026-11-24 23:59:59",
+                }
+            )
+        clear_cache.assert_not_called()
+        self.assertTrue(calendar.is_business_day(date(2026, 11, 24)))
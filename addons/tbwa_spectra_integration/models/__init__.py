@@ -4,5 +4,6 @@ from . import (
     hr_expense_advance,
     hr_expense_sheet,
     spectra_export,
+    spectra_export_job,
     spectra_mapping,
 )
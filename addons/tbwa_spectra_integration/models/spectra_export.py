@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
-import base64
+import contextlib
 import csv
+import hashlib
 import io
 import logging
+import os
+import shutil
+import tempfile
 from datetime import datetime, timedelta
 
 from odoo.exceptions import UserError, ValidationError
@@ -11,6 +15,11 @@ from odoo import _, api, fields, models
 
 _logger = logging.getLogger(__name__)
 
+# Number of records loaded per read() while streaming export files
+EXPORT_CHUNK_SIZE = 1000
+# Block size used when copying a finished export into the filestore
+EXPORT_COPY_BLOCK = 1024 * 1024
+
 
 class SpectraExport(models.Model):
     """
@@ -185,6 +194,11 @@ class SpectraExport(models.Model):
                 record.total_amount = sum(
                     record.journal_entry_ids.mapped("amount_total")
                 )
+            elif record.export_type == "audit_trail":
+                record.record_count = len(record.expense_sheet_ids)
+                record.total_amount = sum(
+                    record.expense_sheet_ids.mapped("total_amount")
+                )
             else:
                 record.record_count = 0
                 record.total_amount = 0.0
@@ -200,6 +214,9 @@ class SpectraExport(models.Model):
 
         # Validate expense sheets
         if self.export_type == "expense":
+            gl_codes = self.env["tbwa.spectra.gl.code"].resolve_gl_codes(
+                self.expense_sheet_ids.expense_line_ids
+            )
             for sheet in self.expense_sheet_ids:
                 # Check approval status
                 if sheet.state != "approve":
@@ -215,10 +232,7 @@ class SpectraExport(models.Model):
 
                 # Check GL mapping
                 for expense in sheet.expense_line_ids:
-                    gl_mapping = self.env["tbwa.spectra.gl.code"].search(
-                        [("expense_category", "=", expense.product_id.name)], limit=1
-                    )
-                    if not gl_mapping:
+                    if expense.id not in gl_codes:
                         errors.append(
                             f"No GL mapping for category: {expense.product_id.name}"
                         )
@@ -263,274 +277,501 @@ class SpectraExport(models.Model):
         elif self.export_type == "journal_entry":
             self._generate_journal_entry_export()
 
-        # Generate audit trail
-        self._generate_audit_trail()
+        # Generate audit trail (queued batches of a period get it from their
+        # own audit_trail batch, see cron_auto_export)
+        if not self.env.context.get("spectra_skip_audit_trail"):
+            self._generate_audit_trail()
 
         self.state = "exported"
         self.message_post(body=_("Export files generated successfully"))
 
         return True
 
+    @contextlib.contextmanager
+    def _stream_export_file(self, field_name, filename):
+        """
+        Stream CSV rows into a temporary file and store it on a Binary field.
+
+        The payload is written to disk as rows are produced and copied into
+        the attachment store at the end, so the full file is never held in
+        memory (no StringIO / base64 copies).
+
+        Args:
+            field_name: Binary field receiving the file (e.g. export_file_je)
+            filename: Name stored on the matching ``<field_name>_name`` field
+
+        Yields:
+            csv.writer writing to the temporary file
+        """
+        with tempfile.TemporaryFile() as stream:
+            text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+            try:
+                yield csv.writer(text)
+                text.flush()
+                stream.seek(0)
+                self._store_export_file(field_name, stream)
+            finally:
+                text.detach()
+        self[f"{field_name}_name"] = filename
+
+    def _store_export_file(self, field_name, stream):
+        """Attach a file-like export payload to a Binary field without loading it."""
+        self.ensure_one()
+        Attachment = self.env["ir.attachment"].sudo()
+        Attachment.search(
+            [
+                ("res_model", "=", self._name),
+                ("res_field", "=", field_name),
+                ("res_id", "=", self.id),
+            ]
+        ).unlink()
+
+        vals = {
+            "name": field_name,
+            "res_model": self._name,
+            "res_field": field_name,
+            "res_id": self.id,
+            "type": "binary",
+            "mimetype": "text/csv",
+        }
+        if Attachment._storage() == "file":
+            sha = hashlib.sha1()
+            file_size = 0
+            for block in iter(lambda: stream.read(EXPORT_COPY_BLOCK), b""):
+                sha.update(block)
+                file_size += len(block)
+            checksum = sha.hexdigest()
+            store_fname, full_path = Attachment._get_path(None, checksum)
+            if not os.path.exists(full_path):
+                stream.seek(0)
+                with open(full_path, "wb") as target:
+                    shutil.copyfileobj(stream, target, EXPORT_COPY_BLOCK)
+            # As _file_write does: the file is collected if the transaction
+            # rolls back before the attachment row is committed
+            Attachment._mark_for_gc(store_fname)
+            vals.update(
+                store_fname=store_fname,
+                file_size=file_size,
+                checksum=checksum,
+            )
+        else:
+            vals["raw"] = stream.read()
+
+        Attachment.create(vals)
+        self.invalidate_recordset([field_name])
+
+    def _iter_chunks(self, records, size=EXPORT_CHUNK_SIZE):
+        """
+        Yield ``records`` in fixed-size slices.
+
+        The ORM cache is flushed and cleared between slices so memory stays
+        bounded by the chunk size rather than the batch size.
+        """
+        for start in range(0, len(records), size):
+            if start:
+                self.env.invalidate_all()
+            end = start + size
+            yield records[start:end]
+
+    def _export_mappings(self, headers):
+        """
+        Active Spectra mappings of the export type overriding a column.
+
+        A mapping whose spectra_field names a column of ``headers`` replaces
+        that column's value; mappings are applied per chunk with
+        apply_mapping_bulk from one compiled plan.
+
+        Returns:
+            tuple: (tbwa.spectra.mapping recordset, {spectra_field: column index})
+        """
+        columns = {header: index for index, header in enumerate(headers)}
+        mappings = (
+            self.env["tbwa.spectra.mapping"]
+            .get_mapping_for_export(self.export_type)
+            .filtered(lambda mapping: mapping.spectra_field in columns)
+        )
+        return mappings, columns
+
+    @staticmethod
+    def _apply_mapped_columns(row, mapped, columns):
+        """Write the mapped values of one record into its CSV row."""
+        for spectra_field, value in (mapped or {}).items():
+            row[columns[spectra_field]] = value
+        return row
+
     def _generate_expense_export(self):
         """Generate TBWA_EXPENSES_MMYY.csv file."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Header row (Spectra format)
-        headers = [
-            "DOC_DATE",
-            "EMPLOYEE_CODE",
-            "PROJECT_CODE",
-            "GL_ACCOUNT",
-            "NET_AMOUNT",
-            "VAT",
-            "WITHHOLDING",
-            "GROSS_AMOUNT",
-            "DESCRIPTION",
-            "FILE_REFERENCE",
-        ]
-        writer.writerow(headers)
-
-        # Data rows
-        for sheet in self.expense_sheet_ids:
-            for expense in sheet.expense_line_ids:
-                # Get GL mapping
-                gl_mapping = self.env["tbwa.spectra.gl.code"].search(
-                    [("expense_category", "=", expense.product_id.name)], limit=1
-                )
+        filename = f"TBWA_EXPENSES_{self.export_month}{self.export_year[-2:]}.csv"
+        expenses = self.expense_sheet_ids.expense_line_ids
+
+        # Resolve GL mappings for the whole batch up front
+        gl_codes = self.env["tbwa.spectra.gl.code"].resolve_gl_codes(expenses)
+
+        with self._stream_export_file("export_file_expense", filename) as writer:
+            # Header row (Spectra format)
+            headers = [
+                "DOC_DATE",
+                "EMPLOYEE_CODE",
+                "PROJECT_CODE",
+                "GL_ACCOUNT",
+                "NET_AMOUNT",
+                "VAT",
+                "WITHHOLDING",
+                "GROSS_AMOUNT",
+                "DESCRIPTION",
+                "FILE_REFERENCE",
+            ]
+            writer.writerow(headers)
+            mappings, columns = self._export_mappings(headers)
 
-                if not gl_mapping:
-                    continue  # Should have been caught in validation
+            # Data rows
+            for chunk in self._iter_chunks(expenses):
+                mapped = mappings.apply_mapping_bulk(chunk) if mappings else {}
+                for expense in chunk:
+                    # Get GL mapping
+                    gl_mapping = gl_codes.get(expense.id)
 
-                gl_entry = gl_mapping.get_gl_entry(expense)
+                    if not gl_mapping:
+                        continue  # Should have been caught in validation
 
-                # Get employee code
-                employee_code = (
-                    expense.employee_id.employee_code
-                    or expense.employee_id.user_id.login.split("@")[0].upper()
-                )
+                    gl_entry = gl_mapping.get_gl_entry(expense)
 
-                # Get project code
-                project_code = (
-                    expense.analytic_account_id.code
-                    if expense.analytic_account_id
-                    else ""
-                )
+                    # Get employee code
+                    employee_code = (
+                        expense.employee_id.employee_code
+                        or expense.employee_id.user_id.login.split("@")[0].upper()
+                    )
 
-                # Get attachment reference
-                attachment_ref = ""
-                if expense.attachment_ids:
-                    # Store in Supabase and get URL
-                    attachment_ref = self._archive_attachment(expense.attachment_ids[0])
-
-                row = [
-                    fields.Date.to_string(expense.date),
-                    employee_code,
-                    project_code,
-                    gl_entry["gl_account"],
-                    "{:.2f}".format(gl_entry["net_amount"]),
-                    "{:.2f}".format(gl_entry["vat_amount"]),
-                    "{:.2f}".format(gl_entry["withholding_amount"]),
-                    "{:.2f}".format(gl_entry["gross_amount"]),
-                    expense.name,
-                    attachment_ref,
-                ]
-                writer.writerow(row)
+                    # Get project code
+                    project_code = (
+                        expense.analytic_account_id.code
+                        if expense.analytic_account_id
+                        else ""
+                    )
 
-        # Save file
-        filename = f"TBWA_EXPENSES_{self.export_month}{self.export_year[-2:]}.csv"
-        self.export_file_expense = base64.b64encode(output.getvalue().encode("utf-8"))
-        self.export_file_expense_name = filename
+                    # Get attachment reference
+                    attachment_ref = ""
+                    if expense.attachment_ids:
+                        # Store in Supabase and get URL
+                        attachment_ref = self._archive_attachment(
+                            expense.attachment_ids[0]
+                        )
+
+                    row = [
+                        fields.Date.to_string(expense.date),
+                        employee_code,
+                        project_code,
+                        gl_entry["gl_account"],
+                        "{:.2f}".format(gl_entry["net_amount"]),
+                        "{:.2f}".format(gl_entry["vat_amount"]),
+                        "{:.2f}".format(gl_entry["withholding_amount"]),
+                        "{:.2f}".format(gl_entry["gross_amount"]),
+                        expense.name,
+                        attachment_ref,
+                    ]
+                    writer.writerow(
+                        self._apply_mapped_columns(row, mapped.get(expense.id), columns)
+                    )
 
     def _generate_cash_advance_export(self):
         """Generate TBWA_CA_MMYY.csv file."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Header row
-        headers = [
-            "DOC_DATE",
-            "EMPLOYEE_CODE",
-            "AMOUNT",
-            "PURPOSE",
-            "PROJECT_CODE",
-            "APPROVAL_DATE",
-            "PAYMENT_DATE",
-            "STATUS",
-        ]
-        writer.writerow(headers)
+        filename = f"TBWA_CA_{self.export_month}{self.export_year[-2:]}.csv"
 
-        # Data rows
-        for advance in self.cash_advance_ids:
-            employee_code = (
-                advance.employee_id.employee_code
-                or advance.employee_id.user_id.login.split("@")[0].upper()
-            )
+        with self._stream_export_file("export_file_je", filename) as writer:
+            # Header row
+            headers = [
+                "DOC_DATE",
+                "EMPLOYEE_CODE",
+                "AMOUNT",
+                "PURPOSE",
+                "PROJECT_CODE",
+                "APPROVAL_DATE",
+                "PAYMENT_DATE",
+                "STATUS",
+            ]
+            writer.writerow(headers)
+
+            # Data rows
+            for chunk in self._iter_chunks(self.cash_advance_ids):
+                for advance in chunk:
+                    employee_code = (
+                        advance.employee_id.employee_code
+                        or advance.employee_id.user_id.login.split("@")[0].upper()
+                    )
 
-            project_code = (
-                advance.analytic_account_id.code if advance.analytic_account_id else ""
-            )
+                    project_code = (
+                        advance.analytic_account_id.code
+                        if advance.analytic_account_id
+                        else ""
+                    )
+
+                    row = [
+                        fields.Date.to_string(advance.date),
+                        employee_code,
+                        "{:.2f}".format(advance.amount),
+                        advance.description or "",
+                        project_code,
+                        (
+                            fields.Datetime.to_string(advance.approval_date)
+                            if advance.approval_date
+                            else ""
+                        ),
+                        (
+                            fields.Date.to_string(advance.payment_date)
+                            if advance.payment_date
+                            else ""
+                        ),
+                        advance.state,
+                    ]
+                    writer.writerow(row)
 
-            row = [
-                fields.Date.to_string(advance.date),
-                employee_code,
-                "{:.2f}".format(advance.amount),
-                advance.description or "",
-                project_code,
-                (
-                    fields.Datetime.to_string(advance.approval_date)
-                    if advance.approval_date
-                    else ""
-                ),
-                (
-                    fields.Date.to_string(advance.payment_date)
-                    if advance.payment_date
-                    else ""
-                ),
-                advance.state,
+    def _generate_journal_entry_export(self):
+        """
+        Generate TBWA_JE_MMYY.csv file.
+
+        Journal items are walked with ``read()`` in chunks of
+        EXPORT_CHUNK_SIZE, resolving accounts, partners and analytic accounts
+        once per chunk, so memory does not grow with the number of lines.
+        """
+        filename = f"TBWA_JE_{self.export_month}{self.export_year[-2:]}.csv"
+        MoveLine = self.env["account.move.line"]
+        line_ids = MoveLine.search(
+            [
+                ("move_id", "in", self.journal_entry_ids.ids),
+                "|",
+                ("debit", "!=", 0),
+                ("credit", "!=", 0),
+            ],
+            order="move_id, sequence, id",
+        ).ids
+
+        with self._stream_export_file("export_file_je", filename) as writer:
+            # Header row (Spectra journal entry format)
+            headers = [
+                "DOC_DATE",
+                "DOC_REF",
+                "ACCOUNT_CODE",
+                "ACCOUNT_NAME",
+                "DEBIT",
+                "CREDIT",
+                "PARTNER",
+                "ANALYTIC_ACCOUNT",
+                "DESCRIPTION",
+                "CURRENCY",
+                "AMOUNT_CURRENCY",
             ]
-            writer.writerow(row)
+            writer.writerow(headers)
+            mappings, columns = self._export_mappings(headers)
+
+            # Data rows - export each journal entry line
+            for chunk in self._iter_chunks(MoveLine.browse(line_ids)):
+                mapped = mappings.apply_mapping_bulk(chunk) if mappings else {}
+                lines = chunk.read(
+                    [
+                        "date",
+                        "move_name",
+                        "account_id",
+                        "debit",
+                        "credit",
+                        "partner_id",
+                        "analytic_distribution",
+                        "name",
+                        "currency_id",
+                        "company_currency_id",
+                        "amount_currency",
+                    ],
+                    load=None,
+                )
+                accounts, partners, analytics = self._read_je_references(lines)
 
-        # Save file
-        filename = f"TBWA_CA_{self.export_month}{self.export_year[-2:]}.csv"
-        self.export_file_je = base64.b64encode(output.getvalue().encode("utf-8"))
-        self.export_file_je_name = filename
+                for line in lines:
+                    account = accounts.get(line["account_id"], {})
 
-    def _generate_journal_entry_export(self):
-        """Generate TBWA_JE_MMYY.csv file."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Header row (Spectra journal entry format)
-        headers = [
-            "DOC_DATE",
-            "DOC_REF",
-            "ACCOUNT_CODE",
-            "ACCOUNT_NAME",
-            "DEBIT",
-            "CREDIT",
-            "PARTNER",
-            "ANALYTIC_ACCOUNT",
-            "DESCRIPTION",
-            "CURRENCY",
-            "AMOUNT_CURRENCY",
-        ]
-        writer.writerow(headers)
-
-        # Data rows - export each journal entry line
-        for move in self.journal_entry_ids:
-            for line in move.line_ids:
-                # Skip lines with zero amounts
-                if line.debit == 0 and line.credit == 0:
-                    continue
-
-                # Get analytic account code if exists
-                analytic_code = ""
-                if line.analytic_distribution:
                     # Get first analytic account from distribution
-                    analytic_ids = list(line.analytic_distribution.keys())
-                    if analytic_ids:
-                        analytic = self.env["account.analytic.account"].browse(
-                            int(analytic_ids[0])
+                    analytic_code = ""
+                    if line["analytic_distribution"]:
+                        analytic_id = self._first_analytic_id(
+                            line["analytic_distribution"]
                         )
-                        analytic_code = analytic.code or ""
-
-                # Handle foreign currency amounts
-                currency_code = ""
-                amount_currency = ""
-                if line.currency_id and line.currency_id != line.company_currency_id:
-                    currency_code = line.currency_id.name
-                    amount_currency = "{:.2f}".format(line.amount_currency)
-
-                row = [
-                    fields.Date.to_string(move.date),
-                    move.name,
-                    line.account_id.code or "",
-                    line.account_id.name or "",
-                    "{:.2f}".format(line.debit),
-                    "{:.2f}".format(line.credit),
-                    line.partner_id.name if line.partner_id else "",
-                    analytic_code,
-                    line.name or "",
-                    currency_code,
-                    amount_currency,
-                ]
-                writer.writerow(row)
+                        analytic_code = analytics.get(analytic_id) or ""
 
-        # Save file
-        filename = f"TBWA_JE_{self.export_month}{self.export_year[-2:]}.csv"
-        self.export_file_je = base64.b64encode(output.getvalue().encode("utf-8"))
-        self.export_file_je_name = filename
+                    # Handle foreign currency amounts
+                    currency_code = ""
+                    amount_currency = ""
+                    if (
+                        line["currency_id"]
+                        and line["currency_id"] != line["company_currency_id"]
+                    ):
+                        currency_code = (
+                            self.env["res.currency"].browse(line["currency_id"]).name
+                        )
+                        amount_currency = "{:.2f}".format(line["amount_currency"])
+
+                    row = [
+                        fields.Date.to_string(line["date"]),
+                        line["move_name"],
+                        account.get("code") or "",
+                        account.get("name") or "",
+                        "{:.2f}".format(line["debit"]),
+                        "{:.2f}".format(line["credit"]),
+                        partners.get(line["partner_id"], ""),
+                        analytic_code,
+                        line["name"] or "",
+                        currency_code,
+                        amount_currency,
+                    ]
+                    writer.writerow(
+                        self._apply_mapped_columns(row, mapped.get(line["id"]), columns)
+                    )
 
-    def _generate_audit_trail(self):
-        """Generate TBWA_AUDIT_MMYY.csv file with approval history."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Header row
-        headers = [
-            "DOC_TYPE",
-            "DOC_REF",
-            "DOC_DATE",
-            "EMPLOYEE",
-            "AMOUNT",
-            "APPROVER_L1",
-            "APPROVAL_L1_DATE",
-            "APPROVER_L2",
-            "APPROVAL_L2_DATE",
-            "STATUS",
-            "NOTES",
-        ]
-        writer.writerow(headers)
+    @staticmethod
+    def _first_analytic_id(distribution):
+        """Return the first analytic account id of an analytic distribution."""
+        first_key = next(iter(distribution), "")
+        # Keys may combine several accounts, e.g. "12,34"
+        account_id = str(first_key).split(",")[0]
+        return int(account_id) if account_id else False
 
-        # Audit data from expense sheets
-        if self.export_type == "expense":
-            for sheet in self.expense_sheet_ids:
-                # Get approval history from chatter
-                approvals = self._get_approval_history(sheet)
-
-                row = [
-                    "EXPENSE",
-                    sheet.name,
-                    fields.Date.to_string(sheet.accounting_date or sheet.create_date),
-                    sheet.employee_id.name,
-                    "{:.2f}".format(sheet.total_amount),
-                    approvals.get("approver_1", ""),
-                    approvals.get("approval_1_date", ""),
-                    approvals.get("approver_2", ""),
-                    approvals.get("approval_2_date", ""),
-                    sheet.state,
-                    sheet.notes or "",
-                ]
-                writer.writerow(row)
+    def _read_je_references(self, lines):
+        """
+        Batch-read the accounts, partners and analytic accounts of a chunk.
 
-        # Save file
+        Returns:
+            tuple: ({account_id: {code, name}}, {partner_id: name},
+                    {analytic_id: code})
+        """
+        account_ids = {line["account_id"] for line in lines if line["account_id"]}
+        partner_ids = {line["partner_id"] for line in lines if line["partner_id"]}
+        analytic_ids = {
+            self._first_analytic_id(line["analytic_distribution"])
+            for line in lines
+            if line["analytic_distribution"]
+        }
+        analytic_ids.discard(False)
+
+        accounts = {
+            account["id"]: account
+            for account in self.env["account.account"]
+            .browse(list(account_ids))
+            .read(["code", "name"])
+        }
+        partners = {
+            partner["id"]: partner["name"] or ""
+            for partner in self.env["res.partner"]
+            .browse(list(partner_ids))
+            .read(["name"])
+        }
+        analytics = {
+            analytic["id"]: analytic["code"]
+            for analytic in self.env["account.analytic.account"]
+            .browse(list(analytic_ids))
+            .exists()
+            .read(["code"])
+        }
+        return accounts, partners, analytics
+
+    def _generate_audit_trail(self):
+        """Generate TBWA_AUDIT_MMYY.csv file with approval history."""
         filename = f"TBWA_AUDIT_{self.export_month}{self.export_year[-2:]}.csv"
-        self.export_file_audit = base64.b64encode(output.getvalue().encode("utf-8"))
-        self.export_file_audit_name = filename
+
+        with self._stream_export_file("export_file_audit", filename) as writer:
+            # Header row
+            headers = [
+                "DOC_TYPE",
+                "DOC_REF",
+                "DOC_DATE",
+                "EMPLOYEE",
+                "AMOUNT",
+                "APPROVER_L1",
+                "APPROVAL_L1_DATE",
+                "APPROVER_L2",
+                "APPROVAL_L2_DATE",
+                "STATUS",
+                "NOTES",
+            ]
+            writer.writerow(headers)
+
+            # Audit data from expense sheets
+            if self.export_type in ("expense", "audit_trail"):
+                # Get approval history from chatter for all sheets at once
+                histories = self._get_approval_histories(self.expense_sheet_ids)
+                for sheet in self.expense_sheet_ids:
+                    approvals = histories.get(sheet.id, {})
+
+                    row = [
+                        "EXPENSE",
+                        sheet.name,
+                        fields.Date.to_string(
+                            sheet.accounting_date or sheet.create_date
+                        ),
+                        sheet.employee_id.name,
+                        "{:.2f}".format(sheet.total_amount),
+                        approvals.get("approver_1", ""),
+                        approvals.get("approval_1_date", ""),
+                        approvals.get("approver_2", ""),
+                        approvals.get("approval_2_date", ""),
+                        sheet.state,
+                        sheet.notes or "",
+                    ]
+                    writer.writerow(row)
 
     def _get_approval_history(self, record):
         """Extract approval history from mail.message chatter."""
-        approvals = {}
-        messages = self.env["mail.message"].search(
+        return self._get_approval_histories(record).get(record.id, {})
+
+    def _get_approval_histories(self, records):
+        """
+        Extract approval history for many records with one grouped query.
+
+        Notification messages (approvals and tracking) of every record are
+        fetched together, bucketed by ``res_id`` and author names are
+        resolved in a single read.
+
+        Args:
+            records: recordset of a mail.thread model (e.g. hr.expense.sheet)
+
+        Returns:
+            dict: {res_id: {approver_N, approval_N_date}}
+        """
+        if not records:
+            return {}
+
+        messages = self.env["mail.message"].search_read(
             [
-                ("model", "=", record._name),
-                ("res_id", "=", record.id),
+                ("model", "=", records._name),
+                ("res_id", "in", records.ids),
                 ("message_type", "=", "notification"),
             ],
-            order="date asc",
+            ["res_id", "body", "author_id", "date"],
+            order="res_id, date asc, id asc",
+            load=None,
         )
 
-        approval_count = 0
-        for message in messages:
-            if "approved" in message.body.lower():
-                approval_count += 1
-                approvals[f"approver_{approval_count}"] = message.author_id.name
-                approvals[f"approval_{approval_count}_date"] = (
-                    fields.Datetime.to_string(message.date)
-                )
+        approval_messages = [
+            message
+            for message in messages
+            if "approved" in (message["body"] or "").lower()
+        ]
+        author_ids = {m["author_id"] for m in approval_messages if m["author_id"]}
+        authors = {
+            author["id"]: author["name"]
+            for author in self.env["res.partner"]
+            .browse(list(author_ids))
+            .read(["name"])
+        }
+
+        histories = {}
+        for message in approval_messages:
+            approvals = histories.setdefault(message["res_id"], {})
+            approval_count = len(approvals) // 2 + 1
+            approvals[f"approver_{approval_count}"] = authors.get(
+                message["author_id"], ""
+            )
+            approvals[f"approval_{approval_count}_date"] = fields.Datetime.to_string(
+                message["date"]
+            )
 
-        return approvals
+        return histories
 
     def _archive_attachment(self, attachment):
         """Archive attachment to Supabase Storage and return URL."""
@@ -565,74 +806,103 @@ class SpectraExport(models.Model):
     @api.model
     def cron_auto_export(self):
         """
-        Scheduled action to create monthly export batch.
+        Scheduled action to create monthly export batches.
         Runs on 1st business day of month at 06:30 AM.
+
+        One batch is created per export type (expense, cash advance, journal
+        entry, audit trail) and queued as a tbwa.spectra.export.job, so each
+        file is generated by its own runner in its own transaction. Only the
+        audit_trail batch generates the period's audit trail.
         """
         today = fields.Date.today()
         last_month = today - timedelta(days=today.day)
-
-        # Check if export already exists
-        existing = self.search(
-            [
-                ("export_month", "=", last_month.strftime("%m")),
-                ("export_year", "=", str(last_month.year)),
-                ("export_type", "=", "expense"),
-            ],
-            limit=1,
+        period_start = last_month.replace(day=1)
+        export_month = last_month.strftime("%m")
+        export_year = str(last_month.year)
+
+        # Check which exports already exist for the period
+        existing_types = set(
+            self.search(
+                [
+                    ("export_month", "=", export_month),
+                    ("export_year", "=", export_year),
+                    ("state", "!=", "cancelled"),
+                ]
+            ).mapped("export_type")
         )
 
-        if existing:
-            _logger.info(f"Export for {last_month.strftime('%B %Y')} already exists")
-            return existing
-
         # Find approved, non-exported expense sheets
         expense_sheets = self.env["hr.expense.sheet"].search(
             [
                 ("state", "=", "approve"),
                 ("exported_to_spectra", "=", False),
-                ("accounting_date", ">=", last_month.replace(day=1)),
+                ("accounting_date", ">=", period_start),
                 ("accounting_date", "<=", last_month),
             ]
         )
+        cash_advances = self.env["hr.expense.advance"].search(
+            [
+                ("state", "in", ["approved_l2", "paid"]),
+                ("exported_to_spectra", "=", False),
+                ("date", ">=", period_start),
+                ("date", "<=", last_month),
+            ]
+        )
+        journal_entries = self.env["account.move"].search(
+            [
+                ("state", "=", "posted"),
+                ("date", ">=", period_start),
+                ("date", "<=", last_month),
+            ]
+        )
 
-        if not expense_sheets:
-            _logger.info(
-                f"No expense sheets to export for {last_month.strftime('%B %Y')}"
+        batch_vals = {
+            "expense": {"expense_sheet_ids": [(6, 0, expense_sheets.ids)]},
+            "cash_advance": {"cash_advance_ids": [(6, 0, cash_advances.ids)]},
+            "journal_entry": {"journal_entry_ids": [(6, 0, journal_entries.ids)]},
+            "audit_trail": {"expense_sheet_ids": [(6, 0, expense_sheets.ids)]},
+        }
+        has_records = {
+            "expense": bool(expense_sheets),
+            "cash_advance": bool(cash_advances),
+            "journal_entry": bool(journal_entries),
+            "audit_trail": bool(expense_sheets),
+        }
+
+        vals_list = []
+        for export_type, vals in batch_vals.items():
+            if export_type in existing_types:
+                _logger.info(
+                    f"{export_type} export for {last_month.strftime('%B %Y')} "
+                    "already exists"
+                )
+                continue
+            if not has_records[export_type]:
+                continue
+            vals_list.append(
+                dict(
+                    vals,
+                    export_type=export_type,
+                    export_month=export_month,
+                    export_year=export_year,
+                )
             )
-            return
 
-        # Create export batch
-        export_batch = self.create(
-            {
-                "export_type": "expense",
-                "export_month": last_month.strftime("%m"),
-                "export_year": str(last_month.year),
-                "expense_sheet_ids": [(6, 0, expense_sheets.ids)],
-            }
-        )
+        if not vals_list:
+            _logger.info(f"Nothing to export for {last_month.strftime('%B %Y')}")
+            return self.browse()
 
-        # Auto-validate and generate
-        try:
-            export_batch.action_validate()
-            export_batch.action_generate_export_files()
-
-            # Send notification to finance
-            finance_users = self.env.ref(
-                "tbwa_spectra_integration.group_finance_spectra"
-            ).users
-            export_batch.message_subscribe(partner_ids=finance_users.partner_id.ids)
-            export_batch.message_post(
-                body=_("Automatic Spectra export created. Please review and approve."),
-                subtype_xmlid="mail.mt_comment",
-            )
+        export_batches = self.browse()
+        for vals in vals_list:
+            export_batches |= self.create(vals)
 
-            _logger.info(f"Created Spectra export batch: {export_batch.name}")
-        except Exception as e:
-            _logger.error(f"Spectra export failed: {e}")
-            export_batch.state = "failed"
-            export_batch.validation_errors = str(e)
+        # Generation runs in the per-type job runners
+        self.env["tbwa.spectra.export.job"].enqueue(export_batches)
+        _logger.info(
+            f"Queued Spectra export batches: {', '.join(export_batches.mapped('name'))}"
+        )
 
-        return export_batch
+        return export_batches
 
     @api.model
     def cron_cleanup_old_exports(self):
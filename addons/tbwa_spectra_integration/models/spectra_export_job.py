@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+import logging
+from datetime import timedelta
+
+from odoo.exceptions import UserError
+
+from odoo import _, api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class SpectraExportJob(models.Model):
+    """
+    Queued generation job for one Spectra export batch.
+
+    cron_auto_export creates one batch per export type for the period and
+    queues a job for each. Every export type has its own runner cron, so the
+    expense, cash advance, journal entry and audit trail files are generated
+    by separate cron workers, each job in its own transaction:
+
+    pending → running → done
+                      ↘ pending (retry) → ... → failed
+
+    The running state and attempt count are committed before generation, so
+    a job whose worker died (killed, out of memory) is found still running;
+    after ``tbwa_spectra_integration.job_timeout_minutes`` (default 120) the
+    next runner retries it or, out of attempts, fails it.
+
+    Once every job of a period has finished, the period is marked complete
+    and Finance is notified.
+    """
+
+    _name = "tbwa.spectra.export.job"
+    _description = "Spectra Export Job"
+    _order = "id"
+
+    export_id = fields.Many2one(
+        "tbwa.spectra.export",
+        string="Export Batch",
+        required=True,
+        ondelete="cascade",
+    )
+    export_type = fields.Selection(
+        related="export_id.export_type", store=True, readonly=True
+    )
+    export_month = fields.Selection(
+        related="export_id.export_month", store=True, readonly=True
+    )
+    export_year = fields.Char(
+        related="export_id.export_year", store=True, readonly=True
+    )
+
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        default="pending",
+        required=True,
+        string="Status",
+    )
+    attempts = fields.Integer(string="Attempts", default=0)
+    max_attempts = fields.Integer(string="Max Attempts", default=3)
+    error_message = fields.Text(string="Last Error", readonly=True)
+    date_started = fields.Datetime(string="Started", readonly=True)
+    date_done = fields.Datetime(string="Finished", readonly=True)
+    period_notified = fields.Boolean(
+        string="Completion Notified",
+        readonly=True,
+        help="Set on every job of the period once the batch-complete step ran",
+    )
+
+    # Runner cron per export type (see data/tbwa_cron.xml)
+    _RUNNER_CRONS = {
+        "expense": "tbwa_spectra_integration.ir_cron_spectra_job_expense",
+        "cash_advance": "tbwa_spectra_integration.ir_cron_spectra_job_cash_advance",
+        "journal_entry": "tbwa_spectra_integration.ir_cron_spectra_job_journal_entry",
+        "audit_trail": "tbwa_spectra_integration.ir_cron_spectra_job_audit_trail",
+    }
+
+    @api.model
+    def enqueue(self, exports):
+        """
+        Queue a generation job per export batch and wake up the runners.
+
+        Args:
+            exports: tbwa.spectra.export recordset
+
+        Returns:
+            recordset: created jobs
+        """
+        jobs = self.create([{"export_id": export.id} for export in exports])
+        for export_type in set(jobs.mapped("export_type")):
+            self._trigger_runner(export_type)
+        return jobs
+
+    @api.model
+    def _trigger_runner(self, export_type):
+        cron = self.env.ref(self._RUNNER_CRONS[export_type], raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def cron_run_jobs(self, export_type):
+        """
+        Run pending jobs of one export type, committing after each job.
+
+        A failure in one job is rolled back on its own and never affects the
+        jobs (or export types) processed by other runners.
+        """
+        self._requeue_stale_jobs(export_type)
+        jobs = self.search(
+            [("export_type", "=", export_type), ("state", "=", "pending")]
+        )
+        for index, job in enumerate(jobs):
+            job._start()
+            self.env.cr.commit()
+            job._run()
+            self.env.cr.commit()
+            job._check_period_complete()
+            self.env.cr.commit()
+            self.env["ir.cron"]._notify_progress(
+                done=index + 1, remaining=len(jobs) - index - 1
+            )
+
+    @api.model
+    def _requeue_stale_jobs(self, export_type):
+        """Retry (or fail, out of attempts) jobs whose worker stopped running."""
+        timeout = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("tbwa_spectra_integration.job_timeout_minutes", 120)
+        )
+        cutoff = fields.Datetime.now() - timedelta(minutes=timeout)
+        stale = self.search(
+            [
+                ("export_type", "=", export_type),
+                ("state", "=", "running"),
+                ("date_started", "<", cutoff),
+            ]
+        )
+        for job in stale:
+            error = _("Worker stopped after %s minutes without finishing") % timeout
+            _logger.warning("Spectra export job %s: %s", job.export_id.name, error)
+            if job.attempts < job.max_attempts:
+                job.write({"state": "pending", "error_message": error})
+            else:
+                job._mark_failed(error)
+                job._check_period_complete()
+            self.env.cr.commit()
+
+    def _start(self):
+        """Mark the job running and count the attempt."""
+        self.ensure_one()
+        self.write(
+            {
+                "state": "running",
+                "attempts": self.attempts + 1,
+                "date_started": fields.Datetime.now(),
+                "error_message": False,
+            }
+        )
+
+    def _run(self):
+        """Validate and generate the files of the job's export batch."""
+        self.ensure_one()
+        export = self.export_id
+        try:
+            with self.env.cr.savepoint():
+                if export.state != "ready":
+                    export.action_validate()
+                # The period's audit_trail batch has its own job
+                export.with_context(
+                    spectra_skip_audit_trail=export.export_type != "audit_trail"
+                ).action_generate_export_files()
+        except UserError as e:
+            # Validation errors are not transient, do not retry
+            self._mark_failed(str(e))
+        except Exception as e:
+            _logger.exception("Spectra export job %s failed", export.name)
+            if self.attempts < self.max_attempts:
+                self.write({"state": "pending", "error_message": str(e)})
+                self._trigger_runner(self.export_type)
+                return
+            self._mark_failed(str(e))
+        else:
+            self.write({"state": "done", "date_done": fields.Datetime.now()})
+            _logger.info(f"Generated Spectra export batch: {export.name}")
+
+    def _mark_failed(self, error):
+        self.write(
+            {
+                "state": "failed",
+                "error_message": error,
+                "date_done": fields.Datetime.now(),
+            }
+        )
+        self.export_id.write({"state": "failed", "validation_errors": error})
+
+    def _check_period_complete(self):
+        """
+        Final step: notify Finance once every job of the period is finished.
+
+        Runners of different export types may finish at the same time, so
+        the check is serialized per period with an advisory lock.
+        """
+        self.ensure_one()
+        self.env.cr.execute(
+            "SELECT pg_advisory_xact_lock(%s, %s)",
+            [int(self.export_year), int(self.export_month)],
+        )
+        period_jobs = self.search(
+            [
+                ("export_month", "=", self.export_month),
+                ("export_year", "=", self.export_year),
+                ("period_notified", "=", False),
+            ]
+        )
+        if not period_jobs or any(
+            job.state in ("pending", "running") for job in period_jobs
+        ):
+            return
+        period_jobs.write({"period_notified": True})
+
+        exports = period_jobs.export_id
+        done = exports.filtered(lambda e: e.state == "exported")
+        failed = exports - done
+        summary = _(
+            "Spectra export for %(month)s/%(year)s complete: "
+            "%(done)s generated, %(failed)s failed (%(names)s)."
+        ) % {
+            "month": self.export_month,
+            "year": self.export_year,
+            "done": len(done),
+            "failed": len(failed),
+            "names": ", ".join(failed.mapped("name")) or "-",
+        }
+
+        finance_group = self.env.ref(
+            "tbwa_spectra_integration.group_tbwa_finance", raise_if_not_found=False
+        )
+        finance_users = finance_group.users if finance_group else self.env["res.users"]
+        for export in done:
+            export.message_subscribe(partner_ids=finance_users.partner_id.ids)
+            export.message_post(
+                body=_("Automatic Spectra export created. Please review and approve.")
+                + "\n"
+                + summary,
+                subtype_xmlid="mail.mt_comment",
+            )
+        _logger.info(summary)
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 import logging
+from types import MappingProxyType
 
 from odoo.exceptions import UserError, ValidationError
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 
 _logger = logging.getLogger(__name__)
 
@@ -83,6 +84,22 @@ class SpectraMapping(models.Model):
         "res.company", string="Company", default=lambda self: self.env.company
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
     @api.constrains("validation_rule")
     def _check_validation_rule(self):
         """Validate the validation rule is safe Python."""
@@ -105,74 +122,206 @@ class SpectraMapping(models.Model):
             str: Mapped Spectra value
         """
         self.ensure_one()
+        step = self._compile_plan()[0]
 
         # Get source value
-        field_path = self.odoo_field.split(".")
         value = odoo_record
-        for part in field_path:
+        for part in step["path"]:
             value = getattr(value, part, None)
             if value is None:
                 break
 
+        return self._apply_step(step, value)
+
+    def apply_mapping_bulk(self, records):
+        """
+        Apply every mapping of ``self`` to a whole recordset.
+
+        Mappings are compiled once (field paths split, validation rules
+        compiled) and source values are loaded with one ``read()`` per path
+        level for all records, instead of walking each record with getattr.
+
+        Args:
+            records: Odoo recordset (e.g., hr.expense.sheet)
+
+        Returns:
+            dict: {record_id: {spectra_field: mapped_value}}
+        """
+        plan = self._compile_plan()
+        results = {record.id: {} for record in records}
+        for step in plan:
+            values = self._read_field_path(records, step["path"])
+            for record_id, row in results.items():
+                row[step["spectra_field"]] = self._apply_step(
+                    step, values.get(record_id)
+                )
+        return results
+
+    def _compile_plan(self):
+        """
+        Compile mappings into an apply plan.
+
+        The plan is cached per registry (see _get_compiled_plan) and
+        invalidated whenever a mapping is created, written or deleted.
+
+        Returns:
+            tuple: one read-only mapping per mapping record with the split
+                field path, formatting options and the pre-compiled
+                validation rule (shared by all callers, so never mutable)
+        """
+        return self._get_compiled_plan(tuple(self.ids))
+
+    @api.model
+    @tools.ormcache("mapping_ids")
+    def _get_compiled_plan(self, mapping_ids):
+        plan = []
+        for mapping in self.sudo().browse(mapping_ids):
+            validator = None
+            if mapping.validation_rule:
+                validator = compile(
+                    mapping.validation_rule, "<validation_rule>", "eval"
+                )
+            plan.append(
+                MappingProxyType(
+                    {
+                        "path": tuple(mapping.odoo_field.split(".")),
+                        "mapping_type": mapping.mapping_type,
+                        "spectra_field": mapping.spectra_field,
+                        "spectra_value": mapping.spectra_value,
+                        "spectra_format": mapping.spectra_format,
+                        "is_required": mapping.is_required,
+                        "validator": validator,
+                    }
+                )
+            )
+        return tuple(plan)
+
+    @api.model
+    def _read_field_path(self, records, path):
+        """
+        Resolve a dotted field path for many records with batched reads.
+
+        Relational leaves are returned as records (sharing one prefetch set),
+        scalar leaves as read() values.
+
+        Returns:
+            dict: {record_id: value}
+        """
+        current = {record.id: record.id for record in records}
+        model = records.browse()
+        for depth, name in enumerate(path):
+            field = model._fields.get(name)
+            if field is None:
+                return {record_id: None for record_id in current}
+
+            ids = list({i for i in current.values() if i})
+            rows = {
+                row["id"]: row[name]
+                for row in model.browse(ids).read([name], load=None)
+            }
+            is_leaf = depth == len(path) - 1
+
+            if not field.relational:
+                if not is_leaf:
+                    return {record_id: None for record_id in current}
+                return {
+                    record_id: rows.get(value_id, False) if value_id else False
+                    for record_id, value_id in current.items()
+                }
+
+            comodel = self.env[field.comodel_name]
+            if is_leaf:
+                if field.type == "many2one":
+                    linked = {r: rows.get(i) or False for r, i in current.items()}
+                    targets = comodel.browse(list(set(filter(None, linked.values()))))
+                    return {
+                        r: comodel.browse(i).with_prefetch(targets._prefetch_ids)
+                        for r, i in linked.items()
+                    }
+                return {
+                    record_id: comodel.browse(rows.get(value_id) or [])
+                    for record_id, value_id in current.items()
+                }
+
+            # Intermediate step: follow many2one links (first record otherwise)
+            next_ids = {}
+            for record_id, value_id in current.items():
+                linked = rows.get(value_id) if value_id else False
+                if isinstance(linked, list):
+                    linked = linked[0] if linked else False
+                next_ids[record_id] = linked or False
+            current = next_ids
+            model = comodel
+
+        return current
+
+    @staticmethod
+    def _apply_step(step, value):
+        """Transform, format and validate one source value for a plan step."""
+        mapping_type = step["mapping_type"]
+
         # Apply transformation based on mapping type
-        if self.mapping_type == "employee":
+        if mapping_type == "employee":
             # Employee code mapping (e.g., 'John Doe' → 'JDOE')
             if hasattr(value, "employee_code"):
                 mapped_value = value.employee_code
             elif hasattr(value, "login"):
                 # Fallback to login username
                 mapped_value = value.login.split("@")[0].upper()
-            else:
+            elif value:
                 mapped_value = str(value.id).zfill(6)  # Fallback to ID
+            else:
+                mapped_value = ""
 
-        elif self.mapping_type == "gl_account":
+        elif mapping_type == "gl_account":
             # GL account mapping
-            mapped_value = self.spectra_value
+            mapped_value = step["spectra_value"]
 
-        elif self.mapping_type == "cost_center":
+        elif mapping_type == "cost_center":
             # Project/cost center mapping
             if hasattr(value, "code"):
                 mapped_value = value.code
             else:
-                mapped_value = self.spectra_value
+                mapped_value = step["spectra_value"]
 
-        elif self.mapping_type == "category":
+        elif mapping_type == "category":
             # Expense category mapping
-            mapped_value = self.spectra_value
+            mapped_value = step["spectra_value"]
 
         else:
             # Default: use spectra_value directly
-            mapped_value = self.spectra_value
+            mapped_value = step["spectra_value"]
 
         # Apply format
-        if self.spectra_format == "currency":
+        spectra_format = step["spectra_format"]
+        if spectra_format == "currency":
             try:
                 mapped_value = "{:.2f}".format(float(mapped_value))
             except (ValueError, TypeError):
                 mapped_value = "0.00"
-        elif self.spectra_format == "number":
+        elif spectra_format == "number":
             try:
                 mapped_value = str(int(float(mapped_value)))
             except (ValueError, TypeError):
                 mapped_value = "0"
-        elif self.spectra_format == "date":
+        elif spectra_format == "date":
             if isinstance(mapped_value, (fields.Date, fields.Datetime)):
                 mapped_value = fields.Date.to_string(mapped_value)
 
         # Validate
-        if self.is_required and not mapped_value:
+        if step["is_required"] and not mapped_value:
             raise UserError(
-                _("Required Spectra field %s is empty") % self.spectra_field
+                _("Required Spectra field %s is empty") % step["spectra_field"]
             )
 
-        if self.validation_rule:
+        if step["validator"]:
             try:
                 # Safe eval with limited scope
                 safe_dict = {"value": mapped_value, "len": len, "str": str, "int": int}
-                if not eval(self.validation_rule, {"__builtins__": {}}, safe_dict):
+                if not eval(step["validator"], {"__builtins__": {}}, safe_dict):
                     raise ValidationError(
                         _("Validation failed for %s: %s")
-                        % (self.spectra_field, mapped_value)
+                        % (step["spectra_field"], mapped_value)
                     )
             except Exception as e:
                 _logger.error(f"Validation error: {e}")
@@ -281,16 +430,75 @@ class SpectraGLCodeMapping(models.Model):
         )
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache()
+    def _get_category_index(self):
+        """
+        Index of all active GL code mappings, loaded in a single query.
+
+        Cached per registry and invalidated whenever a mapping is created,
+        written or deleted, so exports never re-query the mapping table.
+
+        Returns:
+            dict: {expense_category: gl_code_id}
+        """
+        mappings = self.sudo().search_read([], ["expense_category"])
+        return {m["expense_category"]: m["id"] for m in mappings}
+
+    @api.model
+    def resolve_gl_codes(self, expense_lines):
+        """
+        Resolve GL code mappings for many expense lines at once.
+
+        Args:
+            expense_lines: hr.expense recordset
+
+        Returns:
+            dict: {expense_id: tbwa.spectra.gl.code record} (only mapped lines)
+        """
+        index = self._get_category_index()
+        gl_codes = self.browse(list(index.values()))
+        by_id = {gl_code.id: gl_code for gl_code in gl_codes}
+
+        resolved = {}
+        for expense in expense_lines:
+            gl_code_id = index.get(expense.product_id.name)
+            if gl_code_id:
+                resolved[expense.id] = by_id[gl_code_id]
+        return resolved
+
     def get_gl_entry(self, expense_line):
         """
         Generate GL entry dictionary for a given expense line.
 
+        When called on an empty recordset, the mapping is resolved from the
+        cached category index.
+
         Args:
             expense_line: hr.expense record
 
         Returns:
-            dict: GL entry data for Spectra
+            dict: GL entry data for Spectra (False if no mapping exists)
         """
+        if not self:
+            gl_code = self.resolve_gl_codes(expense_line).get(expense_line.id)
+            return gl_code.get_gl_entry(expense_line) if gl_code else False
         self.ensure_one()
 
         # Calculate amounts
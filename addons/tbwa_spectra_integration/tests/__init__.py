@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+from . import test_spectra_export_job, test_spectra_mapping
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase
+
+from odoo import fields
+
+
+class TestSpectraExportJob(TransactionCase):
+    """
+    Unit tests for the Spectra export job runners.
+
+    Test Coverage:
+    - Runner through generation and period completion
+    - Finance notification on period completion
+    - Validation failures
+    - Recovery of jobs left running by a stopped worker
+    """
+
+    def setUp(self):
+        super().setUp()
+        # The runner commits after each step
+        self.patch(self.env.cr, "commit", lambda: None)
+
+        self.finance_user = self.env["res.users"].create(
+            {
+                "name": "Spectra Finance",
+                "login": "spectra_finance_test",
+                "groups_id": [
+                    (4, self.env.ref("tbwa_spectra_integration.group_tbwa_finance").id)
+                ],
+            }
+        )
+        self.Export = self.env["tbwa.spectra.export"]
+        self.Job = self.env["tbwa.spectra.export.job"]
+
+    def _create_export(self, export_type, month="01", year="2031"):
+        return self.Export.create(
+            {
+                "export_type": export_type,
+                "export_month": month,
+                "export_year": year,
+            }
+        )
+
+    def _generate_ok(self):
+        def generate(export):
+            export.state = "exported"
+            return True
+
+        def validate(export):
+            export.state = "ready"
+            return True
+
+        return (
+            patch.object(type(self.Export), "action_validate", validate),
+            patch.object(type(self.Export), "action_generate_export_files", generate),
+        )
+
+    def test_runner_completes_period_and_notifies_finance(self):
+        expense = self._create_export("expense")
+        journal = self._create_export("journal_entry")
+        jobs = self.Job.create([{"export_id": expense.id}, {"export_id": journal.id}])
+
+        validate, generate = self._generate_ok()
+        with validate, generate:
+            self.Job.cron_run_jobs("expense")
+            self.assertEqual(jobs.mapped("state"), ["done", "pending"])
+            self.assertFalse(any(jobs.mapped("period_notified")))
+
+            self.Job.cron_run_jobs("journal_entry")
+
+        self.assertEqual(jobs.mapped("state"), ["done", "done"])
+        self.assertTrue(all(jobs.mapped("period_notified")))
+        for export in expense | journal:
+            self.assertIn(self.finance_user.partner_id, export.message_partner_ids)
+            self.assertIn(
+                "Spectra export for 01/2031 complete: 2 generated, 0 failed",
+                export.message_ids[0].body,
+            )
+
+    def test_audit_trail_generated_by_audit_batch_only(self):
+        expense = self._create_export("expense")
+        audit = self._create_export("audit_trail")
+        self.Job.create([{"export_id": expense.id}, {"export_id": audit.id}])
+        audit_trails = []
+
+        def generate_audit_trail(export):
+            audit_trails.append(export.export_type)
+
+        validate, _generate = self._generate_ok()
+        with validate, patch.object(
+            type(self.Export), "_generate_expense_export", lambda export: None
+        ), patch.object(
+            type(self.Export), "_generate_audit_trail", generate_audit_trail
+        ):
+            self.Job.cron_run_jobs("expense")
+            self.Job.cron_run_jobs("audit_trail")
+
+        self.assertEqual(audit_trails, ["audit_trail"])
+        self.assertEqual((expense | audit).mapped("state"), ["exported", "exported"])
+
+    def test_validation_failure_completes_period(self):
+        export = self._create_export("cash_advance")
+        job = self.Job.create({"export_id": export.id})
+
+        with patch.object(
+            type(self.Export),
+            "action_validate",
+            side_effect=UserError("Validation failed"),
+            autospec=True,
+        ):
+            self.Job.cron_run_jobs("cash_advance")
+
+        self.assertEqual(job.state, "failed")
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(export.state, "failed")
+        self.assertTrue(job.period_notified)
+
+    def test_stale_running_job_is_retried(self):
+        export = self._create_export("expense")
+        job = self.Job.create(
+            {
+                "export_id": export.id,
+                "state": "running",
+                "attempts": 1,
+                "date_started": fields.Datetime.now() - timedelta(hours=3),
+            }
+        )
+
+        validate, generate = self._generate_ok()
+        with validate, generate:
+            self.Job.cron_run_jobs("expense")
+
+        self.assertEqual(job.state, "done")
+        self.assertEqual(job.attempts, 2)
+        self.assertTrue(job.period_notified)
+
+    def test_stale_running_job_out_of_attempts_fails(self):
+        export = self._create_export("expense")
+        job = self.Job.create(
+            {
+                "export_id": export.id,
+                "state": "running",
+                "attempts": 3,
+                "date_started": fields.Datetime.now() - timedelta(hours=3),
+            }
+        )
+
+        self.Job.cron_run_jobs("expense")
+
+        self.assertEqual(job.state, "failed")
+        self.assertEqual(export.state, "failed")
+        self.assertTrue(job.period_notified)
+
+    def test_recent_running_job_is_left_alone(self):
+        export = self._create_export("expense")
+        job = self.Job.create(
+            {
+                "export_id": export.id,
+                "state": "running",
+                "attempts": 1,
+                "date_started": fields.Datetime.now(),
+            }
+        )
+
+        self.Job.cron_run_jobs("expense")
+
+        self.assertEqual(job.state, "running")
+        self.assertFalse(job.period_notified)
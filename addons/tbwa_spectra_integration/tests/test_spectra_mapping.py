@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+from types import SimpleNamespace
+
+from odoo.exceptions import UserError, ValidationError
+from odoo.tests import TransactionCase
+
+
+class TestSpectraMapping(TransactionCase):
+    """
+    Unit tests for the compiled Spectra mapping plan.
+
+    Test Coverage:
+    - Plan compilation and caching
+    - Batched field path resolution
+    - Mapping type transforms, formats and validation
+    - Bulk apply matching the per-record apply
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.Mapping = self.env["tbwa.spectra.mapping"]
+        self.category = self.env["res.partner.category"].create({"name": "Vendor"})
+        self.company = self.env["res.partner"].create(
+            {"name": "Acme Corp", "ref": "ACME", "category_id": [(4, self.category.id)]}
+        )
+        self.contacts = self.env["res.partner"].create(
+            [
+                {"name": "Ana", "parent_id": self.company.id},
+                {"name": "Ben", "parent_id": self.company.id},
+                {"name": "Cy"},
+            ]
+        )
+
+    def _mapping(self, **vals):
+        return self.Mapping.create(
+            dict(
+                {
+                    "name": "Test mapping",
+                    "mapping_type": "category",
+                    "odoo_field": "name",
+                    "spectra_field": "DESCRIPTION",
+                    "spectra_value": "MAPPED",
+                },
+                **vals,
+            )
+        )
+
+    def _step(self, **vals):
+        return dict(
+            {
+                "path": ["name"],
+                "mapping_type": "category",
+                "spectra_field": "DESCRIPTION",
+                "spectra_value": "MAPPED",
+                "spectra_format": "text",
+                "is_required": False,
+                "validator": None,
+            },
+            **vals,
+        )
+
+    def test_compile_plan(self):
+        mapping = self._mapping(
+            odoo_field="parent_id.ref",
+            spectra_format="currency",
+            is_required=True,
+            validation_rule="len(value) > 0",
+        )
+
+        step = mapping._compile_plan()[0]
+
+        self.assertEqual(step["path"], ("parent_id", "ref"))
+        self.assertEqual(step["spectra_field"], "DESCRIPTION")
+        self.assertEqual(step["spectra_format"], "currency")
+        self.assertTrue(step["is_required"])
+        self.assertTrue(eval(step["validator"], {"len": len}, {"value": "x"}))
+
+    def test_compile_plan_cached_and_invalidated(self):
+        mapping = self._mapping()
+
+        plan = mapping._compile_plan()
+        self.assertIs(mapping._compile_plan(), plan)
+
+        mapping.write({"odoo_field": "parent_id.name"})
+        self.assertEqual(mapping._compile_plan()[0]["path"], ("parent_id", "name"))
+
+        # The cached plan is shared: callers cannot alter it
+        step = mapping._compile_plan()[0]
+        with self.assertRaises(TypeError):
+            step["spectra_field"] = "OTHER"
+
+        other = self._mapping(spectra_field="PARTNER")
+        self.assertEqual(len((mapping | other)._compile_plan()), 2)
+
+    def test_read_field_path(self):
+        records = self.contacts
+
+        names = self.Mapping._read_field_path(records, ["parent_id", "name"])
+        self.assertEqual(
+            [names[record.id] for record in records], ["Acme Corp", "Acme Corp", False]
+        )
+
+        parents = self.Mapping._read_field_path(records, ["parent_id"])
+        self.assertEqual(parents[self.contacts[0].id], self.company)
+        self.assertFalse(parents[self.contacts[2].id])
+
+        tags = self.Mapping._read_field_path(records, ["parent_id", "category_id"])
+        self.assertEqual(tags[self.contacts[1].id], self.category)
+        self.assertFalse(tags[self.contacts[2].id])
+
+    def test_read_field_path_invalid(self):
+        records = self.contacts
+
+        missing = self.Mapping._read_field_path(records, ["no_such_field"])
+        self.assertEqual(set(missing.values()), {None})
+
+        # Scalar fields cannot be followed
+        scalar = self.Mapping._read_field_path(records, ["name", "ref"])
+        self.assertEqual(set(scalar.values()), {None})
+
+    def test_apply_step_mapping_types(self):
+        apply_step = self.Mapping._apply_step
+
+        self.assertEqual(
+            apply_step(
+                self._step(mapping_type="employee"),
+                SimpleNamespace(employee_code="JDOE"),
+            ),
+            "JDOE",
+        )
+        self.assertEqual(
+            apply_step(
+                self._step(mapping_type="employee"),
+                SimpleNamespace(login="ana.cruz@tbwa.com"),
+            ),
+            "ANA.CRUZ",
+        )
+        self.assertEqual(
+            apply_step(self._step(mapping_type="employee"), self.company),
+            str(self.company.id).zfill(6),
+        )
+        self.assertEqual(apply_step(self._step(mapping_type="employee"), None), "")
+        self.assertEqual(
+            apply_step(
+                self._step(mapping_type="cost_center"), SimpleNamespace(code="PRJ1")
+            ),
+            "PRJ1",
+        )
+        self.assertEqual(
+            apply_step(self._step(mapping_type="cost_center"), None), "MAPPED"
+        )
+        self.assertEqual(
+            apply_step(
+                self._step(mapping_type="gl_account", spectra_value="6210"), None
+            ),
+            "6210",
+        )
+
+    def test_apply_step_formats(self):
+        apply_step = self.Mapping._apply_step
+
+        self.assertEqual(
+            apply_step(
+                self._step(spectra_format="currency", spectra_value="12.5"), None
+            ),
+            "12.50",
+        )
+        self.assertEqual(
+            apply_step(
+                self._step(spectra_format="currency", spectra_value="n/a"), None
+            ),
+            "0.00",
+        )
+        self.assertEqual(
+            apply_step(self._step(spectra_format="number", spectra_value="42.9"), None),
+            "42",
+        )
+        self.assertEqual(
+            apply_step(self._step(spectra_format="number", spectra_value="n/a"), None),
+            "0",
+        )
+
+    def test_apply_step_validation(self):
+        apply_step = self.Mapping._apply_step
+
+        with self.assertRaises(UserError):
+            apply_step(self._step(is_required=True, spectra_value=""), None)
+
+        validator = compile("len(value) == 4", "<validation_rule>", "eval")
+        self.assertEqual(
+            apply_step(self._step(validator=validator, spectra_value="6210"), None),
+            "6210",
+        )
+        with self.assertRaises(ValidationError):
+            apply_step(self._step(validator=validator, spectra_value="62"), None)
+
+    def test_apply_mapping_bulk_matches_apply_mapping(self):
+        mappings = self._mapping(
+            mapping_type="cost_center", odoo_field="parent_id", spectra_field="PARTNER"
+        ) | self._mapping(
+            mapping_type="gl_account", odoo_field="parent_id.ref", spectra_value="6210"
+        )
+        records = self.contacts
+
+        results = mappings.apply_mapping_bulk(records)
+
+        self.assertEqual(set(results), set(records.ids))
+        for record in records:
+            self.assertEqual(
+                results[record.id],
+                {
+                    mapping.spectra_field: mapping.apply_mapping(record, "parent_id")
+                    for mapping in mappings
+                },
+            )
+        self.assertEqual(
+            results[records[0].id], {"PARTNER": "MAPPED", "DESCRIPTION": "6210"}
+        )
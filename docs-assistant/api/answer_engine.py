@@ -8,16 +8,26 @@ import os
 import time
 import uuid
 import json
+import asyncio
 import logging
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 import openai
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 import numpy as np
 from dotenv import load_dotenv
 
@@ -28,11 +38,107 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Database pool settings
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "60"))
+API_KEY_CACHE_SIZE = int(os.getenv("API_KEY_CACHE_SIZE", "1024"))
+
+# Query embedding and answer cache settings
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", "86400"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
+CORPUS_VERSION_TTL = float(os.getenv("CORPUS_VERSION_TTL", "30"))
+
+# Retrieval settings: "hybrid" fuses vector and full-text rankings (RRF),
+# "vector" uses vector similarity only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "100"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Connection pool, opened at startup
+db_pool: Optional[ThreadedConnectionPool] = None
+
+# Blocking psycopg2 calls run here, never on the event loop. One worker per
+# pooled connection, so a query never waits for a connection in a thread.
+db_executor = ThreadPoolExecutor(max_workers=DB_POOL_MAX, thread_name_prefix="docs-db")
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+# API key → project info. Revoked keys stay valid for at most the TTL.
+api_key_cache = TTLCache(API_KEY_CACHE_TTL, API_KEY_CACHE_SIZE)
+
+# sha256(model, normalized text) → embedding vector
+embedding_cache = TTLCache(EMBEDDING_CACHE_TTL, EMBEDDING_CACHE_SIZE)
+
+# (project, question hash, corpus version) → generated answer
+answer_cache = TTLCache(ANSWER_CACHE_TTL, ANSWER_CACHE_SIZE)
+
+# project → corpus version, re-read so re-ingestion done through another
+# worker invalidates cached answers within CORPUS_VERSION_TTL
+corpus_version_cache = TTLCache(CORPUS_VERSION_TTL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the database pool on startup, close it on shutdown"""
+    global db_pool
+    db_pool = ThreadedConnectionPool(
+        DB_POOL_MIN,
+        DB_POOL_MAX,
+        host=os.getenv("SUPABASE_HOST"),
+        port=os.getenv("SUPABASE_PORT", "5432"),
+        database=os.getenv("SUPABASE_DB"),
+        user=os.getenv("SUPABASE_USER"),
+        password=os.getenv("SUPABASE_PASSWORD"),
+        cursor_factory=RealDictCursor
+    )
+    try:
+        yield
+    finally:
+        db_executor.shutdown(wait=True)
+        db_pool.closeall()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Docs Assistant API",
     description="Kapa.ai-style self-hosted RAG system for technical documentation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -45,20 +151,30 @@ app.add_middleware(
 )
 
 # Database connection
+@contextmanager
 def get_db_connection():
-    """Get database connection"""
-    return psycopg2.connect(
-        host=os.getenv("SUPABASE_HOST"),
-        port=os.getenv("SUPABASE_PORT", "5432"),
-        database=os.getenv("SUPABASE_DB"),
-        user=os.getenv("SUPABASE_USER"),
-        password=os.getenv("SUPABASE_PASSWORD"),
-        cursor_factory=RealDictCursor
-    )
+    """Borrow a pooled connection, rolled back and returned on exit"""
+    conn = db_pool.getconn()
+    try:
+        yield conn
+    finally:
+        if not conn.closed:
+            conn.rollback()
+        db_pool.putconn(conn, close=bool(conn.closed))
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database function in the database executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
 
 # LLM clients
 openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+async_anthropic_client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+# Answer generation settings
+ANSWER_MODEL = "claude-3-sonnet-20240229"
+ANSWER_MAX_TOKENS = 1000
 
 # Pydantic models
 class ChatRequest(BaseModel):
@@ -101,8 +217,18 @@ async def authenticate_api_key(
     if not api_key:
         raise HTTPException(status_code=401, detail="API key required")
 
-    conn = get_db_connection()
-    try:
+    auth_info = api_key_cache.get(api_key)
+    if auth_info is None:
+        auth_info = await run_db(fetch_api_key, api_key)
+        if not auth_info:
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        api_key_cache.set(api_key, auth_info)
+
+    return auth_info
+
+def fetch_api_key(api_key: str) -> Optional[Dict[str, Any]]:
+    """Look up an API key and mark it used (at most once per cache TTL)"""
+    with get_db_connection() as conn:
         with conn.cursor() as cur:
             # In production, hash the key and compare
             cur.execute("""
@@ -114,7 +240,7 @@ async def authenticate_api_key(
             result = cur.fetchone()
 
             if not result:
-                raise HTTPException(status_code=401, detail="Invalid API key")
+                return None
 
             # Update last used
             cur.execute("""
@@ -125,32 +251,94 @@ async def authenticate_api_key(
             conn.commit()
 
             return dict(result)
-    finally:
-        conn.close()
 
 # Utility functions
+def normalize_question(text: str) -> str:
+    """Case, whitespace and trailing punctuation insensitive form of a question"""
+    return re.sub(r"\s+", " ", text).strip().rstrip("?!. ").casefold()
+
+def question_hash(text: str, *parts: Any) -> str:
+    """Content address of a normalized question (plus optional key parts)"""
+    key = json.dumps([normalize_question(text), *parts], sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
 def get_embedding(text: str, model: str = "text-embedding-3-large") -> List[float]:
-    """Get embedding for text using OpenAI"""
-    response = openai_client.embeddings.create(
-        input=text,
-        model=model
+    """Get embedding for text using OpenAI, cached per normalized text"""
+    key = question_hash(text, model)
+    embedding = embedding_cache.get(key)
+    if embedding is None:
+        response = openai_client.embeddings.create(
+            input=text,
+            model=model
+        )
+        embedding = response.data[0].embedding
+        embedding_cache.set(key, embedding)
+    return embedding
+
+def fetch_corpus_version(project_id: str) -> int:
+    """Corpus version of a project, bumped by ingestion (see docs_bump_corpus_version)"""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT version FROM docs_corpus_versions WHERE project_id = %s
+            """, (project_id,))
+            row = cur.fetchone()
+            return row['version'] if row else 0
+
+def bump_corpus_version(project_id: str) -> int:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT docs_bump_corpus_version(%s::uuid) AS version", (project_id,))
+            version = cur.fetchone()['version']
+            conn.commit()
+            return version
+
+async def get_corpus_version(project_id: str) -> int:
+    version = corpus_version_cache.get(project_id)
+    if version is None:
+        version = await run_db(fetch_corpus_version, project_id)
+        corpus_version_cache.set(project_id, version)
+    return version
+
+def answer_cache_key(project_id: str, request: "ChatRequest", corpus_version: int) -> Optional[str]:
+    """Answer cache key, None when the answer depends on the conversation"""
+    if request.history:
+        return None
+    return question_hash(
+        request.question, str(project_id), corpus_version,
+        request.source_groups, request.filters
     )
-    return response.data[0].embedding
 
 def search_similar_chunks(
     project_id: str,
     query_embedding: List[float],
     limit: int = 10,
-    source_group_ids: Optional[List[str]] = None
+    source_group_ids: Optional[List[str]] = None,
+    query_text: Optional[str] = None
 ) -> List[Dict[str, Any]]:
-    """Search for similar chunks using vector similarity"""
-    conn = get_db_connection()
-    try:
+    """
+    Search for relevant chunks
+
+    With a query text (and RETRIEVAL_MODE=hybrid), vector and full-text
+    candidates are fused with reciprocal rank fusion by
+    docs_hybrid_search_chunks, which also sets the ANN search parameters
+    (hnsw.ef_search / ivfflat.probes) for the call.
+    """
+    with get_db_connection() as conn:
         with conn.cursor() as cur:
             # Convert embedding to PostgreSQL format
             embedding_array = "[" + ",".join(map(str, query_embedding)) + "]"
 
-            if source_group_ids:
+            if query_text and RETRIEVAL_MODE == "hybrid":
+                cur.execute("""
+                    SELECT * FROM docs_hybrid_search_chunks(
+                        %s::vector, %s, %s, %s::uuid, %s::uuid[], %s, %s
+                    )
+                """, (
+                    embedding_array, query_text, limit, project_id,
+                    source_group_ids or None, max(HYBRID_CANDIDATES, limit), RRF_K
+                ))
+            elif source_group_ids:
                 cur.execute("""
                     SELECT * FROM docs_search_chunks(
                         %s::vector, %s, %s::uuid, %s::uuid[]
@@ -164,15 +352,13 @@ def search_similar_chunks(
                 """, (embedding_array, limit, project_id))
 
             return cur.fetchall()
-    finally:
-        conn.close()
 
-def generate_answer_with_citations(
+def build_answer_messages(
     question: str,
     context_chunks: List[Dict[str, Any]],
     history: Optional[List[Dict[str, str]]] = None
-) -> Dict[str, Any]:
-    """Generate answer using LLM with citations"""
+) -> List[Dict[str, str]]:
+    """Build the LLM messages: recent history plus the question with its context"""
 
     # Build context from chunks
     context_parts = []
@@ -205,12 +391,30 @@ INSTRUCTIONS:
 QUESTION: {question}"""
 
     messages.append({"role": "user", "content": system_prompt})
+    return messages
+
+def build_citation(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "chunk_id": str(chunk['chunk_id']),
+        "document_title": chunk['document_title'],
+        "heading": chunk['heading'],
+        "content_snippet": chunk['content'][:200] + "..." if len(chunk['content']) > 200 else chunk['content'],
+        "similarity_score": chunk['similarity_score']
+    }
+
+def generate_answer_with_citations(
+    question: str,
+    context_chunks: List[Dict[str, Any]],
+    history: Optional[List[Dict[str, str]]] = None
+) -> Dict[str, Any]:
+    """Generate answer using LLM with citations"""
+    messages = build_answer_messages(question, context_chunks, history)
 
     try:
         # Use Claude for better reasoning (can switch to OpenAI if preferred)
         response = anthropic_client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=1000,
+            model=ANSWER_MODEL,
+            max_tokens=ANSWER_MAX_TOKENS,
             messages=messages,
             temperature=0.1
         )
@@ -221,13 +425,7 @@ QUESTION: {question}"""
         citations = []
         for chunk in context_chunks:
             if chunk['document_title'] in answer:
-                citations.append({
-                    "chunk_id": str(chunk['chunk_id']),
-                    "document_title": chunk['document_title'],
-                    "heading": chunk['heading'],
-                    "content_snippet": chunk['content'][:200] + "..." if len(chunk['content']) > 200 else chunk['content'],
-                    "similarity_score": chunk['similarity_score']
-                })
+                citations.append(build_citation(chunk))
 
         return {
             "answer": answer,
@@ -262,9 +460,47 @@ async def chat_endpoint(
     # Get project info
     project_id = auth_info['project_id']
 
+    # Repeated questions are answered from the cache, without LLM round-trip
+    cache_key = answer_cache_key(project_id, request, await get_corpus_version(str(project_id)))
+    generation_result = answer_cache.get(cache_key) if cache_key else None
+    if generation_result is not None:
+        return await respond_with_answer(
+            request, auth_info, generation_result,
+            chunks_retrieved=generation_result["chunks_retrieved"],
+            start_time=start_time, cached=True
+        )
+
+    chunks = await retrieve_chunks(request, project_id)
+
+    if not chunks:
+        return ChatResponse(
+            answer="I couldn't find relevant information in the documentation to answer your question.",
+            citations=[],
+            metadata={"grounded": False, "chunks_retrieved": 0}
+        )
+
+    # Generate answer
+    generation_result = await run_in_threadpool(
+        generate_answer_with_citations,
+        question=request.question,
+        context_chunks=chunks,
+        history=request.history
+    )
+
+    # Errors are not cached (no token usage means the LLM call failed)
+    if cache_key and generation_result["token_usage"]["output_tokens"]:
+        answer_cache.set(cache_key, dict(generation_result, chunks_retrieved=len(chunks)))
+
+    return await respond_with_answer(
+        request, auth_info, generation_result,
+        chunks_retrieved=len(chunks), start_time=start_time
+    )
+
+async def retrieve_chunks(request: "ChatRequest", project_id: str) -> List[Dict[str, Any]]:
+    """Embed the question and retrieve the chunks to answer it from"""
     # Generate query embedding
     try:
-        query_embedding = get_embedding(request.question)
+        query_embedding = await run_in_threadpool(get_embedding, request.question)
     except Exception as e:
         logger.error(f"Embedding generation error: {e}")
         raise HTTPException(status_code=500, detail="Failed to process question")
@@ -275,32 +511,61 @@ async def chat_endpoint(
         # Convert source group names to IDs (implementation needed)
         pass
 
-    chunks = search_similar_chunks(
+    return await run_db(
+        search_similar_chunks,
         project_id=str(project_id),
         query_embedding=query_embedding,
         limit=10,
-        source_group_ids=source_group_ids
+        source_group_ids=source_group_ids,
+        query_text=request.question
     )
 
-    if not chunks:
-        return ChatResponse(
-            answer="I couldn't find relevant information in the documentation to answer your question.",
-            citations=[],
-            metadata={"grounded": False, "chunks_retrieved": 0}
-        )
+async def respond_with_answer(
+    request: "ChatRequest",
+    auth_info: Dict[str, Any],
+    generation_result: Dict[str, Any],
+    chunks_retrieved: int,
+    start_time: float,
+    cached: bool = False
+) -> "ChatResponse":
+    """Log an answer and build its response"""
+    latency_ms = int((time.time() - start_time) * 1000)
 
-    # Generate answer
-    generation_result = generate_answer_with_citations(
+    # Log question and answer
+    answer_id = await run_db(
+        log_chat,
+        project_id=auth_info['project_id'],
+        api_key_id=auth_info['id'],
         question=request.question,
-        context_chunks=chunks,
-        history=request.history
+        stream=request.stream,
+        generation_result=generation_result,
+        latency_ms=latency_ms
     )
 
-    latency_ms = int((time.time() - start_time) * 1000)
+    # Return response with answer ID for feedback
+    return ChatResponse(
+        answer=generation_result["answer"],
+        citations=generation_result["citations"],
+        metadata={
+            "answer_id": str(answer_id),
+            "grounded": len(generation_result["citations"]) > 0,
+            "chunks_retrieved": chunks_retrieved,
+            "latency_ms": latency_ms,
+            "token_usage": generation_result["token_usage"],
+            "cached": cached
+        }
+    )
 
-    # Log question and answer
-    conn = get_db_connection()
-    try:
+def log_chat(
+    project_id: str,
+    api_key_id: str,
+    question: str,
+    stream: bool,
+    generation_result: Dict[str, Any],
+    latency_ms: int
+) -> str:
+    """Log a question, its answer and citations in one transaction"""
+    with get_db_connection() as conn:
         with conn.cursor() as cur:
             # Log question
             cur.execute("""
@@ -308,7 +573,7 @@ async def chat_endpoint(
                 (project_id, api_key_id, query, channel, metadata)
                 VALUES (%s, %s, %s, %s, %s)
                 RETURNING id
-            """, (project_id, auth_info['id'], request.question, 'api', json.dumps({"stream": request.stream})))
+            """, (project_id, api_key_id, question, 'api', json.dumps({"stream": stream})))
             question_id = cur.fetchone()['id']
 
             # Log answer
@@ -328,29 +593,18 @@ async def chat_endpoint(
             answer_id = cur.fetchone()['id']
 
             # Log citations
-            for citation in generation_result["citations"]:
-                cur.execute("""
+            if generation_result["citations"]:
+                cur.executemany("""
                     INSERT INTO docs_answer_citations
                     (answer_id, chunk_id, relevance_score, citation_text)
                     VALUES (%s, %s, %s, %s)
-                """, (answer_id, citation["chunk_id"], citation["similarity_score"], citation["content_snippet"]))
+                """, [
+                    (answer_id, citation["chunk_id"], citation["similarity_score"], citation["content_snippet"])
+                    for citation in generation_result["citations"]
+                ])
 
             conn.commit()
-
-            # Return response with answer ID for feedback
-            return ChatResponse(
-                answer=generation_result["answer"],
-                citations=generation_result["citations"],
-                metadata={
-                    "answer_id": str(answer_id),
-                    "grounded": len(generation_result["citations"]) > 0,
-                    "chunks_retrieved": len(chunks),
-                    "latency_ms": latency_ms,
-                    "token_usage": generation_result["token_usage"]
-                }
-            )
-    finally:
-        conn.close()
+            return answer_id
 
 @app.post("/v1/search", response_model=SearchResponse)
 async def search_endpoint(
@@ -366,7 +620,7 @@ async def search_endpoint(
 
     # Generate query embedding
     try:
-        query_embedding = get_embedding(request.query)
+        query_embedding = await run_in_threadpool(get_embedding, request.query)
     except Exception as e:
         logger.error(f"Embedding generation error: {e}")
         raise HTTPException(status_code=500, detail="Failed to process query")
@@ -377,11 +631,13 @@ async def search_endpoint(
         # Convert source group names to IDs
         pass
 
-    chunks = search_similar_chunks(
+    chunks = await run_db(
+        search_similar_chunks,
         project_id=str(project_id),
         query_embedding=query_embedding,
         limit=request.limit,
-        source_group_ids=source_group_ids
+        source_group_ids=source_group_ids,
+        query_text=request.query
     )
 
     return SearchResponse(
@@ -398,8 +654,11 @@ async def feedback_endpoint(
     auth_info: Dict[str, Any] = Depends(authenticate_api_key)
 ):
     """Submit feedback for an answer"""
-    conn = get_db_connection()
-    try:
+    await run_db(insert_feedback, request)
+    return {"status": "success", "message": "Feedback submitted"}
+
+def insert_feedback(request: FeedbackRequest) -> None:
+    with get_db_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("""
                 INSERT INTO docs_feedback
@@ -408,31 +667,169 @@ async def feedback_endpoint(
             """, (request.answer_id, request.rating, request.comment, request.user_id))
             conn.commit()
 
-        return {"status": "success", "message": "Feedback submitted"}
-    finally:
-        conn.close()
+def ping_db() -> None:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+
+@app.post("/v1/cache/invalidate")
+async def invalidate_cache_endpoint(
+    auth_info: Dict[str, Any] = Depends(authenticate_api_key)
+):
+    """Invalidate cached answers of the project after its chunks were re-ingested"""
+    if not auth_info['permissions'].get('ingest', False):
+        raise HTTPException(status_code=403, detail="Ingest permission denied")
+
+    project_id = str(auth_info['project_id'])
+    version = await run_db(bump_corpus_version, project_id)
+    corpus_version_cache.set(project_id, version)
+    return {"status": "success", "corpus_version": version}
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     try:
-        conn = get_db_connection()
-        conn.close()
+        await run_db(ping_db)
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return {"status": "unhealthy", "database": "disconnected"}, 503
 
 # Streaming chat endpoint (for real-time responses)
+def sse_event(event: str, data: Any) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+class CitationTracker:
+    """Emit a chunk's citation as soon as its document title appears in the answer"""
+
+    def __init__(self, chunks: List[Dict[str, Any]]):
+        self.pending = list(chunks)
+        self.citations: List[Dict[str, Any]] = []
+        self.answer = ""
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        # Only the new text (plus an overlap for titles split across
+        # tokens) is searched for the titles not cited yet
+        start = len(self.answer)
+        self.answer += text
+        found = []
+        for chunk in list(self.pending):
+            title = chunk['document_title']
+            if title in self.answer[max(0, start - len(title) + 1):]:
+                self.pending.remove(chunk)
+                found.append(build_citation(chunk))
+        self.citations.extend(found)
+        return found
+
+async def stream_answer_events(
+    request: ChatRequest,
+    auth_info: Dict[str, Any],
+    start_time: float
+):
+    """
+    SSE events of a streamed answer:
+
+    retrieval → token* (interleaved with citation*) → done, or error
+    """
+    project_id = auth_info['project_id']
+    cache_key = answer_cache_key(project_id, request, await get_corpus_version(str(project_id)))
+    cached = answer_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        yield sse_event("retrieval", {"chunks_retrieved": cached["chunks_retrieved"], "cached": True})
+        yield sse_event("token", {"text": cached["answer"]})
+        for citation in cached["citations"]:
+            yield sse_event("citation", citation)
+        generation_result = cached
+        chunks_retrieved = cached["chunks_retrieved"]
+        first_token_ms = int((time.time() - start_time) * 1000)
+    else:
+        try:
+            chunks = await retrieve_chunks(request, project_id)
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail})
+            return
+        chunks_retrieved = len(chunks)
+        yield sse_event("retrieval", {"chunks_retrieved": chunks_retrieved, "cached": False})
+
+        if not chunks:
+            yield sse_event("token", {"text": "I couldn't find relevant information in the documentation to answer your question."})
+            yield sse_event("done", {"grounded": False, "chunks_retrieved": 0})
+            return
+
+        tracker = CitationTracker(chunks)
+        first_token_ms = None
+        try:
+            async with async_anthropic_client.messages.stream(
+                model=ANSWER_MODEL,
+                max_tokens=ANSWER_MAX_TOKENS,
+                messages=build_answer_messages(request.question, chunks, request.history),
+                temperature=0.1
+            ) as stream:
+                async for text in stream.text_stream:
+                    if first_token_ms is None:
+                        first_token_ms = int((time.time() - start_time) * 1000)
+                    yield sse_event("token", {"text": text})
+                    for citation in tracker.feed(text):
+                        yield sse_event("citation", citation)
+                final_message = await stream.get_final_message()
+        except Exception as e:
+            logger.error(f"LLM streaming error: {e}")
+            yield sse_event("error", {"detail": "I encountered an error while generating the answer. Please try again."})
+            return
+
+        generation_result = {
+            "answer": tracker.answer,
+            "citations": tracker.citations,
+            "token_usage": {
+                "input_tokens": final_message.usage.input_tokens,
+                "output_tokens": final_message.usage.output_tokens
+            }
+        }
+        if cache_key and generation_result["token_usage"]["output_tokens"]:
+            answer_cache.set(cache_key, dict(generation_result, chunks_retrieved=chunks_retrieved))
+
+    latency_ms = int((time.time() - start_time) * 1000)
+    answer_id = await run_db(
+        log_chat,
+        project_id=project_id,
+        api_key_id=auth_info['id'],
+        question=request.question,
+        stream=True,
+        generation_result=generation_result,
+        latency_ms=latency_ms
+    )
+    yield sse_event("done", {
+        "answer_id": str(answer_id),
+        "grounded": len(generation_result["citations"]) > 0,
+        "chunks_retrieved": chunks_retrieved,
+        "latency_ms": latency_ms,
+        "time_to_first_token_ms": first_token_ms,
+        "token_usage": generation_result["token_usage"],
+        "cached": cached is not None
+    })
+
 @app.post("/v1/chat/stream")
 async def chat_stream_endpoint(
     request: ChatRequest,
     auth_info: Dict[str, Any] = Depends(authenticate_api_key)
 ):
-    """Streaming chat endpoint for real-time responses"""
-    # Implementation for streaming would go here
-    # This would use OpenAI/Claude streaming APIs
-    pass
+    """Streaming chat endpoint for real-time responses (server-sent events)"""
+    start_time = time.time()
+
+    # Check permissions
+    if not auth_info['permissions'].get('chat', True):
+        raise HTTPException(status_code=403, detail="Chat permission denied")
+
+    return StreamingResponse(
+        stream_answer_events(request, auth_info, start_time),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable proxy buffering (nginx) so tokens reach the client as they arrive
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 if __name__ == "__main__":
     import uvicorn
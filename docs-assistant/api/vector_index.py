@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+ANN index lifecycle for docs chunk embeddings
+
+Builds and rebuilds the HNSW / IVFFlat index used by hybrid retrieval
+(see supabase/migrations/20261017_docs_chunk_retrieval.sql) without
+blocking ingestion: the new index is built CONCURRENTLY next to the live
+one, then swapped in. IVFFlat list counts are derived from the corpus size.
+
+Usage:
+    python vector_index.py status
+    python vector_index.py build --method hnsw [--m 16] [--ef-construction 64]
+    python vector_index.py build --method ivfflat
+    python vector_index.py rebuild-if-needed
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "idx_docs_chunks_embedding"
+EMBEDDING_DIMENSIONS = 3072
+
+# Index key: halfvec, as vector indexes are limited to 2000 dimensions
+INDEX_EXPRESSION = f"(embedding::halfvec({EMBEDDING_DIMENSIONS}))"
+OPERATOR_CLASS = "halfvec_cosine_ops"
+
+
+def get_db_connection():
+    """Autocommit connection (CREATE INDEX CONCURRENTLY needs it)"""
+    conn = psycopg2.connect(
+        host=os.getenv("SUPABASE_HOST"),
+        port=os.getenv("SUPABASE_PORT", "5432"),
+        database=os.getenv("SUPABASE_DB"),
+        user=os.getenv("SUPABASE_USER"),
+        password=os.getenv("SUPABASE_PASSWORD"),
+        cursor_factory=RealDictCursor
+    )
+    conn.autocommit = True
+    return conn
+
+
+def get_status(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT * FROM docs_vector_index_state WHERE index_name = %s", (INDEX_NAME,))
+        state = cur.fetchone()
+        cur.execute("SELECT count(*) AS row_count FROM docs_chunks WHERE embedding IS NOT NULL")
+        row_count = cur.fetchone()["row_count"]
+        cur.execute("SELECT docs_chunk_index_needs_rebuild(%s) AS needs_rebuild", (INDEX_NAME,))
+        needs_rebuild = cur.fetchone()["needs_rebuild"]
+    return {
+        "state": dict(state) if state else None,
+        "row_count": row_count,
+        "needs_rebuild": needs_rebuild,
+    }
+
+
+def build_index(conn, method="hnsw", m=16, ef_construction=64, maintenance_work_mem=None):
+    """
+    Build the ANN index next to the live one and swap it in
+
+    Returns:
+        dict: recorded index state
+    """
+    new_name = f"{INDEX_NAME}_new"
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) AS row_count FROM docs_chunks WHERE embedding IS NOT NULL")
+        row_count = cur.fetchone()["row_count"]
+
+        if method == "ivfflat":
+            cur.execute("SELECT docs_ivfflat_lists(%s) AS lists", (row_count,))
+            lists = cur.fetchone()["lists"]
+            params = {"lists": lists, "m": None, "ef_construction": None}
+            options = sql.SQL("lists = {}").format(sql.Literal(lists))
+        else:
+            params = {"lists": None, "m": m, "ef_construction": ef_construction}
+            options = sql.SQL("m = {}, ef_construction = {}").format(
+                sql.Literal(m), sql.Literal(ef_construction)
+            )
+
+        if maintenance_work_mem:
+            cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+
+        # Leftover of an interrupted build (CONCURRENTLY leaves invalid indexes)
+        cur.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(new_name)))
+
+        logger.info(f"Building {method} index on {row_count} chunks ({params})")
+        cur.execute(
+            sql.SQL("CREATE INDEX CONCURRENTLY {} ON docs_chunks USING {} ({} {}) WITH ({})").format(
+                sql.Identifier(new_name),
+                sql.SQL(method),
+                sql.SQL(INDEX_EXPRESSION),
+                sql.SQL(OPERATOR_CLASS),
+                options,
+            )
+        )
+
+        # Swap in one short transaction
+        cur.execute("BEGIN")
+        cur.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(INDEX_NAME)))
+        cur.execute(
+            sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                sql.Identifier(new_name), sql.Identifier(INDEX_NAME)
+            )
+        )
+        cur.execute("""
+            INSERT INTO docs_vector_index_state
+                (index_name, method, lists, m, ef_construction, row_count, built_at)
+            VALUES (%s, %s, %s, %s, %s, %s, now())
+            ON CONFLICT (index_name) DO UPDATE SET
+                method = EXCLUDED.method,
+                lists = EXCLUDED.lists,
+                m = EXCLUDED.m,
+                ef_construction = EXCLUDED.ef_construction,
+                row_count = EXCLUDED.row_count,
+                built_at = EXCLUDED.built_at
+            RETURNING *
+        """, (INDEX_NAME, method, params["lists"], params["m"], params["ef_construction"], row_count))
+        state = dict(cur.fetchone())
+        cur.execute("COMMIT")
+
+    logger.info(f"Index {INDEX_NAME} ready")
+    return state
+
+
+def rebuild_if_needed(conn, default_method="hnsw", **kwargs):
+    status = get_status(conn)
+    if not status["needs_rebuild"]:
+        logger.info("Index up to date")
+        return status["state"]
+    method = status["state"]["method"] if status["state"] else default_method
+    return build_index(conn, method=method, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Docs chunk ANN index lifecycle")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Show index state and whether it needs a rebuild")
+
+    for name in ("build", "rebuild-if-needed"):
+        sub = subparsers.add_parser(name)
+        if name == "build":
+            sub.add_argument("--method", choices=["hnsw", "ivfflat"], default="hnsw")
+        sub.add_argument("--m", type=int, default=16, help="HNSW connections per layer")
+        sub.add_argument("--ef-construction", type=int, default=64, help="HNSW build candidate list")
+        sub.add_argument("--maintenance-work-mem", help="e.g. 2GB, speeds up large builds")
+
+    args = parser.parse_args()
+    conn = get_db_connection()
+    try:
+        if args.command == "status":
+            print(get_status(conn))
+        elif args.command == "build":
+            print(build_index(
+                conn, method=args.method, m=args.m, ef_construction=args.ef_construction,
+                maintenance_work_mem=args.maintenance_work_mem
+            ))
+        else:
+            print(rebuild_if_needed(
+                conn, m=args.m, ef_construction=args.ef_construction,
+                maintenance_work_mem=args.maintenance_work_mem
+            ))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
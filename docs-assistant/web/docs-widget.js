@@ -11,6 +11,9 @@ class DocsAssistantWidget {
             projectSlug: config.projectSlug || 'odoo-ce',
             position: config.position || 'bottom-right',
             theme: config.theme || 'light',
+            // Stream answers token by token (falls back to /v1/chat if the browser
+            // or the stream endpoint fails before the first token)
+            stream: config.stream !== false,
             ...config
         };
 
@@ -154,6 +157,12 @@ class DocsAssistantWidget {
         const typingMessage = this.addMessage('assistant', '', true);
 
         try {
+            if (this.config.stream && window.ReadableStream && window.TextDecoder) {
+                if (await this.askQuestionStream(message, typingMessage)) {
+                    return;
+                }
+            }
+
             const response = await this.askQuestion(message);
 
             // Remove typing indicator
@@ -224,6 +233,122 @@ class DocsAssistantWidget {
         return result;
     }
 
+    /**
+     * Stream the answer into messageDiv.
+     *
+     * Returns false if the stream failed before anything was rendered, so the
+     * caller can ask again through /v1/chat; later failures are thrown.
+     */
+    async askQuestionStream(question, messageDiv) {
+        let answer = '';
+        let contentDiv = null;
+        let citationsDiv = null;
+
+        try {
+            await this.readAnswerStream(question, {
+                token: text => {
+                    if (!contentDiv) {
+                        // First token: replace the typing indicator
+                        contentDiv = messageDiv.querySelector('.docs-assistant-message-content');
+                        this.trackEvent('first_token_received');
+                    }
+                    answer += text;
+                    contentDiv.innerHTML = this.formatMessage(answer);
+                    this.scrollToBottom();
+                },
+                citation: citation => {
+                    if (!citationsDiv) {
+                        messageDiv.insertAdjacentHTML('beforeend', this.renderCitations([]));
+                        citationsDiv = messageDiv.querySelector('.docs-assistant-citations');
+                    }
+                    citationsDiv.insertAdjacentHTML('beforeend', this.renderCitation(citation));
+                    this.scrollToBottom();
+                }
+            });
+        } catch (error) {
+            if (contentDiv || citationsDiv) throw error;
+            console.warn('Docs Assistant stream failed, retrying without streaming:', error);
+            return false;
+        }
+        return true;
+    }
+
+    async readAnswerStream(question, render) {
+        const response = await fetch(`${this.config.apiUrl}/v1/chat/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-API-Key': this.config.apiKey
+            },
+            body: JSON.stringify({
+                project_slug: this.config.projectSlug,
+                question: question,
+                history: this.conversationHistory,
+                stream: true
+            })
+        });
+
+        if (!response.ok || !response.body) {
+            throw new Error(`API error: ${response.status}`);
+        }
+
+        let answer = '';
+        let metadata = {};
+
+        const handleEvent = (event, data) => {
+            if (event === 'token') {
+                answer += data.text;
+                render.token(data.text);
+            } else if (event === 'citation') {
+                render.citation(data);
+            } else if (event === 'done') {
+                metadata = data;
+            } else if (event === 'error') {
+                throw new Error(data.detail);
+            }
+        };
+
+        // Parse server-sent events as chunks arrive
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                if (data) handleEvent(event, JSON.parse(data));
+            }
+        }
+
+        // Update conversation history
+        this.conversationHistory.push(
+            { role: 'user', content: question },
+            { role: 'assistant', content: answer }
+        );
+        if (this.conversationHistory.length > 20) {
+            this.conversationHistory = this.conversationHistory.slice(-20);
+        }
+
+        this.trackEvent('answer_received', {
+            answer_id: metadata.answer_id,
+            grounded: metadata.grounded,
+            latency: metadata.latency_ms,
+            time_to_first_token: metadata.time_to_first_token_ms
+        });
+    }
+
     addMessage(role, content, isTyping = false, citations = []) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `docs-assistant-message docs-assistant-message--${role}`;
@@ -260,8 +385,8 @@ class DocsAssistantWidget {
             .replace(/\[Source: ([^\]]+)\]/g, '<strong>[$1]</strong>');
     }
 
-    renderCitations(citations) {
-        const citationsHtml = citations.map(citation => `
+    renderCitation(citation) {
+        return `
             <div class="docs-assistant-citation" data-chunk-id="${citation.chunk_id}">
                 <div class="docs-assistant-citation-title">
                     ${citation.document_title}
@@ -271,7 +396,11 @@ class DocsAssistantWidget {
                     ${citation.content_snippet}
                 </div>
             </div>
-        `).join('');
+        `;
+    }
+
+    renderCitations(citations) {
+        const citationsHtml = citations.map(citation => this.renderCitation(citation)).join('');
 
         return `
             <div class="docs-assistant-citations">
@@ -28,6 +28,14 @@ class Settings(BaseSettings):
     enable_aggregation: bool = True
     cache_ttl: int = 300  # 5 minutes
 
+    # Upstream HTTP client pool (one long-lived client per target)
+    request_timeout: float = 30.0
+    aggregate_timeout: float = 10.0  # per target, for /aggregate fan-out
+    http2_enabled: bool = True
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+
     class Config:
         env_file = ".env"
 
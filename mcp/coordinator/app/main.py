@@ -1,6 +1,8 @@
 """
 MCP Coordinator - Main FastAPI application
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, Header, Depends
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
@@ -10,10 +12,18 @@ from .routing import router, MCPTarget, RoutingDecision
 from . import __version__
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close pooled upstream connections on shutdown"""
+    yield
+    await router.aclose()
+
+
 app = FastAPI(
     title="MCP Coordinator",
     description="Context-aware routing for multiple MCP servers",
     version=__version__,
+    lifespan=lifespan,
 )
 
 
@@ -64,14 +74,14 @@ async def health_check():
 @app.get("/status")
 async def get_status(authenticated: bool = Depends(verify_api_key)):
     """Detailed status with target health"""
-    target_status = {}
+    results = await router.aggregate_requests(list(MCPTarget), "/health", method="GET")
 
-    for target in MCPTarget:
-        try:
-            result = await router.forward_request(target, "/health", method="GET")
-            target_status[target.value] = {"status": "healthy", "details": result}
-        except Exception as e:
-            target_status[target.value] = {"status": "unhealthy", "error": str(e)}
+    target_status = {}
+    for target, result in results.items():
+        if isinstance(result, dict) and "error" in result:
+            target_status[target] = {"status": "unhealthy", "error": result["error"]}
+        else:
+            target_status[target] = {"status": "healthy", "details": result}
 
     return {
         "coordinator": {"status": "ok", "version": __version__},
@@ -1,6 +1,7 @@
 """
 Intelligent routing logic for MCP Coordinator
 """
+import asyncio
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import httpx
@@ -37,6 +38,29 @@ class MCPRouter:
             MCPTarget.ODOO_PROD: settings.odoo_prod_mcp_url,
             MCPTarget.ODOO_LAB: settings.odoo_lab_mcp_url,
         }
+        self._clients: Dict[MCPTarget, httpx.AsyncClient] = {}
+
+    def get_client(self, target: MCPTarget) -> httpx.AsyncClient:
+        """Return the pooled keep-alive client for a target (created lazily)"""
+        client = self._clients.get(target)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=self.target_urls[target],
+                timeout=settings.request_timeout,
+                http2=settings.http2_enabled,
+                limits=httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive_connections,
+                    keepalive_expiry=settings.keepalive_expiry,
+                ),
+            )
+            self._clients[target] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close all pooled clients (called on application shutdown)"""
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients))
 
     def route_request(self, request_data: Dict[str, Any]) -> RoutingDecision:
         """
@@ -93,34 +117,51 @@ class MCPRouter:
     async def forward_request(
         self, target: MCPTarget, endpoint: str, method: str = "GET", **kwargs
     ) -> Dict[str, Any]:
-        """Forward request to target MCP server"""
-        url = f"{self.target_urls[target]}{endpoint}"
+        """Forward request to target MCP server over its pooled client"""
+        client = self.get_client(target)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            if method == "GET":
-                response = await client.get(url, **kwargs)
-            elif method == "POST":
-                response = await client.post(url, **kwargs)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
+        if method == "GET":
+            response = await client.get(endpoint, **kwargs)
+        elif method == "POST":
+            response = await client.post(endpoint, **kwargs)
+        else:
+            raise ValueError(f"Unsupported method: {method}")
 
-            response.raise_for_status()
-            return response.json()
+        response.raise_for_status()
+        return response.json()
 
     async def aggregate_requests(
-        self, targets: List[MCPTarget], endpoint: str, method: str = "GET", **kwargs
+        self,
+        targets: List[MCPTarget],
+        endpoint: str,
+        method: str = "GET",
+        timeout: Optional[float] = None,
+        **kwargs,
     ) -> Dict[str, List[Any]]:
-        """Aggregate responses from multiple MCP servers"""
-        results = {}
+        """
+        Aggregate responses from multiple MCP servers concurrently
 
-        for target in targets:
+        Targets are queried in parallel, each bounded by ``timeout`` seconds
+        (``settings.aggregate_timeout`` by default). A failing or slow target
+        only contributes an error entry; the other results are still returned.
+        """
+        timeout = settings.aggregate_timeout if timeout is None else timeout
+
+        async def fetch(target: MCPTarget) -> Any:
             try:
-                result = await self.forward_request(target, endpoint, method, **kwargs)
-                results[target.value] = result
+                return await asyncio.wait_for(
+                    self.forward_request(target, endpoint, method, **kwargs),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                return {"error": f"Timed out after {timeout}s"}
             except Exception as e:
-                results[target.value] = {"error": str(e)}
+                return {"error": str(e)}
 
-        return results
+        responses = await asyncio.gather(*(fetch(target) for target in targets))
+        return {
+            target.value: response for target, response in zip(targets, responses)
+        }
 
 
 # Global router instance
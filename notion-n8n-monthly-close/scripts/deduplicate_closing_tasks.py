@@ -8,13 +8,96 @@ Date: 2025-11-21
 
 import csv
 import hashlib
+import io
 import json
 import sys
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+
+# CSV status → stage when no project_task_type has that name
+STATUS_STAGE_MAPPING = {
+    'Not started': 1,  # Default stage
+    'In Progress': 2,
+    'Blocked': 3,
+    'Ready to Post': 4,
+    'Done': 5,
+    'Posted': 5
+}
+
+# Columns staged with COPY in bulk mode (order of the COPY stream)
+STAGE_COLUMNS = [
+    'line_no', 'fingerprint', 'name', 'cluster', 'relative_due', 'due_date',
+    'status', 'description', 'reviewer_code', 'reviewer_name', 'reviewer_email',
+    'approver_code', 'approver_name', 'approver_email',
+]
+
+# Resolves owners and stages with joins and upserts on the fingerprint.
+# DISTINCT ON keeps the last CSV row of a fingerprint (ON CONFLICT cannot
+# touch a row twice); only tasks whose deadline or stage changed are updated.
+BULK_UPSERT_QUERY = """
+    WITH staged AS (
+        SELECT DISTINCT ON (fingerprint) *
+        FROM close_task_stage
+        ORDER BY fingerprint, line_no DESC
+    ),
+    resolved AS (
+        SELECT
+            s.*,
+            COALESCE(stage.id, mapped.stage_id, 1) AS stage_id,
+            COALESCE(reviewer_login.id, reviewer_partner.id) AS reviewer_id,
+            COALESCE(approver_login.id, approver_partner.id) AS approver_id
+        FROM staged s
+        LEFT JOIN LATERAL (
+            SELECT t.id FROM project_task_type t
+            WHERE t.name->>'en_US' = s.status
+            ORDER BY t.sequence, t.id LIMIT 1
+        ) stage ON true
+        LEFT JOIN (VALUES %(status_mapping)s) AS mapped(status, stage_id)
+            ON mapped.status = s.status
+        LEFT JOIN LATERAL (
+            SELECT u.id FROM res_users u
+            WHERE s.reviewer_code IS NOT NULL AND u.login = s.reviewer_email
+            LIMIT 1
+        ) reviewer_login ON true
+        LEFT JOIN LATERAL (
+            SELECT u.id FROM res_users u JOIN res_partner p ON u.partner_id = p.id
+            WHERE s.reviewer_code IS NOT NULL AND p.name ILIKE '%%' || s.reviewer_name || '%%'
+            LIMIT 1
+        ) reviewer_partner ON true
+        LEFT JOIN LATERAL (
+            SELECT u.id FROM res_users u
+            WHERE s.approver_code IS NOT NULL AND u.login = s.approver_email
+            LIMIT 1
+        ) approver_login ON true
+        LEFT JOIN LATERAL (
+            SELECT u.id FROM res_users u JOIN res_partner p ON u.partner_id = p.id
+            WHERE s.approver_code IS NOT NULL AND p.name ILIKE '%%' || s.approver_name || '%%'
+            LIMIT 1
+        ) approver_partner ON true
+    )
+    INSERT INTO project_task (
+        name, project_id, reviewer_id, approver_id, date_deadline, cluster,
+        relative_due, stage_id, description, close_fingerprint,
+        create_date, write_date, active, state
+    )
+    SELECT
+        name, %(project_id)s, reviewer_id, approver_id, due_date, cluster,
+        relative_due, stage_id, description, fingerprint,
+        NOW(), NOW(), true, '01_in_progress'
+    FROM resolved
+    ON CONFLICT (project_id, close_fingerprint) WHERE close_fingerprint IS NOT NULL
+    DO UPDATE SET
+        date_deadline = EXCLUDED.date_deadline,
+        stage_id = EXCLUDED.stage_id,
+        write_date = NOW()
+    WHERE project_task.date_deadline IS DISTINCT FROM EXCLUDED.date_deadline
+       OR project_task.stage_id IS DISTINCT FROM EXCLUDED.stage_id
+    RETURNING (xmax = 0) AS inserted
+"""
 
 
 class TaskDeduplicator:
@@ -104,11 +187,14 @@ class TaskDeduplicator:
     def _extract_owner_code(self, task_row: Dict) -> str:
         """Extract owner code from task description or name."""
         description = task_row.get('description') or ''
-        # Look for pattern: Owner: CODE
+        # Look for pattern: Owner: CODE (or **Owner:** CODE, as written by
+        # _build_description)
         if 'Owner:' in description:
             parts = description.split('Owner:')
             if len(parts) > 1:
-                return parts[1].split()[0].strip()
+                words = parts[1].strip(' *').split()
+                if words:
+                    return words[0].strip()
         return ''
 
     def get_or_create_user(self, owner_code: str, owner_name: str, owner_email: str) -> Optional[int]:
@@ -141,15 +227,6 @@ class TaskDeduplicator:
 
     def get_stage_id(self, status: str) -> int:
         """Map CSV status to Odoo stage_id."""
-        status_mapping = {
-            'Not started': 1,  # Default stage
-            'In Progress': 2,
-            'Blocked': 3,
-            'Ready to Post': 4,
-            'Done': 5,
-            'Posted': 5
-        }
-
         # Query actual stages (name is JSONB, extract en_US)
         self.cursor.execute("""
             SELECT id, name->>'en_US' as name_en
@@ -164,8 +241,8 @@ class TaskDeduplicator:
             return stages[status]
 
         # Try mapping
-        if status in status_mapping:
-            return status_mapping[status]
+        if status in STATUS_STAGE_MAPPING:
+            return STATUS_STAGE_MAPPING[status]
 
         # Default to first stage
         return 1
@@ -207,6 +284,56 @@ class TaskDeduplicator:
 
         return new_tasks, updated_tasks, unchanged_tasks
 
+    def drop_near_duplicates(
+        self,
+        csv_tasks: List[Dict],
+        existing_tasks: Dict[str, Dict],
+        threshold: float
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Drop new tasks whose name nearly duplicates an existing or earlier one.
+
+        Tasks matching an existing fingerprint are kept (they are updates).
+        Other tasks are dropped when their name shares at least
+        ``threshold`` of its words (Jaccard) with an existing task name or
+        the name of an earlier kept CSV task.
+
+        Returns:
+            Tuple of (kept_tasks, near_duplicates)
+        """
+        # Shared near-duplicate index (scripts/task_dedup_index.py), only
+        # needed with --similarity-threshold in a full repo checkout
+        scripts_dir = str(Path(__file__).resolve().parents[2] / 'scripts')
+        if scripts_dir not in sys.path:
+            sys.path.insert(0, scripts_dir)
+        from task_dedup_index import NearDuplicateIndex
+
+        index = NearDuplicateIndex(
+            (row['name'] for row in existing_tasks.values()),
+            threshold=threshold,
+            vocabulary=(task['name'] for task in csv_tasks)
+        )
+        kept = []
+        near_duplicates = []
+
+        for task in csv_tasks:
+            if task['fingerprint'] in existing_tasks:
+                kept.append(task)
+                continue
+
+            match = index.find(task['name'])
+            if match:
+                task['near_duplicate_of'], task['similarity'] = match
+                near_duplicates.append(task)
+                print(f"  ⚠️  Near-duplicate: {task['name'][:50]} ~ {match[0][:50]} ({match[1]:.0%})")
+                continue
+
+            kept.append(task)
+            index.add(task['name'])
+
+        print(f"✅ Dropped {len(near_duplicates)} near-duplicate tasks")
+        return kept, near_duplicates
+
     def _get_status_name(self, stage_id: int) -> str:
         """Get stage name by ID."""
         if not stage_id:
@@ -335,6 +462,152 @@ class TaskDeduplicator:
 
         return results
 
+    def ensure_fingerprint_column(self, project_id: int):
+        """
+        Persist task fingerprints on project_task for set-based upserts.
+
+        Adds the close_fingerprint column and its unique index (per
+        project), then fingerprints existing tasks of the project that have
+        none yet; when several share a fingerprint only the oldest gets it.
+        """
+        self.cursor.execute("""
+            ALTER TABLE project_task
+            ADD COLUMN IF NOT EXISTS close_fingerprint varchar(16)
+        """)
+        self.cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS project_task_close_fingerprint_uniq
+            ON project_task (project_id, close_fingerprint)
+            WHERE close_fingerprint IS NOT NULL
+        """)
+
+        self.cursor.execute("""
+            SELECT id, name, cluster, description
+            FROM project_task
+            WHERE project_id = %s
+            AND close_fingerprint IS NULL
+            AND active = true
+            ORDER BY id
+        """, (project_id,))
+        backfill = {}
+        for row in self.cursor.fetchall():
+            fingerprint = self.calculate_fingerprint({
+                'name': row['name'],
+                'cluster': row['cluster'] or '',
+                'owner_code': self._extract_owner_code(row),
+            })
+            backfill.setdefault(fingerprint, row['id'])
+
+        if backfill:
+            execute_values(self.cursor, """
+                UPDATE project_task t
+                SET close_fingerprint = v.fingerprint
+                FROM (VALUES %s) AS v(id, fingerprint)
+                WHERE t.id = v.id
+                AND NOT EXISTS (
+                    SELECT 1 FROM project_task o
+                    WHERE o.project_id = t.project_id
+                    AND o.close_fingerprint = v.fingerprint
+                )
+            """, [(task_id, fingerprint) for fingerprint, task_id in backfill.items()])
+            print(f"✅ Fingerprinted {self.cursor.rowcount} existing tasks")
+
+    def bulk_import_tasks(
+        self,
+        csv_tasks: List[Dict],
+        project_id: int,
+        dry_run: bool = False
+    ) -> Dict:
+        """
+        Import tasks in one transaction of a few set-based statements.
+
+        CSV rows are staged into a temp table with COPY, owners and stages
+        are resolved with joins, and a single INSERT ... ON CONFLICT on the
+        persisted fingerprint creates new tasks and updates changed ones.
+        A dry run executes everything and rolls back.
+        """
+        results = {
+            'created': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'errors': []
+        }
+
+        try:
+            self.ensure_fingerprint_column(project_id)
+
+            self.cursor.execute("""
+                CREATE TEMP TABLE close_task_stage (
+                    line_no integer,
+                    fingerprint varchar(16),
+                    name text,
+                    cluster text,
+                    relative_due text,
+                    due_date date,
+                    status text,
+                    description text,
+                    reviewer_code text,
+                    reviewer_name text,
+                    reviewer_email text,
+                    approver_code text,
+                    approver_name text,
+                    approver_email text
+                ) ON COMMIT DROP
+            """)
+
+            # Empty unquoted CSV fields are read as NULL
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for line_no, task in enumerate(csv_tasks):
+                row = dict(task, line_no=line_no, description=self._build_description(task))
+                writer.writerow([
+                    '' if row.get(column) is None else row[column]
+                    for column in STAGE_COLUMNS
+                ])
+            buffer.seek(0)
+            self.cursor.copy_expert(
+                f"COPY close_task_stage ({', '.join(STAGE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+
+            self.cursor.execute(
+                "SELECT count(DISTINCT fingerprint) AS staged FROM close_task_stage"
+            )
+            staged = self.cursor.fetchone()['staged']
+
+            status_mapping = self.cursor.mogrify(
+                ', '.join(['(%s, %s)'] * len(STATUS_STAGE_MAPPING)),
+                [value for item in STATUS_STAGE_MAPPING.items() for value in item]
+            ).decode()
+            self.cursor.execute(
+                BULK_UPSERT_QUERY.replace('%(status_mapping)s', status_mapping),
+                {'project_id': project_id}
+            )
+            rows = self.cursor.fetchall()
+            results['created'] = sum(1 for row in rows if row['inserted'])
+            results['updated'] = len(rows) - results['created']
+            results['unchanged'] = staged - len(rows)
+
+        except Exception as e:
+            self.conn.rollback()
+            results['errors'].append(f"Bulk import failed: {str(e)}")
+            print(f"  ❌ Bulk import failed: {str(e)}")
+            return results
+
+        print(f"\n📊 Bulk Import Results:")
+        print(f"  - Staged tasks: {staged} ({len(csv_tasks)} CSV rows)")
+        print(f"  - Created: {results['created']}")
+        print(f"  - Updated: {results['updated']}")
+        print(f"  - Unchanged: {results['unchanged']}")
+
+        if not dry_run:
+            self.conn.commit()
+            print(f"\n✅ Database changes committed")
+        else:
+            self.conn.rollback()
+            print(f"\n🔍 DRY RUN - No changes committed")
+
+        return results
+
     def _build_description(self, task: Dict) -> str:
         """Build task description with all metadata."""
         description_parts = [
@@ -413,6 +686,16 @@ def main():
         action='store_true',
         help='Perform dry run without committing changes'
     )
+    parser.add_argument(
+        '--similarity-threshold',
+        type=float,
+        help='Skip new tasks whose name nearly duplicates an existing one (Jaccard word similarity, e.g. 0.8)'
+    )
+    parser.add_argument(
+        '--bulk',
+        action='store_true',
+        help='Set-based import: COPY staging + one INSERT ... ON CONFLICT on a persisted fingerprint'
+    )
 
     args = parser.parse_args()
 
@@ -431,6 +714,7 @@ def main():
     print(f"CSV File: {args.csv_path}")
     print(f"Project ID: {args.project_id}")
     print(f"Dry Run: {args.dry_run}")
+    print(f"Bulk Mode: {args.bulk}")
     print("=" * 60)
 
     try:
@@ -440,22 +724,43 @@ def main():
         # Load CSV tasks
         csv_tasks = deduplicator.load_csv_tasks(args.csv_path)
 
-        # Get existing tasks from Odoo
-        existing_tasks = deduplicator.get_existing_tasks(args.project_id)
+        existing_tasks = None
+        near_duplicates = []
+        if args.similarity_threshold:
+            existing_tasks = deduplicator.get_existing_tasks(args.project_id)
+            csv_tasks, near_duplicates = deduplicator.drop_near_duplicates(
+                csv_tasks,
+                existing_tasks,
+                args.similarity_threshold
+            )
 
-        # Deduplicate
-        new_tasks, updated_tasks, unchanged_tasks = deduplicator.deduplicate_tasks(
-            csv_tasks,
-            existing_tasks
-        )
+        if args.bulk:
+            # Set-based import (staging, joins and upsert in the database)
+            results = deduplicator.bulk_import_tasks(
+                csv_tasks,
+                args.project_id,
+                dry_run=args.dry_run
+            )
+            unchanged_count = results['unchanged']
+        else:
+            # Get existing tasks from Odoo
+            if existing_tasks is None:
+                existing_tasks = deduplicator.get_existing_tasks(args.project_id)
+
+            # Deduplicate
+            new_tasks, updated_tasks, unchanged_tasks = deduplicator.deduplicate_tasks(
+                csv_tasks,
+                existing_tasks
+            )
 
-        # Import tasks
-        results = deduplicator.import_tasks(
-            new_tasks,
-            updated_tasks,
-            args.project_id,
-            dry_run=args.dry_run
-        )
+            # Import tasks
+            results = deduplicator.import_tasks(
+                new_tasks,
+                updated_tasks,
+                args.project_id,
+                dry_run=args.dry_run
+            )
+            unchanged_count = len(unchanged_tasks)
 
         # Summary
         print("\n" + "=" * 60)
@@ -463,7 +768,9 @@ def main():
         print("=" * 60)
         print(f"✅ Created: {results['created']} tasks")
         print(f"✅ Updated: {results['updated']} tasks")
-        print(f"ℹ️  Unchanged: {len(unchanged_tasks)} tasks")
+        print(f"ℹ️  Unchanged: {unchanged_count} tasks")
+        if args.similarity_threshold:
+            print(f"⚠️  Near-duplicates skipped: {len(near_duplicates)} tasks")
         print(f"❌ Errors: {len(results['errors'])}")
 
         if results['errors']:
@@ -1,27 +1,74 @@
 #!/usr/bin/env python3
 """
 InsightPulse OCR Adapter for Odoo Expenses
-Exposes /api/expense/ocr endpoint that matches Odoo's contract
+Exposes /api/expense/ocr endpoint that matches Odoo's contract, and
+/api/expense/ocr/batch for bulk imports
 """
 from fastapi import FastAPI, File, UploadFile, Header, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
 import os
+import io
+import json
+import asyncio
+import hashlib
 import logging
+import mimetypes
+import zipfile
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import re
 from dateutil import parser as date_parser
 
+from result_cache import OCRResultCache
+from vendor_matcher import VendorMatcher, load_vendor_table
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Configuration from environment
+OCR_UPSTREAM_URL = os.getenv("UPSTREAM_OCR_URL", "http://localhost:8000/ocr")
+API_KEY = os.getenv("IPAI_OCR_API_KEY", "dev-key-insecure")
+TIMEOUT = int(os.getenv("OCR_TIMEOUT", "60"))
+OCR_MAX_IN_FLIGHT = int(os.getenv("OCR_MAX_IN_FLIGHT", "8"))
+OCR_BATCH_MAX_FILES = int(os.getenv("OCR_BATCH_MAX_FILES", "500"))
+OCR_BATCH_MAX_BYTES = int(os.getenv("OCR_BATCH_MAX_BYTES", str(200 * 1024 * 1024)))
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "10000"))
+VENDOR_DATA_FILE = os.getenv(
+    "VENDOR_DATA_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ph_vendors.json")
+)
+VENDOR_FUZZY_THRESHOLD = float(os.getenv("VENDOR_FUZZY_THRESHOLD", "0.85"))
+
+# Shared upstream client (keep-alive pool) and in-flight cap, per worker
+upstream_client: Optional[httpx.AsyncClient] = None
+upstream_slots = asyncio.Semaphore(OCR_MAX_IN_FLIGHT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the pooled upstream client on startup, close it on shutdown"""
+    global upstream_client
+    upstream_client = httpx.AsyncClient(
+        timeout=TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=OCR_MAX_IN_FLIGHT,
+            max_keepalive_connections=OCR_MAX_IN_FLIGHT,
+        ),
+    )
+    logger.info(f"Upstream client ready (max {OCR_MAX_IN_FLIGHT} requests in flight)")
+    yield
+    await upstream_client.aclose()
+    upstream_client = None
+
+
 app = FastAPI(
     title="InsightPulse OCR Adapter",
     description="OCR service adapter for Odoo expense integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware (adjust origins as needed)
@@ -33,14 +80,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configuration from environment
-OCR_UPSTREAM_URL = os.getenv("UPSTREAM_OCR_URL", "http://localhost:8000/ocr")
-API_KEY = os.getenv("IPAI_OCR_API_KEY", "dev-key-insecure")
-TIMEOUT = int(os.getenv("OCR_TIMEOUT", "60"))
-
 logger.info(f"OCR Adapter initialized with upstream: {OCR_UPSTREAM_URL}")
 
 
+ocr_cache = OCRResultCache(OCR_CACHE_MAX_ENTRIES)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -48,10 +93,75 @@ async def health_check():
         "status": "ok",
         "service": "ocr-adapter",
         "upstream": OCR_UPSTREAM_URL,
+        "cache": ocr_cache.stats(),
+        "vendor_matcher": vendor_matcher.stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
 
+def check_api_key(x_api_key: Optional[str]):
+    """API key validation (if configured)"""
+    if API_KEY != "dev-key-insecure" and x_api_key != API_KEY:
+        logger.warning(f"Invalid API key attempt from {x_api_key}")
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+
+def upstream_error(e: Exception) -> HTTPException:
+    """Map an OCR processing failure to the HTTP error returned to clients"""
+    if isinstance(e, httpx.HTTPStatusError):
+        logger.error(f"Upstream OCR HTTP error: {e.response.status_code} - {e.response.text}")
+        return HTTPException(
+            status_code=502,
+            detail=f"Upstream OCR service error: {e.response.status_code}"
+        )
+    if isinstance(e, httpx.RequestError):
+        logger.error(f"Upstream OCR connection error: {str(e)}")
+        return HTTPException(
+            status_code=503,
+            detail=f"Could not connect to OCR service: {str(e)}"
+        )
+    logger.error(f"OCR processing error: {str(e)}", exc_info=e)
+    return HTTPException(
+        status_code=500,
+        detail=f"OCR processing failed: {str(e)}"
+    )
+
+
+async def process_receipt(filename: str, content: bytes, content_type: str):
+    """
+    OCR one receipt: result cache, then the upstream service
+
+    Upstream calls share the pooled client and wait for a free slot, so at
+    most OCR_MAX_IN_FLIGHT requests per worker reach the upstream at once.
+
+    Returns:
+        tuple: (normalized result, cache hit flag, SHA-256 of content)
+    """
+    content_hash = hashlib.sha256(content).hexdigest()
+
+    logger.info(f"Processing OCR request: {filename} ({len(content)} bytes, sha256 {content_hash})")
+
+    async def call_upstream():
+        # Call upstream OCR service
+        files = {"file": (filename, content, content_type)}
+        async with upstream_slots:
+            logger.info(f"Calling upstream OCR: {OCR_UPSTREAM_URL}")
+            resp = await upstream_client.post(OCR_UPSTREAM_URL, files=files)
+            resp.raise_for_status()
+
+        raw_response = resp.json()
+        logger.info(f"Upstream OCR response: {raw_response}")
+
+        # Normalize response to Odoo contract
+        # Adjust field mappings based on your actual OCR service response format
+        return normalize_ocr_response(raw_response)
+
+    normalized, cache_hit = await ocr_cache.get_or_compute(content_hash, call_upstream)
+
+    logger.info(f"Normalized response ({'cache hit' if cache_hit else 'upstream'}): {normalized}")
+    return normalized, cache_hit, content_hash
+
+
 @app.post("/api/expense/ocr")
 async def ocr_expense(
     file: UploadFile = File(...),
@@ -72,197 +182,151 @@ async def ocr_expense(
         "currency": "PHP",
         "total_amount": 1234.56
     }
+
+    Identical receipts (same bytes) are answered from the result cache;
+    the X-OCR-Cache response header tells whether the upstream was called.
     """
-    # API key validation (if configured)
-    if API_KEY != "dev-key-insecure" and x_api_key != API_KEY:
-        logger.warning(f"Invalid API key attempt from {x_api_key}")
-        raise HTTPException(status_code=401, detail="Invalid API key")
+    check_api_key(x_api_key)
 
     # Read file content
     try:
         content = await file.read()
-        filename = file.filename or "receipt.jpg"
-        content_type = file.content_type or "image/jpeg"
+        normalized, cache_hit, content_hash = await process_receipt(
+            file.filename or "receipt.jpg", content, file.content_type or "image/jpeg"
+        )
+        return JSONResponse(
+            content=normalized,
+            headers={
+                "X-OCR-Cache": "hit" if cache_hit else "miss",
+                "X-Content-SHA256": content_hash,
+            }
+        )
+    except Exception as e:
+        raise upstream_error(e)
 
-        logger.info(f"Processing OCR request: {filename} ({len(content)} bytes)")
 
-        # Call upstream OCR service
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            files = {"file": (filename, content, content_type)}
+def is_zip_upload(file: UploadFile) -> bool:
+    return (
+        file.content_type in ("application/zip", "application/x-zip-compressed")
+        or (file.filename or "").lower().endswith(".zip")
+    )
 
-            logger.info(f"Calling upstream OCR: {OCR_UPSTREAM_URL}")
-            resp = await client.post(OCR_UPSTREAM_URL, files=files)
-            resp.raise_for_status()
 
-            raw_response = resp.json()
-            logger.info(f"Upstream OCR response: {raw_response}")
+def extract_zip(filename: str, content: bytes):
+    """
+    Receipt files of a zip archive (directories and macOS metadata skipped)
 
-        # Normalize response to Odoo contract
-        # Adjust field mappings based on your actual OCR service response format
-        normalized = normalize_ocr_response(raw_response)
+    Returns:
+        list: (filename, content, content type) tuples
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {filename}")
+
+    entries = [
+        info for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+    ]
+    if sum(info.file_size for info in entries) > OCR_BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Zip archive too large once extracted: {filename}")
+    return [
+        (
+            info.filename,
+            archive.read(info),
+            mimetypes.guess_type(info.filename)[0] or "application/octet-stream",
+        )
+        for info in entries
+    ]
 
-        logger.info(f"Normalized response: {normalized}")
-        return JSONResponse(content=normalized)
 
-    except httpx.HTTPStatusError as e:
-        logger.error(f"Upstream OCR HTTP error: {e.response.status_code} - {e.response.text}")
-        raise HTTPException(
-            status_code=502,
-            detail=f"Upstream OCR service error: {e.response.status_code}"
-        )
-    except httpx.RequestError as e:
-        logger.error(f"Upstream OCR connection error: {str(e)}")
-        raise HTTPException(
-            status_code=503,
-            detail=f"Could not connect to OCR service: {str(e)}"
-        )
-    except Exception as e:
-        logger.error(f"OCR processing error: {str(e)}", exc_info=True)
+@app.post("/api/expense/ocr/batch")
+async def ocr_expense_batch(
+    files: List[UploadFile] = File(...),
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Batch OCR endpoint for bulk receipt imports
+
+    - Method: POST
+    - Body: multipart/form-data with one or more 'files' fields; zip
+      archives are expanded into their receipt files
+    - Auth: X-API-Key header (optional)
+
+    Streams NDJSON (application/x-ndjson), one line per receipt in
+    completion order:
+    {"index": 0, "filename": "...", "status": "ok", "cache": "miss",
+     "sha256": "...", "result": {...same fields as /api/expense/ocr...}}
+    {"index": 1, "filename": "...", "status": "error", "status_code": 502,
+     "error": "Upstream OCR service error: 500"}
+
+    Receipts are processed concurrently; upstream calls are capped by
+    OCR_MAX_IN_FLIGHT.
+    """
+    check_api_key(x_api_key)
+
+    receipts = []
+    total_bytes = 0
+    for file in files:
+        content = await file.read()
+        total_bytes += len(content)
+        if is_zip_upload(file):
+            receipts.extend(extract_zip(file.filename or "receipts.zip", content))
+        else:
+            receipts.append((file.filename or "receipt.jpg", content, file.content_type or "image/jpeg"))
+
+    if not receipts:
+        raise HTTPException(status_code=400, detail="No receipt files in request")
+    if len(receipts) > OCR_BATCH_MAX_FILES:
         raise HTTPException(
-            status_code=500,
-            detail=f"OCR processing failed: {str(e)}"
+            status_code=413,
+            detail=f"Too many receipts: {len(receipts)} (max {OCR_BATCH_MAX_FILES})"
         )
+    if total_bytes > OCR_BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Batch too large")
 
+    logger.info(f"Processing OCR batch: {len(receipts)} receipts")
 
-# PH-specific vendor normalization map
-VENDOR_NORMALIZATION = {
-    # SM Group
-    "sm store": "SM Supermarket",
-    "sm dept": "SM Department Store",
-    "sm supermarket": "SM Supermarket",
-    "sm city": "SM City",
-    "sm mall": "SM Mall",
-
-    # Jollibee Foods Corporation
-    "jollibee foods": "Jollibee",
-    "jfc": "Jollibee",
-    "jollibee foods corp": "Jollibee",
-
-    # Convenience Stores
-    "7 eleven": "7-Eleven",
-    "seven eleven": "7-Eleven",
-    "711": "7-Eleven",
-    "7eleven": "7-Eleven",
-    "ministop": "Ministop",
-    "alfamart": "Alfamart",
-    "familymart": "FamilyMart",
-    "family mart": "FamilyMart",
-    "lawson": "Lawson",
-
-    # Restaurants - Filipino
-    "max's": "Max's Restaurant",
-    "maxs restaurant": "Max's Restaurant",
-    "maxs": "Max's Restaurant",
-    "mang inasal": "Mang Inasal",
-    "manginasal": "Mang Inasal",
-    "chowking": "Chowking",
-    "chow king": "Chowking",
-    "greenwich": "Greenwich",
-    "green wich": "Greenwich",
-    "goldilocks": "Goldilocks",
-    "red ribbon": "Red Ribbon",
-
-    # Fast Food - International
-    "kfc": "KFC",
-    "kentucky fried chicken": "KFC",
-    "mcdonald's": "McDonald's",
-    "mcdonalds": "McDonald's",
-    "mcdo": "McDonald's",
-    "burger king": "Burger King",
-    "wendy's": "Wendy's",
-    "wendys": "Wendy's",
-    "pizza hut": "Pizza Hut",
-    "pizzahut": "Pizza Hut",
-    "shakey's": "Shakey's Pizza",
-    "shakeys": "Shakey's Pizza",
-    "shakeys pizza": "Shakey's Pizza",
-
-    # Coffee Shops
-    "starbucks": "Starbucks",
-    "starbucks coffee": "Starbucks",
-    "bo's coffee": "Bo's Coffee",
-    "bos coffee": "Bo's Coffee",
-    "dunkin donuts": "Dunkin' Donuts",
-    "dunkin'": "Dunkin' Donuts",
-    "dunkin": "Dunkin' Donuts",
-
-    # Supermarkets
-    "puregold": "Puregold",
-    "puregold price club": "Puregold",
-    "robinsons": "Robinsons Supermarket",
-    "robinsons supermarket": "Robinsons Supermarket",
-    "savemore": "SaveMore",
-    "save more": "SaveMore",
-    "rustans": "Rustan's",
-    "rustan's": "Rustan's",
-    "rustans supermarket": "Rustan's",
-    "allday": "AllDay Supermarket",
-    "all day": "AllDay Supermarket",
-    "landmark": "Landmark",
-    "landmark supermarket": "Landmark",
-
-    # Pharmacies
-    "mercury drug": "Mercury Drug",
-    "mercury drugstore": "Mercury Drug",
-    "watsons": "Watsons",
-    "watson's": "Watsons",
-    "southstar drug": "SouthStar Drug",
-    "the generics pharmacy": "The Generics Pharmacy",
-    "tgp": "The Generics Pharmacy",
-
-    # Gas Stations
-    "petron": "Petron",
-    "petron gas": "Petron",
-    "shell": "Shell",
-    "shell gas": "Shell",
-    "caltex": "Caltex",
-    "caltex gas": "Caltex",
-    "phoenix": "Phoenix Petroleum",
-    "phoenix petroleum": "Phoenix Petroleum",
-    "seaoil": "Seaoil",
-
-    # Retail
-    "national bookstore": "National Bookstore",
-    "national book store": "National Bookstore",
-    "fully booked": "Fully Booked",
-    "fullybooked": "Fully Booked",
-    "ace hardware": "Ace Hardware",
-    "handyman": "Handyman",
-    "wilcon": "Wilcon Depot",
-    "wilcon depot": "Wilcon Depot",
-}
-
-# PH local vendor patterns for currency defaulting
-PH_LOCAL_VENDORS = {
-    # Major chains
-    "sm", "jollibee", "7-eleven", "max's", "puregold",
-    "robinsons", "ministop", "mercury", "watsons", "mercury drug",
-    "savemore", "alfamart", "familymart", "lawson",
-
-    # Filipino restaurants
-    "mang inasal", "chowking", "greenwich", "goldilocks", "red ribbon",
-
-    # Fast food
-    "kfc", "mcdonald", "mcdo", "burger king", "wendy", "pizza hut", "shakey",
-
-    # Coffee
-    "starbucks", "bo's coffee", "dunkin",
-
-    # Supermarkets
-    "rustans", "rustan", "allday", "landmark",
-
-    # Pharmacies
-    "southstar", "generics pharmacy", "tgp",
-
-    # Gas stations
-    "petron", "shell", "caltex", "phoenix", "seaoil",
-
-    # Retail
-    "national bookstore", "fully booked", "ace hardware", "handyman", "wilcon",
-
-    # Generic
-    "supermarket", "sari-sari", "carinderia"
-}
+    async def run(index, filename, content, content_type):
+        line = {"index": index, "filename": filename}
+        try:
+            normalized, cache_hit, content_hash = await process_receipt(filename, content, content_type)
+        except Exception as e:
+            error = upstream_error(e)
+            line.update(status="error", status_code=error.status_code, error=error.detail)
+        else:
+            line.update(
+                status="ok",
+                cache="hit" if cache_hit else "miss",
+                sha256=content_hash,
+                result=normalized,
+            )
+        return line
+
+    async def stream_results():
+        tasks = [
+            asyncio.create_task(run(index, *receipt))
+            for index, receipt in enumerate(receipts)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            # Client went away: stop the remaining receipts
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+# PH vendor table, compiled once at startup (exact, substring and fuzzy matching)
+VENDOR_NORMALIZATION, PH_LOCAL_VENDORS = load_vendor_table(VENDOR_DATA_FILE)
+vendor_matcher = VendorMatcher(
+    VENDOR_NORMALIZATION,
+    PH_LOCAL_VENDORS,
+    fuzzy_threshold=VENDOR_FUZZY_THRESHOLD,
+)
+logger.info(f"Vendor matcher loaded: {vendor_matcher.stats()['aliases']} aliases from {VENDOR_DATA_FILE}")
 
 
 def normalize_vendor_name(vendor: str) -> str:
@@ -270,11 +334,10 @@ def normalize_vendor_name(vendor: str) -> str:
     if not vendor:
         return "Unknown Merchant"
 
-    vendor_lower = vendor.lower().strip()
-
-    # Check exact match in normalization map
-    if vendor_lower in VENDOR_NORMALIZATION:
-        return VENDOR_NORMALIZATION[vendor_lower]
+    # Exact alias, then closest alias for OCR-garbled names
+    canonical = vendor_matcher.match(vendor)
+    if canonical:
+        return canonical
 
     # Return original with title case
     return vendor.strip()
@@ -307,8 +370,7 @@ def should_default_to_php(vendor_name: str) -> bool:
     if not vendor_name:
         return True  # Default to PHP if no vendor
 
-    vendor_lower = vendor_name.lower()
-    return any(ph_vendor in vendor_lower for ph_vendor in PH_LOCAL_VENDORS)
+    return vendor_matcher.is_ph_local(vendor_name)
 
 
 def normalize_ocr_response(raw: dict) -> dict:
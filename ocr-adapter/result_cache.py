@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of normalized OCR results for the OCR adapter
+
+Keyed by the SHA-256 of the receipt bytes, least recently used entries are
+evicted beyond max_entries (0 disables caching). Concurrent requests for the
+same receipt share one upstream call, run in a task of its own so that a
+cancelled request (client gone, batch stream closed) does not cancel it for
+the others.
+"""
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+
+class OCRResultCache:
+    """
+    Content-addressed cache of normalized OCR results
+
+    Args:
+        max_entries: cached results kept (0 disables caching)
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+
+    def get(self, key: str) -> Optional[dict]:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return dict(self._entries[key])
+
+    def set(self, key: str, value: dict):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = dict(value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute):
+        """
+        Cached result for key, computing it with compute() on a miss
+
+        Returns:
+            tuple: (result dict, True if served without an upstream call)
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, True
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.hits += 1
+            return dict(await asyncio.shield(task)), True
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._compute(key, compute))
+        # Nobody may be left waiting: retrieve the exception so it is not logged
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[key] = task
+        return dict(await asyncio.shield(task)), False
+
+    async def _compute(self, key: str, compute) -> dict:
+        try:
+            value = await compute()
+        finally:
+            self._in_flight.pop(key, None)
+        self.set(key, value)
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -5,17 +5,28 @@ Receipt Test Harness - Automated OCR Quality Testing
 Usage:
     python test-harness.py --images ./test_receipts --ground-truth ground_truth.csv --api-url https://ocr.insightpulseai.net/api/expense/ocr --api-key YOUR_KEY
 
+Benchmark mode (replays the receipts concurrently, no ground truth needed):
+    python test-harness.py --benchmark --images ./test_receipts --api-url http://localhost:8001/api/expense/ocr --concurrency 16 --rate 20 --rounds 10
+
+Local stub upstream (point the adapter's UPSTREAM_OCR_URL at it):
+    python test-harness.py --serve-stub 8000 --stub-latency-ms 800
+
 Ground truth CSV format:
     file_name,vendor,date,total,currency
     jollibee_001.jpg,Jollibee,2025-11-15,345.50,PHP
     711_receipt.jpg,7-Eleven,2025-11-18,89.00,PHP
 """
 import argparse
+import asyncio
 import csv
 import json
+import os
+import random
 import sys
 import time
+from bisect import bisect_left
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -267,27 +278,395 @@ class TestHarness:
         print(f"\n📄 Detailed report saved to: {report_path}")
 
 
+# Latency histogram bucket upper bounds (ms)
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# Receipt image extensions replayed in benchmark mode
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.pdf'}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict:
+    """p50/p95/p99 and bucketed histogram of latencies (ms)"""
+    values = sorted(latencies)
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for v in values:
+        counts[bisect_left(LATENCY_BUCKETS_MS, v)] += 1
+    labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    histogram = dict(zip(labels, counts))
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1] if values else 0.0,
+        'histogram': histogram,
+    }
+
+
+class Benchmark:
+    """
+    Concurrent load test of the OCR endpoint
+
+    Replays the receipt set ``rounds`` times with ``concurrency`` requests in
+    flight, optionally paced at ``rate`` requests per second. Each request is
+    timed per stage:
+    - read: loading the receipt from disk
+    - request: HTTP round trip (adapter + upstream OCR)
+    - parse: decoding and checking the JSON response
+    """
+
+    STAGES = ('read', 'request', 'parse')
+
+    def __init__(self, api_url: str, api_key: Optional[str] = None, timeout: int = 30,
+                 concurrency: int = 8, rate: float = 0.0, rounds: int = 1,
+                 bust_cache: bool = False):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.rate = rate
+        self.rounds = rounds
+        self.bust_cache = bust_cache
+        self.samples = []
+
+    def _read(self, image_path: Path) -> bytes:
+        content = image_path.read_bytes()
+        if self.bust_cache:
+            # Trailing bytes are ignored by image decoders but change the
+            # content hash, so the adapter's result cache is bypassed
+            content += os.urandom(16)
+        return content
+
+    async def _run_one(self, client, image_path: Path) -> Dict:
+        sample = {'file': image_path.name, 'ok': False, 'stage': None, 'error': None}
+        stages = {}
+
+        start = time.perf_counter()
+        try:
+            content = self._read(image_path)
+        except OSError as e:
+            sample.update(stage='read', error=str(e))
+            return sample
+        stages['read'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                self.api_url,
+                files={'file': (image_path.name, content, 'image/jpeg')},
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            stages['request'] = (time.perf_counter() - start) * 1000
+            sample.update(stage='request', error=f"HTTP {e.response.status_code}", stages=stages)
+            return sample
+        except httpx.HTTPError as e:
+            stages['request'] = (time.perf_counter() - start) * 1000
+            sample.update(stage='request', error=type(e).__name__, stages=stages)
+            return sample
+        stages['request'] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        try:
+            data = response.json()
+            float(data.get('total_amount', 0.0))
+        except (ValueError, TypeError, AttributeError) as e:
+            sample.update(stage='parse', error=str(e), stages=stages)
+            return sample
+        stages['parse'] = (time.perf_counter() - start) * 1000
+
+        sample.update(
+            ok=True,
+            stages=stages,
+            latency_ms=sum(stages.values()),
+            cache=response.headers.get('X-OCR-Cache'),
+        )
+        return sample
+
+    async def _run(self, images: List[Path]):
+        jobs = asyncio.Queue()
+        for _ in range(self.rounds):
+            for image_path in images:
+                jobs.put_nowait(image_path)
+        total = jobs.qsize()
+
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        pacing = {'next': time.perf_counter()}
+        pacing_lock = asyncio.Lock()
+
+        headers = {'X-API-Key': self.api_key} if self.api_key else {}
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+
+        async def worker():
+            while True:
+                try:
+                    image_path = jobs.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if interval:
+                    async with pacing_lock:
+                        delay = pacing['next'] - time.perf_counter()
+                        pacing['next'] = max(pacing['next'], time.perf_counter()) + interval
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                sample = await self._run_one(client, image_path)
+                self.samples.append(sample)
+                if len(self.samples) % 50 == 0 or len(self.samples) == total:
+                    print(f"   {len(self.samples)}/{total} requests")
+
+        async with httpx.AsyncClient(timeout=self.timeout, headers=headers, limits=limits) as client:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    def run(self, images: List[Path]) -> Dict:
+        """Replay the receipts and return the benchmark report"""
+        print(f"\n🏋️  Running OCR Benchmark")
+        print(f"   API: {self.api_url}")
+        print(f"   Receipts: {len(images)} x {self.rounds} rounds")
+        print(f"   Concurrency: {self.concurrency} | Rate: {self.rate or 'unlimited'} req/s"
+              f"{' | cache busting' if self.bust_cache else ''}\n")
+
+        started = time.perf_counter()
+        asyncio.run(self._run(images))
+        wall_s = time.perf_counter() - started
+        return self.report(wall_s)
+
+    def report(self, wall_s: float) -> Dict:
+        requests = len(self.samples)
+        succeeded = [s for s in self.samples if s['ok']]
+
+        # Stage each sample failed at (past the last one if it succeeded)
+        failed_at = [
+            self.STAGES.index(s['stage']) if s['stage'] else len(self.STAGES)
+            for s in self.samples
+        ]
+        stages = {}
+        for index, stage in enumerate(self.STAGES):
+            timed = [s['stages'][stage] for s in self.samples if stage in s.get('stages', {})]
+            failed = failed_at.count(index)
+            attempted = sum(1 for at in failed_at if at >= index)
+            stages[stage] = {
+                'latency_ms': latency_summary(timed),
+                'errors': failed,
+                'error_rate': failed / attempted if attempted else 0.0,
+            }
+
+        errors = {}
+        for s in self.samples:
+            if not s['ok']:
+                key = f"{s['stage']}: {s['error']}"
+                errors[key] = errors.get(key, 0) + 1
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'config': {
+                'api_url': self.api_url,
+                'concurrency': self.concurrency,
+                'rate': self.rate,
+                'rounds': self.rounds,
+                'bust_cache': self.bust_cache,
+            },
+            'summary': {
+                'requests': requests,
+                'succeeded': len(succeeded),
+                'error_rate': (requests - len(succeeded)) / requests if requests else 0.0,
+                'wall_time_s': wall_s,
+                'throughput_rps': len(succeeded) / wall_s if wall_s else 0.0,
+                'cache_hits': sum(1 for s in succeeded if s.get('cache') == 'hit'),
+                'latency_ms': latency_summary([s['latency_ms'] for s in succeeded]),
+            },
+            'stages': stages,
+            'errors': errors,
+        }
+
+
+def print_benchmark_report(report: Dict, baseline: Optional[Dict] = None):
+    """Print a benchmark report, with deltas against a baseline report"""
+    summary = report['summary']
+    latency = summary['latency_ms']
+
+    print("\n" + "="*80)
+    print("📊 OCR Benchmark Report")
+    print("="*80)
+
+    print(f"\n**Overall:**")
+    print(f"  Requests: {summary['requests']} ({summary['succeeded']} ok, {summary['error_rate']*100:.1f}% errors)")
+    print(f"  Throughput: {summary['throughput_rps']:.2f} req/s over {summary['wall_time_s']:.1f}s")
+    print(f"  Cache hits: {summary['cache_hits']}")
+
+    print(f"\n**Latency per Stage (ms):**")
+    rows = [["end-to-end", f"{latency['p50']:.0f}", f"{latency['p95']:.0f}", f"{latency['p99']:.0f}",
+             f"{latency['max']:.0f}", "-"]]
+    for stage, stats in report['stages'].items():
+        stage_latency = stats['latency_ms']
+        rows.append([stage, f"{stage_latency['p50']:.1f}", f"{stage_latency['p95']:.1f}",
+                     f"{stage_latency['p99']:.1f}", f"{stage_latency['max']:.1f}",
+                     f"{stats['errors']} ({stats['error_rate']*100:.1f}%)"])
+    print(tabulate(rows, headers=["Stage", "p50", "p95", "p99", "max", "Errors"], tablefmt="simple"))
+
+    print(f"\n**End-to-End Latency Histogram:**")
+    print(tabulate([[bucket, count] for bucket, count in latency['histogram'].items()],
+                   headers=["ms", "Requests"], tablefmt="simple"))
+
+    if report['errors']:
+        print(f"\n**Errors:**")
+        print(tabulate(sorted(report['errors'].items(), key=lambda e: -e[1]),
+                       headers=["Error", "Count"], tablefmt="simple"))
+
+    if baseline:
+        base = baseline['summary']
+        print(f"\n**Compared to baseline ({baseline.get('timestamp', 'n/a')}):**")
+        metrics = [
+            ("p50 (ms)", base['latency_ms']['p50'], latency['p50']),
+            ("p95 (ms)", base['latency_ms']['p95'], latency['p95']),
+            ("p99 (ms)", base['latency_ms']['p99'], latency['p99']),
+            ("throughput (req/s)", base['throughput_rps'], summary['throughput_rps']),
+            ("error rate", base['error_rate'], summary['error_rate']),
+        ]
+        rows = []
+        for name, before, after in metrics:
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            rows.append([name, f"{before:.2f}", f"{after:.2f}", change])
+        print(tabulate(rows, headers=["Metric", "Baseline", "Current", "Change"], tablefmt="simple"))
+
+    print("\n" + "="*80)
+
+
+class StubOcrHandler(BaseHTTPRequestHandler):
+    """Upstream OCR stand-in: fixed latency, canned receipt JSON"""
+
+    latency_ms = 500
+    jitter_ms = 0
+    error_rate = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+
+        if random.random() < self.error_rate:
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        body = json.dumps({
+            'merchant_name': 'Jollibee Foods Corp',
+            'invoice_date': '15/11/2025',
+            'total_amount': 345.50,
+            'currency': 'PHP',
+            'confidence': 0.95,
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_stub(port: int, latency_ms: int, jitter_ms: int, error_rate: float):
+    """Run the stub upstream OCR service until interrupted"""
+    StubOcrHandler.latency_ms = latency_ms
+    StubOcrHandler.jitter_ms = jitter_ms
+    StubOcrHandler.error_rate = error_rate
+    server = ThreadingHTTPServer(('0.0.0.0', port), StubOcrHandler)
+    print(f"🧩 Stub upstream OCR on http://localhost:{port}/ocr "
+          f"({latency_ms}±{jitter_ms}ms, {error_rate*100:.0f}% errors)")
+    print(f"   Start the adapter with UPSTREAM_OCR_URL=http://localhost:{port}/ocr")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def list_images(images_dir: Path, ground_truth_path: Optional[Path]) -> List[Path]:
+    """Receipts to replay: the ground truth set if given, else every image"""
+    if ground_truth_path:
+        with open(ground_truth_path, 'r') as f:
+            return [images_dir / row['file_name'] for row in csv.DictReader(f)]
+    return sorted(p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Receipt OCR Test Harness')
-    parser.add_argument('--images', required=True, help='Directory containing receipt images')
-    parser.add_argument('--ground-truth', required=True, help='CSV file with ground truth data')
-    parser.add_argument('--api-url', required=True, help='OCR API endpoint URL')
+    parser.add_argument('--images', help='Directory containing receipt images')
+    parser.add_argument('--ground-truth', help='CSV file with ground truth data (required for accuracy tests)')
+    parser.add_argument('--api-url', help='OCR API endpoint URL')
     parser.add_argument('--api-key', help='API key for authentication')
     parser.add_argument('--timeout', type=int, default=30, help='Request timeout in seconds')
 
+    bench = parser.add_argument_group('benchmark mode')
+    bench.add_argument('--benchmark', action='store_true', help='Run a concurrent load test instead of accuracy tests')
+    bench.add_argument('--concurrency', type=int, default=8, help='Requests in flight (default: 8)')
+    bench.add_argument('--rate', type=float, default=0.0, help='Requests per second, 0 for unlimited (default: 0)')
+    bench.add_argument('--rounds', type=int, default=1, help='Times the receipt set is replayed (default: 1)')
+    bench.add_argument('--bust-cache', action='store_true', help='Make every upload unique to bypass the adapter result cache')
+    bench.add_argument('--output', default='ocr_benchmark_report.json', help='Benchmark JSON report path')
+    bench.add_argument('--baseline', help='Earlier benchmark JSON report to compare against')
+
+    stub = parser.add_argument_group('stub upstream')
+    stub.add_argument('--serve-stub', type=int, metavar='PORT', help='Serve a stub upstream OCR service on PORT')
+    stub.add_argument('--stub-latency-ms', type=int, default=500, help='Stub response latency (default: 500)')
+    stub.add_argument('--stub-jitter-ms', type=int, default=0, help='Random +/- latency jitter (default: 0)')
+    stub.add_argument('--stub-error-rate', type=float, default=0.0, help='Share of stub responses failing with 500 (default: 0)')
+
     args = parser.parse_args()
 
+    if args.serve_stub:
+        serve_stub(args.serve_stub, args.stub_latency_ms, args.stub_jitter_ms, args.stub_error_rate)
+        return
+
+    if not args.images or not args.api_url:
+        parser.error('--images and --api-url are required')
+    if not args.benchmark and not args.ground_truth:
+        parser.error('--ground-truth is required (or use --benchmark)')
+
     # Validate inputs
     images_dir = Path(args.images)
     if not images_dir.exists():
         print(f"❌ Images directory not found: {images_dir}")
         sys.exit(1)
 
-    gt_path = Path(args.ground_truth)
-    if not gt_path.exists():
+    gt_path = Path(args.ground_truth) if args.ground_truth else None
+    if gt_path and not gt_path.exists():
         print(f"❌ Ground truth file not found: {gt_path}")
         sys.exit(1)
 
+    if args.benchmark:
+        images = list_images(images_dir, gt_path)
+        if not images:
+            print(f"❌ No receipt images found in: {images_dir}")
+            sys.exit(1)
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+
+        benchmark = Benchmark(
+            args.api_url, args.api_key, args.timeout,
+            concurrency=args.concurrency, rate=args.rate, rounds=args.rounds,
+            bust_cache=args.bust_cache,
+        )
+        report = benchmark.run(images)
+        print_benchmark_report(report, baseline)
+
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Benchmark report saved to: {args.output}")
+        return
+
     # Run harness
     harness = TestHarness(args.api_url, args.api_key, args.timeout)
     ground_truth = harness.load_ground_truth(str(gt_path))
@@ -0,0 +1,101 @@
+"""OCR result cache tests (run from ocr-adapter/: python -m pytest tests)"""
+import asyncio
+import unittest
+
+from result_cache import OCRResultCache
+
+
+class TestOCRResultCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_requests_share_one_call(self):
+        cache = OCRResultCache(10)
+        calls = []
+        release = asyncio.Event()
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return {"vendor": "Jollibee"}
+
+        first = asyncio.create_task(cache.get_or_compute("abc", compute))
+        second = asyncio.create_task(cache.get_or_compute("abc", compute))
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await first, ({"vendor": "Jollibee"}, False))
+        self.assertEqual(await second, ({"vendor": "Jollibee"}, True))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(await cache.get_or_compute("abc", compute), ({"vendor": "Jollibee"}, True))
+        self.assertEqual(len(calls), 1)
+
+    async def test_cancelled_request_does_not_cancel_waiters(self):
+        cache = OCRResultCache(10)
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return {"vendor": "Jollibee"}
+
+        first = asyncio.create_task(cache.get_or_compute("abc", compute))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_compute("abc", compute))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        release.set()
+
+        self.assertEqual(await second, ({"vendor": "Jollibee"}, True))
+        self.assertEqual(cache.get("abc"), {"vendor": "Jollibee"})
+
+    async def test_failure_reaches_every_waiter_and_is_not_cached(self):
+        cache = OCRResultCache(10)
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            raise RuntimeError("upstream down")
+
+        first = asyncio.create_task(cache.get_or_compute("abc", compute))
+        second = asyncio.create_task(cache.get_or_compute("abc", compute))
+        await asyncio.sleep(0)
+        release.set()
+
+        for request in (first, second):
+            with self.assertRaises(RuntimeError):
+                await request
+        self.assertIsNone(cache.get("abc"))
+
+        async def recover():
+            return {"vendor": "Jollibee"}
+
+        self.assertEqual(await cache.get_or_compute("abc", recover), ({"vendor": "Jollibee"}, False))
+
+    async def test_results_are_copies(self):
+        cache = OCRResultCache(10)
+
+        async def compute():
+            return {"vendor": "Jollibee"}
+
+        result, _cache_hit = await cache.get_or_compute("abc", compute)
+        result["vendor"] = "changed"
+        self.assertEqual(cache.get("abc"), {"vendor": "Jollibee"})
+
+    def test_least_recently_used_evicted(self):
+        cache = OCRResultCache(2)
+        cache.set("a", {"n": 1})
+        cache.set("b", {"n": 2})
+        cache.get("a")
+        cache.set("c", {"n": 3})
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"n": 1})
+
+    def test_zero_entries_disables_caching(self):
+        cache = OCRResultCache(0)
+        cache.set("a", {"n": 1})
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Compiled PH vendor matcher for the OCR adapter
+
+Built once at startup from the vendor table (data/ph_vendors.json):
+- exact alias lookup (dict)
+- Aho-Corasick automaton for PH-local vendor substring membership, one
+  pass over the name whatever the number of patterns
+- character trigram index for OCR-garbled names ("JOLLlBEE"), scoring only
+  the few aliases sharing the most trigrams with the name
+
+Match counts and latency are kept for /health.
+"""
+import heapq
+import json
+import re
+import time
+from collections import defaultdict, deque
+from difflib import SequenceMatcher
+from typing import Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_key(name: str) -> str:
+    """Lowercase, trimmed, single-spaced lookup key"""
+    return _WHITESPACE.sub(" ", name.lower()).strip()
+
+
+def load_vendor_table(path: str):
+    """
+    Read the vendor table
+
+    Returns:
+        tuple: (alias → canonical name dict, set of PH-local patterns)
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    normalization = {}
+    for aliases in data.get("normalization", {}).values():
+        normalization.update(aliases)
+    ph_local = set()
+    for patterns in data.get("ph_local", {}).values():
+        ph_local.update(patterns)
+    return normalization, ph_local
+
+
+class AhoCorasick:
+    """Substring membership automaton over a fixed set of patterns"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [False]
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(False)
+                self.goto[state][char] = next_state
+            state = next_state
+        self.output[state] = True
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                # A pattern ending at the fallback state ends here too
+                self.output[next_state] = (
+                    self.output[next_state] or self.output[self.fail[next_state]]
+                )
+
+    def contains_any(self, text: str) -> bool:
+        """True if any pattern occurs in text"""
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                return True
+        return False
+
+
+class TrigramIndex:
+    """Character trigram inverted index with similarity re-ranking"""
+
+    def __init__(self, keys, max_candidates: int = 20):
+        self.keys = list(keys)
+        self.max_candidates = max_candidates
+        self.postings = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for gram in self._trigrams(key):
+                self.postings[gram].append(key_id)
+
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def best_match(self, text: str, threshold: float):
+        """
+        Closest key to text
+
+        Returns:
+            tuple: (key, similarity) or (None, 0.0) below threshold
+        """
+        shared = defaultdict(int)
+        for gram in self._trigrams(text):
+            for key_id in self.postings.get(gram, ()):
+                shared[key_id] += 1
+        if not shared:
+            return None, 0.0
+
+        candidates = heapq.nlargest(self.max_candidates, shared, key=shared.get)
+        best_key, best_score = None, 0.0
+        for key_id in candidates:
+            key = self.keys[key_id]
+            score = SequenceMatcher(None, text, key).ratio()
+            if score > best_score:
+                best_key, best_score = key, score
+        if best_score < threshold:
+            return None, 0.0
+        return best_key, best_score
+
+
+class VendorMatcher:
+    """
+    Vendor name normalization and PH-local detection
+
+    Args:
+        normalization: alias → canonical vendor name
+        ph_local: substrings identifying PH-local vendors
+        fuzzy_threshold: minimum similarity (0-1) of a fuzzy match
+        fuzzy_min_length: shorter names are only matched exactly
+    """
+
+    def __init__(self, normalization: dict, ph_local, fuzzy_threshold: float = 0.85,
+                 fuzzy_min_length: int = 4):
+        self.aliases = {normalize_key(alias): name for alias, name in normalization.items()}
+        # Canonical names are aliases of themselves
+        for name in normalization.values():
+            self.aliases.setdefault(normalize_key(name), name)
+
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_min_length = fuzzy_min_length
+        self.fuzzy_index = TrigramIndex(self.aliases)
+        self.local_patterns = AhoCorasick(ph_local)
+
+        self.counters = {"exact": 0, "fuzzy": 0, "miss": 0}
+        self.total_ns = 0
+
+    def match(self, vendor: str) -> Optional[str]:
+        """Canonical name of vendor, or None if it is not a known vendor"""
+        start = time.perf_counter_ns()
+        key = normalize_key(vendor)
+        name = self.aliases.get(key)
+        outcome = "exact"
+        if name is None and len(key) >= self.fuzzy_min_length:
+            alias, _score = self.fuzzy_index.best_match(key, self.fuzzy_threshold)
+            name = self.aliases.get(alias)
+            outcome = "fuzzy"
+        if name is None:
+            outcome = "miss"
+        self.counters[outcome] += 1
+        self.total_ns += time.perf_counter_ns() - start
+        return name
+
+    def is_ph_local(self, vendor: str) -> bool:
+        return self.local_patterns.contains_any(vendor.lower())
+
+    def stats(self) -> dict:
+        lookups = sum(self.counters.values())
+        return {
+            "aliases": len(self.aliases),
+            "lookups": lookups,
+            **self.counters,
+            "match_rate": round((lookups - self.counters["miss"]) / lookups, 4) if lookups else None,
+            "avg_latency_us": round(self.total_ns / lookups / 1000, 2) if lookups else None,
+        }
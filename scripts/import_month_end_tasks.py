@@ -26,6 +26,8 @@ import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+from task_dedup_index import NearDuplicateIndex
+
 # Color codes for output
 RED = '\033[0;31m'
 GREEN = '\033[0;32m'
@@ -132,12 +134,18 @@ def load_csv_data(csv_path: str) -> List[Dict]:
         sys.exit(1)
 
 
-def deduplicate_tasks(tasks: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+def deduplicate_tasks(
+    tasks: List[Dict],
+    similarity_threshold: Optional[float] = None
+) -> Tuple[List[Dict], List[Dict]]:
     """
     Deduplicate tasks by name (case-insensitive).
 
     Args:
         tasks: List of task dictionaries
+        similarity_threshold: Also drop near-duplicates, i.e. tasks whose
+            name shares at least this share of words (Jaccard) with a kept
+            task's name
 
     Returns:
         Tuple of (unique_tasks, duplicates)
@@ -145,6 +153,12 @@ def deduplicate_tasks(tasks: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
     seen = {}
     unique = []
     duplicates = []
+    index = None
+    if similarity_threshold:
+        index = NearDuplicateIndex(
+            threshold=similarity_threshold,
+            vocabulary=(task['name'] for task in tasks)
+        )
 
     for task in tasks:
         name_key = task['name'].lower()
@@ -152,9 +166,18 @@ def deduplicate_tasks(tasks: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
         if name_key in seen:
             duplicates.append(task)
             log_warning(f"Duplicate task: {task['name']}")
-        else:
-            seen[name_key] = True
-            unique.append(task)
+            continue
+
+        match = index.find(task['name']) if index is not None else None
+        if match:
+            duplicates.append(task)
+            log_warning(f"Near-duplicate task: {task['name']} ~ {match[0]} ({match[1]:.0%})")
+            continue
+
+        seen[name_key] = True
+        unique.append(task)
+        if index is not None:
+            index.add(task['name'])
 
     log_info(f"Found {len(duplicates)} duplicate tasks")
     log_success(f"Kept {len(unique)} unique tasks")
@@ -362,6 +385,12 @@ def main():
         help='Validate without committing changes'
     )
 
+    parser.add_argument(
+        '--similarity-threshold',
+        type=float,
+        help='Also skip near-duplicate task names (Jaccard word similarity, e.g. 0.8)'
+    )
+
     args = parser.parse_args()
 
     # Load environment variables
@@ -394,7 +423,7 @@ def main():
 
     # Deduplicate
     log_info("Step 2: Deduplicating tasks...")
-    unique_tasks, duplicates = deduplicate_tasks(tasks)
+    unique_tasks, duplicates = deduplicate_tasks(tasks, args.similarity_threshold)
     print()
 
     # Connect to database
@@ -19,6 +19,8 @@ from typing import List, Dict, Any
 from html.parser import HTMLParser
 from bs4 import BeautifulSoup
 
+from task_dedup_index import NearDuplicateIndex
+
 
 class NotionTaskParser:
     """Parser for Notion HTML export files."""
@@ -167,6 +169,10 @@ class NotionTaskParser:
         """
         Detect duplicate tasks by comparing titles.
 
+        A task is a duplicate when its title shares more than 80% of its
+        words (Jaccard similarity) with an existing title. Existing titles
+        are indexed once, so only titles sharing rare words are compared.
+
         Args:
             existing_tasks: List of existing task titles from seed data
 
@@ -174,46 +180,23 @@ class NotionTaskParser:
             List of tasks that are NOT duplicates
         """
         unique_tasks = []
+        index = NearDuplicateIndex(existing_tasks, threshold=0.8, strict=True)
 
         for task in self.tasks:
-            # Normalize title for comparison
-            normalized_title = re.sub(r'[^\w\s]', '', task['title'].lower())
-
-            # Check if similar title exists
-            is_duplicate = False
-            for existing in existing_tasks:
-                normalized_existing = re.sub(r'[^\w\s]', '', existing.lower())
-
-                # Simple similarity check (>80% character overlap)
-                if self._calculate_similarity(normalized_title, normalized_existing) > 0.8:
-                    is_duplicate = True
-                    self.duplicates.append({
-                        'notion_task': task['title'],
-                        'existing_task': existing,
-                        'similarity': self._calculate_similarity(normalized_title, normalized_existing)
-                    })
-                    break
-
-            if not is_duplicate:
+            match = index.find(task['title'])
+            if match:
+                existing, similarity = match
+                self.duplicates.append({
+                    'notion_task': task['title'],
+                    'existing_task': existing,
+                    'similarity': similarity
+                })
+            else:
                 unique_tasks.append(task)
 
         print(f"Found {len(unique_tasks)} unique tasks (filtered out {len(self.duplicates)} duplicates)")
         return unique_tasks
 
-    def _calculate_similarity(self, str1: str, str2: str) -> float:
-        """Calculate simple character-based similarity ratio."""
-        if not str1 or not str2:
-            return 0.0
-
-        # Simple set-based Jaccard similarity
-        set1 = set(str1.split())
-        set2 = set(str2.split())
-
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-
-        return intersection / union if union > 0 else 0.0
-
     def export_to_json(self, output_path: Path, include_duplicates: bool = True):
         """Export parsed tasks to JSON file."""
         output_data = {
@@ -0,0 +1,234 @@
+-- ============================================================================
+-- Migration: Docs Assistant ANN index lifecycle and hybrid retrieval
+-- Date: 2026-10-17
+-- Description: Managed approximate nearest neighbour (HNSW / IVFFlat) index
+--              on docs_chunks embeddings, full-text search column, and
+--              hybrid retrieval fusing both rankings with reciprocal rank
+--              fusion (RRF).
+--
+-- Requires pgvector >= 0.7 (halfvec): text-embedding-3-large embeddings have
+-- 3072 dimensions, above the 2000 dimension limit of vector indexes, so the
+-- index is built on the embedding cast to halfvec(3072).
+--
+-- Expects docs_chunks(id, project_id, document_id, heading, content,
+-- embedding vector(3072)) and docs_documents(id, title, source_group_id).
+--
+-- Indexes are (re)built by docs-assistant/api/vector_index.py, which uses
+-- CREATE INDEX CONCURRENTLY and records the build in docs_vector_index_state.
+-- ============================================================================
+
+CREATE EXTENSION IF NOT EXISTS "vector";
+
+-- ============================================================================
+-- FULL-TEXT: generated tsvector column + GIN index
+-- ============================================================================
+ALTER TABLE docs_chunks
+  ADD COLUMN IF NOT EXISTS content_tsv tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(heading, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(content, '')), 'B')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_docs_chunks_content_tsv
+ON docs_chunks USING gin (content_tsv);
+
+-- INDEX: Fast project scoping for both rankings
+CREATE INDEX IF NOT EXISTS idx_docs_chunks_project_id
+ON docs_chunks(project_id);
+
+-- ============================================================================
+-- TABLE: docs_vector_index_state
+-- One row per managed ANN index: build parameters and corpus size at build
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS docs_vector_index_state (
+  index_name       text         PRIMARY KEY,
+  method           text         NOT NULL CHECK (method IN ('hnsw', 'ivfflat')),
+  lists            integer,
+  m                integer,
+  ef_construction  integer,
+  row_count        bigint       NOT NULL,
+  built_at         timestamptz  NOT NULL DEFAULT now()
+);
+
+-- ============================================================================
+-- FUNCTION: docs_ivfflat_lists
+-- IVFFlat list count for a corpus size (pgvector guidance): rows / 1000 up
+-- to 1M rows, sqrt(rows) beyond.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION docs_ivfflat_lists(p_row_count bigint)
+RETURNS integer
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT CASE
+    WHEN p_row_count <= 1000000 THEN greatest(10, (p_row_count / 1000)::integer)
+    ELSE ceil(sqrt(p_row_count))::integer
+  END;
+$$;
+
+-- ============================================================================
+-- FUNCTION: docs_chunk_index_needs_rebuild
+-- True when the managed index is missing, or (IVFFlat) the corpus grew or
+-- shrank by more than p_growth since the build, so the lists no longer fit.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION docs_chunk_index_needs_rebuild(
+  p_index_name text DEFAULT 'idx_docs_chunks_embedding',
+  p_growth     numeric DEFAULT 2.0
+)
+RETURNS boolean
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_state docs_vector_index_state;
+  v_rows  bigint;
+BEGIN
+  SELECT * INTO v_state FROM docs_vector_index_state WHERE index_name = p_index_name;
+  IF NOT FOUND OR to_regclass(p_index_name) IS NULL THEN
+    RETURN true;
+  END IF;
+  IF v_state.method = 'hnsw' THEN
+    -- HNSW adapts to growth, no rebuild needed
+    RETURN false;
+  END IF;
+
+  SELECT count(*) INTO v_rows FROM docs_chunks WHERE embedding IS NOT NULL;
+  RETURN v_rows > v_state.row_count * p_growth
+      OR v_rows * p_growth < v_state.row_count;
+END;
+$$;
+
+-- ============================================================================
+-- FUNCTION: docs_hybrid_search_chunks
+-- Vector (ANN) and full-text candidates fused with reciprocal rank fusion:
+--   score = sum(1 / (rrf_k + rank)) over the rankings a chunk appears in.
+-- Search parameters are set per call: hnsw.ef_search covers the candidate
+-- count (capped at 1000, the pgvector maximum), ivfflat.probes is
+-- sqrt(lists) of the managed index.
+--
+-- pgvector 0.7 applies the project / source group filter after the index
+-- scan, so the ANN candidates of a small project (or a narrow source group)
+-- are mostly filtered out. When the ANN scan returns fewer than the
+-- candidate count, the vector ranking falls back to an exact scan of the
+-- filtered chunks, which is cheap for exactly those small scopes.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION docs_hybrid_search_chunks(
+  query_embedding    vector,
+  query_text         text,
+  match_limit        integer,
+  p_project_id       uuid,
+  p_source_group_ids uuid[] DEFAULT NULL,
+  candidate_limit    integer DEFAULT 100,
+  rrf_k              integer DEFAULT 60
+)
+RETURNS TABLE (
+  chunk_id         uuid,
+  document_title   text,
+  heading          text,
+  content          text,
+  similarity_score double precision,
+  rrf_score        double precision,
+  vector_rank      bigint,
+  text_rank        bigint
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_lists      integer;
+  v_ann_limit  integer := least(candidate_limit, 1000);
+BEGIN
+  SELECT lists INTO v_lists
+  FROM docs_vector_index_state
+  WHERE index_name = 'idx_docs_chunks_embedding';
+
+  PERFORM set_config('hnsw.ef_search', greatest(v_ann_limit, 40)::text, true);
+  PERFORM set_config(
+    'ivfflat.probes', greatest(1, ceil(sqrt(coalesce(v_lists, 1))))::text, true
+  );
+
+  RETURN QUERY
+  WITH ann_hits AS MATERIALIZED (
+    SELECT
+      c.id,
+      (c.embedding::halfvec(3072) <=> query_embedding::halfvec(3072)) AS distance
+    FROM docs_chunks c
+    JOIN docs_documents d ON d.id = c.document_id
+    WHERE c.project_id = p_project_id
+      AND c.embedding IS NOT NULL
+      AND (p_source_group_ids IS NULL OR d.source_group_id = ANY(p_source_group_ids))
+    ORDER BY c.embedding::halfvec(3072) <=> query_embedding::halfvec(3072)
+    LIMIT v_ann_limit
+  ),
+  -- The filters ate the ANN candidates: exact scan of the filtered chunks.
+  -- Ordering on distance + 0 keeps the planner off the ANN index.
+  exact_hits AS MATERIALIZED (
+    SELECT
+      c.id,
+      (c.embedding::halfvec(3072) <=> query_embedding::halfvec(3072)) AS distance
+    FROM docs_chunks c
+    JOIN docs_documents d ON d.id = c.document_id
+    WHERE (SELECT count(*) FROM ann_hits) < v_ann_limit
+      AND c.project_id = p_project_id
+      AND c.embedding IS NOT NULL
+      AND (p_source_group_ids IS NULL OR d.source_group_id = ANY(p_source_group_ids))
+    ORDER BY (c.embedding::halfvec(3072) <=> query_embedding::halfvec(3072)) + 0
+    LIMIT candidate_limit
+  ),
+  vector_hits AS (
+    SELECT
+      hit.id,
+      1 - hit.distance AS similarity,
+      row_number() OVER (ORDER BY hit.distance) AS rank
+    FROM (
+      SELECT id, distance FROM exact_hits
+      UNION ALL
+      SELECT id, distance FROM ann_hits
+      WHERE NOT EXISTS (SELECT 1 FROM exact_hits)
+    ) hit
+  ),
+  text_hits AS (
+    SELECT
+      hit.id,
+      row_number() OVER (ORDER BY hit.text_score DESC) AS rank
+    FROM (
+      SELECT c.id, ts_rank_cd(c.content_tsv, q.query) AS text_score
+      FROM docs_chunks c
+      JOIN docs_documents d ON d.id = c.document_id
+      CROSS JOIN websearch_to_tsquery('english', query_text) AS q(query)
+      WHERE c.project_id = p_project_id
+        AND c.content_tsv @@ q.query
+        AND (p_source_group_ids IS NULL OR d.source_group_id = ANY(p_source_group_ids))
+      ORDER BY text_score DESC
+      LIMIT candidate_limit
+    ) hit
+  ),
+  fused AS (
+    SELECT
+      coalesce(v.id, t.id) AS id,
+      coalesce(1.0 / (rrf_k + v.rank), 0) + coalesce(1.0 / (rrf_k + t.rank), 0) AS score,
+      v.similarity,
+      v.rank AS v_rank,
+      t.rank AS t_rank
+    FROM vector_hits v
+    FULL OUTER JOIN text_hits t ON t.id = v.id
+    ORDER BY score DESC
+    LIMIT match_limit
+  )
+  SELECT
+    c.id,
+    d.title::text,
+    c.heading::text,
+    c.content::text,
+    coalesce(f.similarity, 0)::double precision,
+    f.score::double precision,
+    f.v_rank,
+    f.t_rank
+  FROM fused f
+  JOIN docs_chunks c ON c.id = f.id
+  JOIN docs_documents d ON d.id = c.document_id
+  ORDER BY f.score DESC;
+END;
+$$;
+
+COMMENT ON FUNCTION docs_hybrid_search_chunks IS
+  'Hybrid (ANN + full-text) docs chunk retrieval fused with reciprocal rank fusion';
@@ -0,0 +1,37 @@
+-- ============================================================================
+-- Migration: Docs Assistant corpus versions
+-- Date: 2026-10-17
+-- Description: Per-project corpus version used by the answer engine to key
+--              its answer cache. Ingestion bumps the version after
+--              re-ingesting a project's chunks, which invalidates every
+--              cached answer of that project.
+-- ============================================================================
+
+-- ============================================================================
+-- TABLE: docs_corpus_versions
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS docs_corpus_versions (
+  project_id  uuid         PRIMARY KEY REFERENCES docs_projects(id) ON DELETE CASCADE,
+  version     bigint       NOT NULL DEFAULT 0,
+  updated_at  timestamptz  NOT NULL DEFAULT now()
+);
+
+-- ============================================================================
+-- FUNCTION: docs_bump_corpus_version
+-- Called by ingestion (or POST /v1/cache/invalidate) once a project's chunks
+-- were (re-)ingested. Returns the new version.
+-- ============================================================================
+CREATE OR REPLACE FUNCTION docs_bump_corpus_version(p_project_id uuid)
+RETURNS bigint
+LANGUAGE sql
+AS $$
+  INSERT INTO docs_corpus_versions AS v (project_id, version, updated_at)
+  VALUES (p_project_id, 1, now())
+  ON CONFLICT (project_id) DO UPDATE
+    SET version = v.version + 1,
+        updated_at = now()
+  RETURNING version;
+$$;
+
+COMMENT ON TABLE docs_corpus_versions IS
+  'Docs Assistant corpus version per project, part of the answer cache key';